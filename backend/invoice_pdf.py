@@ -0,0 +1,352 @@
+"""
+ReportLab builders for the invoice and proforma invoice PDFs.
+
+The builders are pure functions of plain dicts (prepared by server.py) and
+return PDF bytes, so they can run in a worker process without touching the
+database or the event loop. Styles, table styles and the fixed paragraphs are
+built once per process by `init_worker`.
+"""
+
+import copy
+import io
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+ORANGE = colors.HexColor('#f97316')
+DARK_ORANGE = colors.HexColor('#ea580c')
+GREEN = colors.HexColor('#10b981')
+DARK_GREEN = colors.HexColor('#059669')
+AMBER = colors.HexColor('#f59e0b')
+RED = colors.HexColor('#ef4444')
+GRAY = colors.HexColor('#374151')
+
+BANK_DETAILS_TEXT = """
+    <b>Account Name:</b> Travel Company Pvt Ltd<br/>
+    <b>Account Number:</b> 1234567890<br/>
+    <b>IFSC Code:</b> BANK0001234<br/>
+    <b>Bank Name:</b> Example Bank<br/>
+    <b>UPI ID:</b> travelcompany@upi
+    """
+
+PROFORMA_TERMS_TEXT = """
+    1. This proforma invoice is valid until the expiry date mentioned above.<br/>
+    2. Advance payment is required to confirm the booking.<br/>
+    3. Balance payment must be made before the travel date.<br/>
+    4. Cancellation charges apply as per company policy.<br/>
+    5. All prices are subject to availability at the time of booking.
+    """
+
+INVOICE_TERMS_VERIFIED_TEXT = """
+        1. This invoice confirms the payment received for the travel services booked.<br/>
+        2. All services are subject to availability and confirmation from suppliers.<br/>
+        3. Cancellation charges apply as per company policy.<br/>
+        4. Any disputes are subject to the jurisdiction of the company's registered office.<br/>
+        5. Thank you for choosing our services.
+        """
+
+INVOICE_TERMS_PENDING_TEXT = """
+        1. This invoice is issued pending payment verification.<br/>
+        2. Please ensure payment is verified to confirm your booking.<br/>
+        3. Cancellation charges apply as per company policy.<br/>
+        4. Any disputes are subject to the jurisdiction of the company's registered office.<br/>
+        5. Thank you for choosing our services.
+        """
+
+VERIFIED_STATUSES = ("Paid", "Partially Paid")
+
+# Per-process cache filled by init_worker()
+_styles = None
+_table_styles = None
+_paragraphs = None
+
+
+def init_worker():
+    """Build styles and fixed flowables once per process."""
+    global _styles, _table_styles, _paragraphs
+    if _styles is not None:
+        return
+
+    sample = getSampleStyleSheet()
+    normal = sample['Normal']
+    _styles = {
+        'normal': normal,
+        'proforma_title': ParagraphStyle(
+            'ProformaTitle', parent=sample['Heading1'], fontSize=24,
+            textColor=ORANGE, spaceAfter=30, alignment=TA_CENTER
+        ),
+        'proforma_heading': ParagraphStyle(
+            'ProformaHeading', parent=sample['Heading2'], fontSize=14,
+            textColor=DARK_ORANGE, spaceAfter=12, spaceBefore=12
+        ),
+        'invoice_title': ParagraphStyle(
+            'InvoiceTitle', parent=sample['Heading1'], fontSize=24,
+            textColor=GREEN, spaceAfter=30, alignment=TA_CENTER
+        ),
+        'invoice_heading': ParagraphStyle(
+            'InvoiceHeading', parent=sample['Heading2'], fontSize=14,
+            textColor=DARK_GREEN, spaceAfter=12, spaceBefore=12
+        ),
+        'status_badges': {
+            status: ParagraphStyle(
+                f'StatusBadge{index}', parent=normal, fontSize=16,
+                textColor=color, alignment=TA_CENTER, fontName='Helvetica-Bold'
+            )
+            for index, (status, color) in enumerate(
+                [("Paid", GREEN), ("Partially Paid", AMBER), (None, RED)]
+            )
+        },
+        'footer': ParagraphStyle(
+            'Footer', parent=normal, fontSize=10, textColor=GREEN,
+            alignment=TA_CENTER, fontName='Helvetica-Bold'
+        ),
+    }
+
+    _table_styles = {
+        'company': TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (0, -1), GRAY),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ]),
+        'client': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (-1, -1), GRAY),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+        'line_items': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), ORANGE),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -4), colors.white),
+            ('GRID', (0, 0), (-1, -4), 1, colors.grey),
+            ('LINEABOVE', (4, -3), (-1, -3), 2, colors.grey),
+            ('LINEABOVE', (4, -1), (-1, -1), 2, ORANGE),
+            ('FONTNAME', (4, -1), (-1, -1), 'Helvetica-Bold'),
+        ]),
+        'payment_terms': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('TEXTCOLOR', (0, -1), (-1, -1), ORANGE),
+            ('FONTSIZE', (0, -1), (-1, -1), 14),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, ORANGE),
+        ]),
+        'payment_summary': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('TOPPADDING', (0, 0), (-1, -2), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -2), 6),
+            ('BOTTOMPADDING', (0, -2), (-1, -2), 14),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, GREEN),
+            ('TOPPADDING', (0, -1), (-1, -1), 14),
+            ('TEXTCOLOR', (0, -1), (-1, -1), GREEN),
+            ('FONTSIZE', (0, -1), (-1, -1), 14),
+        ]),
+    }
+
+    proforma_heading = _styles['proforma_heading']
+    invoice_heading = _styles['invoice_heading']
+    _paragraphs = {
+        'proforma_title': Paragraph("PROFORMA INVOICE", _styles['proforma_title']),
+        'proforma_bill_to': Paragraph("BILL TO:", proforma_heading),
+        'proforma_payment_terms': Paragraph("PAYMENT TERMS:", proforma_heading),
+        'bank_details_heading': Paragraph("BANK DETAILS:", proforma_heading),
+        'bank_details': Paragraph(BANK_DETAILS_TEXT, normal),
+        'proforma_terms_heading': Paragraph("TERMS & CONDITIONS:", proforma_heading),
+        'proforma_terms': Paragraph(PROFORMA_TERMS_TEXT, normal),
+        'invoice_title': Paragraph("INVOICE", _styles['invoice_title']),
+        'invoice_bill_to': Paragraph("BILL TO:", invoice_heading),
+        'payment_summary_heading': Paragraph("PAYMENT SUMMARY:", invoice_heading),
+        'verification_heading': Paragraph("PAYMENT VERIFICATION:", invoice_heading),
+        'verification_pending': Paragraph(
+            "<b style='color:red;'>Payment not yet verified by Operations.</b>", normal
+        ),
+        'invoice_terms_heading': Paragraph("TERMS & CONDITIONS:", invoice_heading),
+        'invoice_terms_verified': Paragraph(INVOICE_TERMS_VERIFIED_TEXT, normal),
+        'invoice_terms_pending': Paragraph(INVOICE_TERMS_PENDING_TEXT, normal),
+        'footer': Paragraph("Thank you for your business!", _styles['footer']),
+    }
+
+
+def _static(name: str) -> Paragraph:
+    # Shallow copy keeps the parsed text but gives each document its own layout state
+    return copy.copy(_paragraphs[name])
+
+
+def _table(rows, col_widths, style_name: str) -> Table:
+    table = Table(rows, colWidths=col_widths)
+    table.setStyle(_table_styles[style_name])
+    return table
+
+
+def _format_date(value, fmt: str = '%d %B %Y', default: str = 'N/A') -> str:
+    return datetime.fromisoformat(value).strftime(fmt) if value else default
+
+
+def _client_rows(client: dict):
+    return [
+        ["Client Name:", client["name"]],
+        ["Email:", client["email"]],
+        ["Phone:", f"{client.get('country_code') or '+91'} {client['phone']}"],
+        ["Destination:", client.get("destination") or "N/A"],
+        ["Travel Dates:", client["travel_dates"]],
+        ["Number of People:", str(client["people_count"])],
+    ]
+
+
+def build_proforma_pdf(data: dict) -> bytes:
+    """
+    Lay out a proforma invoice. `data` holds `quotation_id`, `date`,
+    `expiry_date`, `client`, `options`, `advance_amount`, `advance_percent`
+    and `grand_total`.
+    """
+    init_worker()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    heading_style = _styles['proforma_heading']
+    elements = [_static('proforma_title'), Spacer(1, 12)]
+
+    company_data = [
+        ["Travel Company Pvt Ltd", ""],
+        ["123 Business Street", f"Date: {data['date']}"],
+        ["City, State - 123456", f"Proforma #: PI-{data['quotation_id'][:8].upper()}"],
+        ["Phone: +91-1234567890", f"Valid Until: {_format_date(data.get('expiry_date'))}"],
+    ]
+    elements.append(_table(company_data, [3*inch, 3*inch], 'company'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('proforma_bill_to'))
+    elements.append(_table(_client_rows(data['client']), [1.5*inch, 4.5*inch], 'client'))
+    elements.append(Spacer(1, 20))
+
+    for option in data.get('options', []):
+        elements.append(Paragraph(f"<b>{option['name']}</b>", heading_style))
+
+        line_items_data = [["Item", "Supplier", "Qty", "Unit Price", "Tax %", "Total"]]
+        for item in option.get("line_items", []):
+            line_items_data.append([
+                f"{item['name']}\n({item['type']})",
+                item.get('supplier', 'N/A'),
+                str(item['quantity']),
+                f"₹{item['unit_price']:,.2f}",
+                f"{item['tax_percent']}%",
+                f"₹{item['total']:,.2f}"
+            ])
+        line_items_data.append(["", "", "", "", "Subtotal:", f"₹{option['subtotal']:,.2f}"])
+        line_items_data.append(["", "", "", "", "Tax:", f"₹{option['tax_amount']:,.2f}"])
+        line_items_data.append(["", "", "", "", "Total:", f"₹{option['total']:,.2f}"])
+
+        elements.append(_table(
+            line_items_data,
+            [2*inch, 1.2*inch, 0.5*inch, 1*inch, 0.8*inch, 1*inch],
+            'line_items'
+        ))
+        elements.append(Spacer(1, 20))
+
+    elements.append(_static('proforma_payment_terms'))
+    advance_amount = data.get('advance_amount', 0)
+    grand_total = data.get('grand_total', 0)
+    payment_terms_data = [
+        [f"Advance Payment ({data.get('advance_percent', 30)}%):", f"₹{advance_amount:,.2f}"],
+        ["Balance Payment:", f"₹{grand_total - advance_amount:,.2f}"],
+        ["Grand Total:", f"₹{grand_total:,.2f}"],
+    ]
+    elements.append(_table(payment_terms_data, [4*inch, 2*inch], 'payment_terms'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('bank_details_heading'))
+    elements.append(_static('bank_details'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('proforma_terms_heading'))
+    elements.append(_static('proforma_terms'))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def build_invoice_pdf(data: dict) -> bytes:
+    """
+    Lay out an invoice. `data` holds `invoice`, the invoice document's plain
+    fields, plus `date` and `client`.
+    """
+    init_worker()
+    invoice = data['invoice']
+    status = invoice.get("status", "Verification Pending")
+    verified = status in VERIFIED_STATUSES
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=40, bottomMargin=18)
+    badge_styles = _styles['status_badges']
+    elements = [
+        _static('invoice_title'),
+        Paragraph((status or "").upper(), badge_styles.get(status, badge_styles[None])),
+        Spacer(1, 12),
+    ]
+
+    company_data = [
+        ["Traveego Company Pvt Ltd", ""],
+        ["123 Business Street", f"Date: {data['date']}"],
+        ["City, State - 123456", f"Invoice #: {invoice['invoice_number']}"],
+        ["Phone: +91-1234567890", f"Due Date: {_format_date(invoice['due_date'])}"],
+        ["GST: " + (invoice.get('gst_number') or 'N/A'), ""],
+    ]
+    elements.append(_table(company_data, [3*inch, 3*inch], 'company'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('invoice_bill_to'))
+    elements.append(_table(_client_rows(data['client']), [1.5*inch, 4.5*inch], 'client'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('payment_summary_heading'))
+    advance_amount = invoice.get("advance_amount", 0)
+    total_amount = invoice.get("total_amount", 0)
+    payment_summary_data = [
+        ["Advance Payment:", f"Rs. {advance_amount:,.2f}"],
+        ["Balance Payment:", f"Rs. {total_amount - advance_amount:,.2f}"],
+        ["Total Amount:", f"Rs. {total_amount:,.2f}"],
+    ]
+    elements.append(_table(payment_summary_data, [4*inch, 2*inch], 'payment_summary'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('verification_heading'))
+    if verified:
+        verification_text = f"""
+        <b>Payment Received:</b> {_format_date(invoice.get('received_at'), '%d %B %Y, %I:%M %p')}<br/>
+        <b>Verified by Operations:</b> {_format_date(invoice.get('verified_at'), '%d %B %Y, %I:%M %p')}<br/>
+        <b>Payment Method:</b> {(invoice.get('method') or 'N/A').replace('_', ' ').title()}<br/>
+        """
+        if invoice.get('accountant_notes'):
+            verification_text += f"<b>Accountant Notes:</b> {invoice['accountant_notes']}<br/>"
+        if invoice.get('ops_notes'):
+            verification_text += f"<b>Operations Notes:</b> {invoice['ops_notes']}<br/>"
+        elements.append(Paragraph(verification_text, _styles['normal']))
+    else:
+        elements.append(_static('verification_pending'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('invoice_terms_heading'))
+    elements.append(_static('invoice_terms_verified' if verified else 'invoice_terms_pending'))
+    elements.append(Spacer(1, 20))
+
+    elements.append(_static('footer'))
+
+    doc.build(elements)
+    return buffer.getvalue()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of serializing list responses, before and after the orjson
+fast path.
+
+"model" is the old path: a pydantic model per document, then FastAPI's
+response_model validation and the stdlib JSON encoder. "fast" is
+shape_rows() + FastJSONResponse. Documents are synthetic TravelRequests
+as read from Mongo, so database time is not included:
+
+    python backend/scripts/benchmark_list_serialization.py
+    python backend/scripts/benchmark_list_serialization.py --rows 1000 10000 --runs 20
+"""
+
+import argparse
+import asyncio
+import gzip
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def sample_request_docs(count: int) -> List[dict]:
+    return [
+        {
+            "id": f"req-{i:06d}",
+            "client_id": f"client-{i % 300}",
+            "title": f"Trip {i} to Kerala",
+            "people_count": 2 + i % 5,
+            "budget_min": 40000.0 + i,
+            "budget_max": 90000.0 + i,
+            "start_date": "2025-03-18",
+            "end_date": "2025-03-24",
+            "is_holiday_package_required": i % 2 == 0,
+            "is_hotel_booking_required": True,
+            "destination": "Kerala",
+            "source": "Mumbai",
+            "type_of_travel": ["family", "leisure"],
+            "special_requirements": "Sea-facing rooms if available",
+            "status": "PENDING",
+            "assigned_salesperson_id": f"sales-{i % 12}",
+            "quotations": [],
+            "created_by": f"client-{i % 300}",
+            "created_at": f"2025-02-{i % 28 + 1:02d}T10:00:00+00:00",
+            "updated_at": f"2025-02-{i % 28 + 1:02d}T12:00:00+00:00",
+            "is_salesperson_validated": False,
+        }
+        for i in range(count)
+    ]
+
+
+def _time_runs(render, runs: int) -> Tuple[List[float], bytes]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = render()
+        timings.append(time.perf_counter() - started)
+    return timings, body
+
+
+def run(rows: int, runs: int) -> List[dict]:
+    sys.path.insert(0, str(ROOT_DIR))
+    import server
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    docs = sample_request_docs(rows)
+    field = create_model_field(name="Response", type_=List[server.TravelRequest], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def model_path() -> bytes:
+        content = [server.TravelRequest(**doc) for doc in docs]
+        encoded = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return JSONResponse(encoded).body
+
+    def fast_path() -> bytes:
+        return server.fast_json_response(server.shape_rows(docs, server.TravelRequest)).body
+
+    results = []
+    for name, render in (("model", model_path), ("fast", fast_path)):
+        timings, body = _time_runs(render, runs)
+        median = statistics.median(timings)
+        results.append({
+            "path": name,
+            "rows": rows,
+            "median_ms": median * 1000,
+            "per_row_us": median / rows * 1e6,
+            "body_kb": len(body) / 1024,
+            "gzip_kb": len(gzip.compress(body, 6)) / 1024,
+        })
+    loop.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'path':<8}{'rows':>8}{'median ms':>12}{'per row us':>12}{'body KB':>10}{'gzip KB':>10}")
+    for rows in args.rows:
+        results = run(rows, args.runs)
+        for r in results:
+            print(
+                f"{r['path']:<8}{r['rows']:>8}{r['median_ms']:>12.1f}{r['per_row_us']:>12.2f}"
+                f"{r['body_kb']:>10.1f}{r['gzip_kb']:>10.1f}"
+            )
+        print(f"{'':<8}{'':>8}{'speedup':>12}{results[0]['median_ms'] / results[1]['median_ms']:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Side-by-side benchmark of the quotation PDF engines.
+
+Each engine runs in its own process so their memory doesn't mix. Reports
+render latency, peak resident memory of the process tree (including the
+Chromium browser processes) and output size:
+
+    python backend/scripts/benchmark_pdf_renderers.py --runs 20
+    python backend/scripts/benchmark_pdf_renderers.py --data quotation.json --engines weasyprint
+
+--data takes a JSON dump of build_quotation_pdf_data() output; without it a
+synthetic 7-day itinerary is used. Rendering bypasses the PDF cache.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def sample_quotation_data(days: int = 7):
+    return {
+        "id": "benchmark",
+        "tripTitle": "Kerala Backwaters & Hills",
+        "city": "Kochi",
+        "bookingRef": "TRV-BENCH-001",
+        "customerName": "Benchmark Customer",
+        "dates": "1st Mar, 25 - 7th Mar, 25",
+        "coverImage": "",
+        "salesperson": {"name": "Sales Executive", "email": "sales@travel.com", "phone": "+91 9876543210", "photo": ""},
+        "summary": {
+            "duration": f"{days} Days / {days - 1} Nights",
+            "travelers": 2,
+            "rating": 4.8,
+            "highlights": ["Houseboat stay", "Tea plantation tour", "Kathakali show"]
+        },
+        "pricing": {
+            "subtotal": 120000, "taxes": 21600, "discount": 5000,
+            "total": 136600, "perPerson": 68300, "depositDue": 40980, "currency": "INR"
+        },
+        "days": [
+            {
+                "dayNumber": day,
+                "date": f"{day} Mar 2025",
+                "location": "Munnar" if day % 2 else "Alleppey",
+                "meals": {"breakfast": "Included", "lunch": "Not Included", "dinner": "Included"},
+                "hotel": {
+                    "id": f"hotel-{day % 3}",
+                    "name": f"Heritage Resort {day % 3}",
+                    "stars": 4,
+                    "image": "",
+                    "address": "Kerala, India",
+                    "amenities": ["Pool", "Spa", "Wi-Fi"]
+                },
+                "activities": [
+                    {
+                        "id": f"act-{day}-{index}",
+                        "time": f"{9 + 3 * index}:00",
+                        "title": f"Activity {index + 1} on day {day}",
+                        "description": "Guided experience with a local expert. " * 3,
+                        "meetingPoint": "Hotel lobby",
+                        "type": "included" if index % 2 == 0 else "optional"
+                    }
+                    for index in range(3)
+                ]
+            }
+            for day in range(1, days + 1)
+        ],
+        "inclusions": ["Airport transfers", "Daily breakfast", "Sightseeing by private car"],
+        "exclusions": ["Flights", "Personal expenses"],
+        "detailedTerms": "Standard terms apply. " * 40,
+        "privacyPolicy": "We respect your privacy. " * 20
+    }
+
+
+def _process_tree_rss_kb(root_pid: int) -> int:
+    """Resident memory of a process and all its descendants, from /proc."""
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        pid = int(entry)
+        children.setdefault(int(status["PPid"]), []).append(pid)
+        rss[pid] = int(status.get("VmRSS", "0 kB").split()[0])
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class PeakMemory:
+    """Samples the process tree's RSS in the background and keeps the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, _process_tree_rss_kb(os.getpid()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def run_engine(engine: str, runs: int, data: dict) -> dict:
+    sys.path.insert(0, str(ROOT_DIR))
+    import server
+
+    renderer = server.get_pdf_renderer(engine)
+    html = server.pdf_templates.render(renderer.template_name, data=data, assets=server.pdf_assets.load())
+
+    with PeakMemory() as memory:
+        started = time.perf_counter()
+        await renderer.start()
+        # The first render includes browser/font warm-up, report it separately
+        pdf_bytes = await renderer.render(html)
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        latencies = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            pdf_bytes = await renderer.render(html)
+            latencies.append((time.perf_counter() - started) * 1000)
+        await renderer.close()
+
+    latencies.sort()
+    return {
+        "engine": engine,
+        "runs": runs,
+        "cold_ms": cold_ms,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "mean_ms": statistics.mean(latencies),
+        "peak_rss_mb": memory.peak_kb / 1024,
+        "pdf_kb": len(pdf_bytes) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["chromium", "weasyprint"])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--data", type=Path, help="JSON file with quotation PDF data")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    data = json.loads(args.data.read_text()) if args.data else sample_quotation_data()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_engine(args.child, args.runs, data))))
+        return
+
+    results = []
+    for engine in args.engines:
+        command = [sys.executable, __file__, "--child", engine, "--runs", str(args.runs)]
+        if args.data:
+            command += ["--data", str(args.data)]
+        proc = subprocess.run(command, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{engine}: failed\n{proc.stderr.strip()}", file=sys.stderr)
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'engine':<12}{'runs':>6}{'cold ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'peak RSS MB':>13}{'PDF KB':>10}")
+    for r in results:
+        print(
+            f"{r['engine']:<12}{r['runs']:>6}{r['cold_ms']:>10.0f}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}"
+            f"{r['mean_ms']:>10.0f}{r['peak_rss_mb']:>13.1f}{r['pdf_kb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
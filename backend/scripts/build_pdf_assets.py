@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Build the offline asset pack for the quotation PDF template.
+
+Compiles the Tailwind CSS actually used by templates/*.html, and vendors the
+Google Fonts and the QR code script into templates/assets/ so PDF renders
+never touch the network. Run it on a machine with network access and commit
+the output:
+
+    python backend/scripts/build_pdf_assets.py
+"""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import requests
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+ASSETS_DIR = ROOT_DIR / "templates" / "assets"
+FONTS_DIR = ASSETS_DIR / "fonts"
+
+TAILWIND_VERSION = "3.4.17"
+GOOGLE_FONTS_URL = (
+    "https://fonts.googleapis.com/css2"
+    "?family=Inter:wght@400;500;600;700&family=Playfair+Display:wght@700&display=swap"
+)
+QRCODE_JS_URL = "https://cdnjs.cloudflare.com/ajax/libs/qrcodejs/1.0.0/qrcode.min.js"
+
+# Google Fonts serves woff2 only to browsers it recognises
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Latin subsets cover everything the templates print
+FONT_FACE_RE = re.compile(r"/\* (?P<subset>[\w-]+) \*/\s*(?P<rule>@font-face\s*{[^}]*})")
+FONT_URL_RE = re.compile(r"url\((?P<url>https://[^)]+)\)")
+
+
+def build_tailwind():
+    print(f"Compiling Tailwind CSS {TAILWIND_VERSION} for PDF templates...")
+    subprocess.run(
+        [
+            "npx", "--yes", f"tailwindcss@{TAILWIND_VERSION}",
+            "-c", "tailwind.config.js",
+            "-i", "tailwind.input.css",
+            "-o", "tailwind.css",
+            "--minify",
+        ],
+        cwd=ASSETS_DIR,
+        check=True,
+    )
+
+
+def build_fonts():
+    print("Vendoring Google Fonts...")
+    response = requests.get(GOOGLE_FONTS_URL, headers={"User-Agent": BROWSER_USER_AGENT}, timeout=30)
+    response.raise_for_status()
+
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    rules = []
+    for match in FONT_FACE_RE.finditer(response.text):
+        if match.group("subset") != "latin":
+            continue
+        rule = match.group("rule")
+        family = re.search(r"font-family:\s*'([^']+)'", rule).group(1)
+        weight = re.search(r"font-weight:\s*(\d+)", rule).group(1)
+        font_url = FONT_URL_RE.search(rule).group("url")
+
+        filename = f"{family.lower().replace(' ', '-')}-{weight}.woff2"
+        font_response = requests.get(font_url, timeout=30)
+        font_response.raise_for_status()
+        (FONTS_DIR / filename).write_bytes(font_response.content)
+
+        rules.append(FONT_URL_RE.sub(f"url(fonts/{filename})", rule))
+        print(f"  {filename}")
+
+    if not rules:
+        raise RuntimeError("No latin @font-face rules found in Google Fonts response")
+    (ASSETS_DIR / "fonts.css").write_text("\n".join(rules) + "\n", encoding="utf-8")
+
+
+def build_scripts():
+    print("Vendoring qrcode.min.js...")
+    response = requests.get(QRCODE_JS_URL, timeout=30)
+    response.raise_for_status()
+    (ASSETS_DIR / "qrcode.min.js").write_bytes(response.content)
+
+
+def main():
+    build_tailwind()
+    build_fonts()
+    build_scripts()
+    print(f"PDF assets written to {ASSETS_DIR}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Failed to build PDF assets: {e}", file=sys.stderr)
+        sys.exit(1)
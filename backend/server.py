@@ -1,35 +1,57 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Depends, Query, Request
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.datastructures import Headers
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, create_model
+from pydantic_core import PydanticUndefined
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Tuple, Type, get_args
+from functools import lru_cache
 import uuid
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 import asyncio
 import shutil
-from fastapi.responses import StreamingResponse, FileResponse
+import time
+import threading
+from fastapi.responses import StreamingResponse, FileResponse, Response
 import io
 import csv
 import json
+import orjson
 import hashlib
 import hmac
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+import re
+import base64
+import copy
+from PIL import Image as PILImage, ImageOps
+import requests as http_requests
 from playwright.async_api import async_playwright
-from jinja2 import Template
-import tempfile
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+try:
+    import weasyprint
+except (ImportError, OSError):
+    # Optional engine; OSError when the Pango system libraries are missing
+    weasyprint = None
 import jwt
 from jwt import InvalidTokenError, ExpiredSignatureError
 from bson import ObjectId
+from pymongo import ReturnDocument, IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from pymongo.results import UpdateResult, DeleteResult
+from contextlib import asynccontextmanager
+from abc import ABC, abstractmethod
+from email.utils import formatdate, parsedate_to_datetime
+from collections import deque, OrderedDict
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import invoice_pdf
 
 def serialize_mongo(doc):
     if not doc:
@@ -50,8 +72,36 @@ db = client[os.environ['DB_NAME']]
 SECRET_KEY = os.environ["JWT_SECRET"]
 ALGORITHM = "HS256"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Without the asset pack only PDF rendering is unavailable, the rest of the API still serves
+    try:
+        pdf_assets.load()
+    except PDFAssetsMissing as e:
+        logger.warning(f"PDF rendering disabled until the asset pack is built: {e}")
+    # Warm up the default PDF engine so the first PDF request doesn't pay for a browser boot
+    try:
+        await get_pdf_renderer().start()
+    except Exception as e:
+        logger.warning(f"PDF renderer '{PDF_RENDERER}' not started, will retry on first PDF request: {e}")
+    try:
+        await bootstrap_database(db)
+    except Exception as e:
+        logger.error(f"Database bootstrap failed: {e}")
+    invoice_pdf_pool.start()
+    try:
+        await pdf_job_queue.start()
+    except Exception as e:
+        logger.error(f"PDF job queue not started, queued renders will wait for the next start: {e}")
+    yield
+    await pdf_job_queue.stop()
+    await invoice_pdf_materializer.close()
+    invoice_pdf_pool.close()
+    for renderer in pdf_renderers.values():
+        await renderer.close()
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -258,6 +308,7 @@ class Quotation(BaseModel):
     status: QuotationStatus = QuotationStatus.DRAFT
     expiry_date: Optional[str] = None
     published_at: Optional[str] = None
+    accepted_at: Optional[str] = None
     detailed_quotation_data: QuotationData
     cost_breakup: List[CostBreakupItem] = []
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
@@ -289,6 +340,8 @@ class Invoice(BaseModel):
     upi_id: Optional[str] = "travelcompany@upi"
     due_date: str
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    # Moves whenever a field printed on the invoice PDF changes
+    updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class Payment(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -319,6 +372,11 @@ class PaymentBreakup(BaseModel):
     paid_amount: float = 0.0
     remaining_amount: float
     description: Optional[str] = None
+    # Copied from the invoice's request so per-user overdue counts need no joins; see sync_request_owners
+    request_id: Optional[str] = None
+    client_id: Optional[str] = None
+    assigned_salesperson_id: Optional[str] = None
+    assigned_operation_id: Optional[str] = None
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
@@ -412,6 +470,1003 @@ class QuoatationPDFData(BaseModel):
     privacyPolicy: Optional[str] = None
     testimonials: Optional[List[Testimonial]] = None
 
+# ============================================================================
+# Database: Indexes and Migrations
+# ============================================================================
+
+def _index(*keys, **options) -> IndexModel:
+    """IndexModel from (field, direction) pairs, or bare field names for ascending."""
+    spec = [(key, ASCENDING) if isinstance(key, str) else key for key in keys]
+    return IndexModel(spec, **options)
+
+
+# Finished PDF jobs are deleted by a TTL index this long after they finish
+PDF_JOB_RETENTION_SECONDS = int(os.environ.get('PDF_JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))
+
+# Indexes every collection needs for the queries in this file. create_indexes
+# is idempotent, so adding an entry here is all it takes to ship a new index.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        _index("id", unique=True),
+        _index("email", unique=True),
+        _index("role", "is_active"),
+        _index("role", ("created_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "requests": [
+        _index("id", unique=True),
+        _index(("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("client_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("assigned_salesperson_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("assigned_operation_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("assigned_salesperson_id", "status", ("created_at", DESCENDING)),
+        _index("assigned_operation_id", "status", ("created_at", DESCENDING)),
+        _index("status"),
+    ],
+    "quotations": [
+        _index("id", unique=True),
+        _index("request_id", "status"),
+        _index("status", "expiry_date"),
+        _index("status", "accepted_at", "id"),
+        _index("request_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index(("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("assigned_operation_id", "status", "expiry_date"),
+        _index("assigned_salesperson_id", "status"),
+    ],
+    "invoices": [
+        _index("id", unique=True),
+        _index("quotation_id"),
+        _index("request_id"),
+        _index("has_breakup"),
+        _index("created_at"),
+    ],
+    "payments": [
+        _index("id", unique=True),
+        _index("invoice_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("status", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("method", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index(("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("request_id"),
+        _index("assigned_operation_id", "status"),
+    ],
+    "payment_breakups": [
+        _index("id", unique=True),
+        _index("invoice_id", "due_date"),
+        _index("status", "due_date"),
+        _index("request_id"),
+        _index("client_id", "status", "due_date"),
+        _index("assigned_salesperson_id", "status", "due_date"),
+        _index("assigned_operation_id", "status", "due_date"),
+    ],
+    "payment_allocations": [
+        _index("id", unique=True),
+        _index("breakup_id", "allocated_at"),
+        _index("payment_id"),
+        _index("invoice_id"),
+    ],
+    "messages": [
+        _index("id", unique=True),
+        _index("request_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "activities": [
+        _index("id", unique=True),
+        _index("request_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index(("created_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "notifications": [
+        _index("id", unique=True),
+        _index("user_id", ("created_at", DESCENDING), ("id", DESCENDING)),
+        _index("user_id", "is_read", ("created_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "leaves": [
+        _index("id", unique=True),
+        _index("backup_user_id", "status", "start_date"),
+        _index("user_id", "status", "start_date"),
+        _index("status", "start_date"),
+        _index(("start_date", DESCENDING), ("id", DESCENDING)),
+        _index("user_id", ("start_date", DESCENDING), ("id", DESCENDING)),
+        _index("status", ("start_date", DESCENDING), ("id", DESCENDING)),
+    ],
+    "catalog": [
+        _index("id", unique=True),
+        _index("type", "destination"),
+        _index("name", "id"),
+        _index("type", "name", "id"),
+        _index("destination", "name", "id"),
+    ],
+    "pdf_jobs": [
+        _index("id", unique=True),
+        _index("dedupe_key", unique=True, sparse=True),
+        _index("status", "run_after"),
+        _index("status", "locked_at"),
+        # Only set once a job is done or failed, so pending jobs never expire
+        _index("finished_at", expireAfterSeconds=PDF_JOB_RETENTION_SECONDS),
+    ],
+}
+
+
+def index_registry_version(indexes: Dict[str, List[IndexModel]]) -> str:
+    """Hash of the index registry, so startup can skip create_indexes when nothing changed."""
+    payload = json.dumps(
+        {name: [model.document for model in models] for name, models in indexes.items()},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+async def ensure_indexes(database, indexes: Dict[str, List[IndexModel]] = INDEXES):
+    """
+    Create any missing indexes. A collection whose indexes can't be built
+    (e.g. duplicate ids in old data) is logged and skipped so the app still
+    starts; the registry version isn't recorded then, so the next start retries.
+    """
+    version = index_registry_version(indexes)
+    if await database.schema_migrations.find_one({"_id": "indexes", "version": version}):
+        return
+
+    failed = []
+    for collection_name, models in indexes.items():
+        try:
+            await database[collection_name].create_indexes(models)
+        except PyMongoError as e:
+            failed.append(collection_name)
+            logging.getLogger(__name__).error(f"Indexes for {collection_name} not created: {e}")
+
+    if not failed:
+        await database.schema_migrations.update_one(
+            {"_id": "indexes"},
+            {"$set": {"version": version, "applied_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True
+        )
+
+
+class Migration:
+    def __init__(self, version: int, name: str, apply: Callable[[Any], Awaitable[None]]):
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+
+# Data migrations, applied once each in version order and recorded in schema_migrations
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Register a one-off data migration."""
+    def register(apply: Callable[[Any], Awaitable[None]]):
+        if any(existing.version == version for existing in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, name, apply))
+        return apply
+    return register
+
+
+async def apply_migrations(database, migrations: List[Migration] = None):
+    migrations = MIGRATIONS if migrations is None else migrations
+    applied = {
+        doc["_id"] async for doc in database.schema_migrations.find({"_id": {"$type": "int"}}, {"_id": 1})
+    }
+    for item in sorted(migrations, key=lambda m: m.version):
+        if item.version in applied:
+            continue
+        logging.getLogger(__name__).info(f"Applying migration {item.version}: {item.name}")
+        await item.apply(database)
+        try:
+            await database.schema_migrations.insert_one({
+                "_id": item.version,
+                "name": item.name,
+                "applied_at": datetime.now(timezone.utc).isoformat()
+            })
+        except DuplicateKeyError:
+            # Another worker applied it concurrently; migrations are written to be re-runnable
+            pass
+
+
+async def bootstrap_database(database):
+    await ensure_indexes(database)
+    await apply_migrations(database)
+
+
+# ============================================================================
+# Keyset Pagination
+# ============================================================================
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque cursor for the sort key values of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """
+    Rows strictly after `values` in `sort` order; the last sort field must be
+    unique. Missing and null sort values order first, as Mongo sorts them.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev: value for (prev, _), value in zip(sort[:i], values)}
+        value = values[i]
+        if direction == ASCENDING:
+            clause[field] = {"$ne": None} if value is None else {"$gt": value}
+        elif value is None:
+            # Nothing sorts below null
+            continue
+        elif i < len(sort) - 1:
+            clause["$or"] = [{field: {"$lt": value}}, {field: None}]
+        else:
+            clause[field] = {"$lt": value}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def _null_first(value: Any) -> Tuple[bool, Any]:
+    """In-memory sort key matching Mongo's placement of null sort values."""
+    return value is not None, value
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort key whitelists; every key ends in `id` so the order is total
+NEWEST_FIRST = {
+    "-created_at": [("created_at", DESCENDING), ("id", DESCENDING)],
+    "created_at": [("created_at", ASCENDING), ("id", ASCENDING)],
+}
+
+
+class Page:
+    """
+    One page of a keyset-paginated list, built by the `paginate` dependency.
+    `fetch` reads at most `limit` documents and, when there are more, sets
+    `next_cursor` and the X-Next-Cursor response header.
+    """
+
+    def __init__(self, sort_name: str, sort: List[Tuple[str, int]], limit: int,
+                 after: Optional[List[Any]] = None, response: Optional[Response] = None):
+        self.sort_name = sort_name
+        self.sort = sort
+        self.limit = limit
+        self.after = after
+        self.response = response
+        self.next_cursor: Optional[str] = None
+
+    async def fetch(self, collection, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        if projection and any(value for key, value in projection.items() if key != "_id"):
+            # Inclusion projections still need the sort key to build the cursor
+            projection = {**projection, **{field: 1 for field, _ in self.sort}}
+        if self.after is not None:
+            query = {"$and": [query, keyset_filter(self.sort, self.after)]}
+        # One extra row tells us whether there is a next page
+        docs = await collection.find(query, projection).sort(self.sort).limit(self.limit + 1).to_list(self.limit + 1)
+        if len(docs) > self.limit:
+            docs = docs[:self.limit]
+            self._set_next_cursor(docs[-1])
+        return docs
+
+    def select(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """`fetch` over documents already in memory."""
+        if self.after is not None:
+            docs = [doc for doc in docs if self._is_after(doc)]
+        # Stable sorts applied last key first give the combined order
+        for field, direction in reversed(self.sort):
+            docs = sorted(docs, key=lambda doc: _null_first(doc.get(field)), reverse=direction == DESCENDING)
+        if len(docs) > self.limit:
+            docs = docs[:self.limit]
+            self._set_next_cursor(docs[-1])
+        return docs
+
+    def _is_after(self, doc: Dict[str, Any]) -> bool:
+        for (field, direction), value in zip(self.sort, self.after):
+            if doc.get(field) != value:
+                key, last = _null_first(doc.get(field)), _null_first(value)
+                return key > last if direction == ASCENDING else key < last
+        return False
+
+    def _set_next_cursor(self, last: Dict[str, Any]):
+        self.next_cursor = encode_cursor([self.sort_name] + [last.get(field) for field, _ in self.sort])
+        if self.response is not None:
+            self.response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+
+
+def paginate(sorts: Dict[str, List[Tuple[str, int]]], default_limit: int, max_limit: Optional[int] = None):
+    """
+    Dependency resolving `cursor`, `limit` and `sort` query parameters into a
+    Page. The first entry of `sorts` is the default order. A cursor is only
+    valid for the sort it was issued under.
+    """
+    default_sort = next(iter(sorts))
+    max_limit = max_limit or default_limit
+
+    def dependency(
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: int = Query(default_limit, ge=1, le=max_limit),
+        sort: str = default_sort
+    ) -> Page:
+        if sort not in sorts:
+            raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(sorts)}")
+        after = None
+        if cursor:
+            values = decode_cursor(cursor, len(sorts[sort]) + 1)
+            if values[0] != sort:
+                raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+            after = values[1:]
+        return Page(sort, sorts[sort], limit, after, response)
+
+    return dependency
+
+
+# ============================================================================
+# Sparse Fieldsets
+# ============================================================================
+
+ALL_FIELDS = "*"
+
+
+def fields_projection(
+    fields: Optional[str],
+    model: Type[BaseModel],
+    default: Optional[List[str]] = None,
+    required: Tuple[str, ...] = ("id",)
+) -> Optional[Dict[str, int]]:
+    """
+    Mongo projection for a comma-separated `fields=` parameter. Paths may
+    reach into nested documents (`detailed_quotation_data.pricing`) but must
+    start at a field of `model`; `required` fields are always read. Without
+    `fields` the endpoint's `default` applies, and `fields=*` (or a None
+    default) reads the whole document, returned as None.
+    """
+    if fields is None:
+        paths = default
+    elif fields.strip() == ALL_FIELDS:
+        paths = None
+    else:
+        paths = [path.strip() for path in fields.split(",") if path.strip()]
+        unknown = sorted({path for path in paths if path.split(".", 1)[0] not in model.model_fields})
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if paths is None:
+        return None
+    # A path and its parent can't both be projected; the parent wins
+    paths = set(paths) | set(required)
+    paths = {path for path in paths if not any(path.startswith(f"{other}.") for other in paths)}
+    return {"_id": 0, **{path: 1 for path in sorted(paths)}}
+
+
+def _has_model(annotation) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_has_model(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    `model` with every field optional, for responses built from a projection.
+    Nested models are left unvalidated since a path may select part of them.
+    Pair with `response_model_exclude_unset=True` so unread fields are omitted.
+    """
+    return create_model(
+        f"{model.__name__}Fields",
+        **{
+            name: (Optional[Any] if _has_model(field.annotation) else Optional[field.annotation], None)
+            for name, field in model.model_fields.items()
+        }
+    )
+
+
+def shape_documents(docs: List[Dict[str, Any]], model: Type[BaseModel], projection: Optional[Dict[str, int]]) -> List[Dict[str, Any]]:
+    """Full documents go through `model` for its defaults; projected ones are returned as read."""
+    if projection is None:
+        return [model(**doc).model_dump() for doc in docs]
+    return docs
+
+
+# ============================================================================
+# Fast JSON Responses
+# ============================================================================
+
+class FastJSONResponse(Response):
+    """JSON encoded with orjson; values it has no encoding for (ObjectId) become strings."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def _model_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Any, Optional[Callable[[], Any]], Optional[TypeAdapter]], ...]:
+    """Each field's default, default factory, and a validator if it holds nested models."""
+    return tuple(
+        (
+            name,
+            None if field.default is PydanticUndefined else field.default,
+            field.default_factory,
+            TypeAdapter(field.annotation) if _has_model(field.annotation) else None,
+        )
+        for name, field in model.model_fields.items()
+    )
+
+
+def model_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection reading just the fields of `model`."""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+def shape_rows(docs: List[Dict[str, Any]], model: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """
+    Documents cut down to the fields of `model`, with its defaults filled in,
+    without building the model itself. Only fields holding nested models are
+    validated, so older documents still get the nested defaults and coercion.
+    """
+    fields = _model_fields(model)
+    rows = []
+    for doc in docs:
+        row = {}
+        for name, default, factory, adapter in fields:
+            if name not in doc:
+                row[name] = factory() if factory is not None else default
+            elif adapter is not None:
+                row[name] = adapter.dump_python(adapter.validate_python(doc[name]))
+            else:
+                row[name] = doc[name]
+        rows.append(row)
+    return rows
+
+
+def fast_json_response(rows: List[Dict[str, Any]], response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    `rows` encoded straight to JSON, bypassing `response_model` validation,
+    which then only documents the endpoint. Headers that dependencies set on
+    the injected `response` (X-Next-Cursor, ETag) are carried over.
+    """
+    fast = FastJSONResponse(rows)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                fast.headers[key] = value
+    return fast
+
+
+class JSONGZipResponder(GZipResponder):
+    """Compresses JSON bodies only; anything else is passed through as sent."""
+
+    async def send_with_gzip(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if not headers.get("content-type", "").startswith("application/json") or message["status"] == 206:
+                # PDFs, byte ranges and ZIP streams must keep their exact bytes
+                # and lengths, or resumed downloads stop lining up
+                self.content_encoding_set = True
+                self.initial_message = message
+                return
+        await super().send_with_gzip(message)
+
+
+class JSONGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware limited to JSON responses, for the large list endpoints."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = JSONGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# ============================================================================
+# Caching
+# ============================================================================
+
+class TTLCache:
+    """
+    Async results kept per key for `ttl` seconds. Concurrent misses for the
+    same key share one computation; failures are not cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._inflight: Dict[Any, asyncio.Future] = {}
+
+    async def get(self, key, compute: Callable[[], Awaitable[Any]]):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._inflight[key] = asyncio.ensure_future(self._fill(key, compute))
+        # Shielded so one caller disconnecting doesn't cancel the others' result
+        return await asyncio.shield(future)
+
+    async def _fill(self, key, compute):
+        try:
+            value = await compute()
+            now = time.monotonic()
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (now + self.ttl, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+async def read_cache_version(name: str, database=None) -> int:
+    """Version stamp for a process-local cache; see bump_cache_version."""
+    database = database if database is not None else db
+    doc = await database.cache_versions.find_one({"_id": name})
+    return doc["version"] if doc else 0
+
+
+async def read_cache_versions(names: List[str], database=None) -> Dict[str, int]:
+    """Several version stamps in one query."""
+    database = database if database is not None else db
+    docs = await database.cache_versions.find({"_id": {"$in": list(names)}}).to_list(None)
+    found = {doc["_id"]: doc["version"] for doc in docs}
+    return {name: found.get(name, 0) for name in names}
+
+
+async def bump_cache_version(name: str, database=None) -> int:
+    """Tell every worker that its copy of `name` is stale."""
+    database = database if database is not None else db
+    doc = await database.cache_versions.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
+
+
+class CacheVersion:
+    """
+    Watches one version stamp, reading it at most every `interval` seconds,
+    so a process-local cache can tell when another worker has changed the
+    data behind it.
+    """
+
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+
+    async def changed(self) -> bool:
+        """True the first time, and whenever the stamp has moved since the last check."""
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return False
+        self._checked_at = now
+        version = await read_cache_version(self.name)
+        if version == self._version:
+            return False
+        self._version = version
+        return True
+
+    @property
+    def value(self) -> Optional[int]:
+        """The stamp as of the last check, or None before the first one."""
+        return self._version
+
+    async def bump(self):
+        version = await bump_cache_version(self.name)
+        if self._version is not None and version == self._version + 1:
+            # Only our own write happened; the caller has already updated its copy
+            self._version = version
+        else:
+            # Another worker wrote in between, so the next check must reload
+            self.reset()
+
+    def observe(self, version: int):
+        """Catch up with a stamp read elsewhere: reload on the next check if we hold an older one."""
+        if self._version is None or self._version < version:
+            self.reset()
+
+    def reset(self):
+        self._version = None
+        self._checked_at = float("-inf")
+
+
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', '2048'))
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', '300'))
+USER_CACHE_VERSION_CHECK = float(os.environ.get('USER_CACHE_VERSION_CHECK', '2'))
+
+
+class UserDirectory:
+    """
+    Process-local LRU of user documents (without passwords) by id. Entries
+    live for `ttl` seconds. Writes call `invalidate`, which also bumps the
+    "users" version stamp; other workers notice within `version_check`
+    seconds and drop their copies. Unknown ids are cached as misses too.
+    """
+
+    def __init__(self, max_entries: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL,
+                 version_check: float = USER_CACHE_VERSION_CHECK):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = CacheVersion("users", version_check)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+
+    async def get(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not user_id:
+            return None
+        return (await self.get_many([user_id])).get(user_id)
+
+    async def get_many(self, user_ids) -> Dict[str, Dict[str, Any]]:
+        """Users by id for every id that exists, with at most one query for the ids not cached."""
+        if await self.version.changed():
+            self._entries.clear()
+        now = time.monotonic()
+        found, missing = {}, []
+        for user_id in {user_id for user_id in user_ids if user_id}:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                if entry[1] is not None:
+                    found[user_id] = dict(entry[1])
+            else:
+                missing.append(user_id)
+        if missing:
+            loaded = {
+                user["id"]: user
+                async for user in db.users.find({"id": {"$in": missing}}, {"_id": 0, "password": 0})
+            }
+            expires = time.monotonic() + self.ttl
+            for user_id in missing:
+                self._entries[user_id] = (expires, loaded.get(user_id))
+                self._entries.move_to_end(user_id)
+                if user_id in loaded:
+                    found[user_id] = dict(loaded[user_id])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return found
+
+    async def invalidate(self, user_id: Optional[str] = None):
+        """
+        Drop one user (or everyone) and bump the stamp. If another worker
+        bumped it since our last check, the whole directory is reloaded.
+        """
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+        await self.version.bump()
+
+    def clear(self):
+        self._entries.clear()
+        self.version.reset()
+
+
+user_directory = UserDirectory()
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Whether an If-None-Match header lists `etag` (or `*`)."""
+    if not if_none_match:
+        return False
+    client_etags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in client_etags or "*" in client_etags
+
+
+ADMIN_SETTINGS_VERSION_CHECK = float(os.environ.get('ADMIN_SETTINGS_VERSION_CHECK', '5'))
+
+
+class AdminSettingsProvider:
+    """
+    The admin settings document, held in memory. It is reloaded only when
+    the "admin_settings" version stamp moves, which `invalidate` does after
+    every write, so workers pick up new settings within `version_check`
+    seconds and reads in between never touch Mongo.
+    """
+
+    def __init__(self, version_check: float = ADMIN_SETTINGS_VERSION_CHECK):
+        self.version = CacheVersion("admin_settings", version_check)
+        self._settings: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+
+    async def _load(self):
+        try:
+            self._settings = await db.admin_settings.find_one({}, {"_id": 0})
+        except BaseException:
+            # The stamp has already been taken; make the next caller retry
+            self.version.reset()
+            raise
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """A copy of the settings document, or None if none has been saved."""
+        # Check and load under one lock, so a concurrent caller waits for the
+        # load instead of reading the empty copy and seeding a second default
+        async with self._lock:
+            if await self.version.changed():
+                await self._load()
+        return copy.deepcopy(self._settings)
+
+    async def invalidate(self):
+        async with self._lock:
+            await self.version.bump()
+            await self._load()
+
+    def clear(self):
+        self._settings = None
+        self.version.reset()
+
+
+admin_settings_provider = AdminSettingsProvider()
+
+
+CATALOG_VERSION_CHECK = float(os.environ.get('CATALOG_VERSION_CHECK', '5'))
+
+
+class CatalogIndex:
+    """
+    The whole catalog, held in memory and indexed by type, destination and
+    supplier. Writes through `add` update the index in place; writes from
+    other workers are picked up through the "catalog" version stamp, which
+    also serves as the catalog-wide ETag once the reload it triggered is done.
+    """
+
+    INDEXED_FIELDS = ("type", "destination", "supplier")
+
+    def __init__(self, version_check: float = CATALOG_VERSION_CHECK):
+        self.version = CacheVersion("catalog", version_check)
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._index: Dict[str, Dict[Any, set]] = {field: {} for field in self.INDEXED_FIELDS}
+        self._loaded = False
+        self._published: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    def _insert(self, item: Dict[str, Any]):
+        previous = self._items.get(item["id"])
+        if previous is not None:
+            for field in self.INDEXED_FIELDS:
+                self._index[field].get(previous.get(field), set()).discard(item["id"])
+        self._items[item["id"]] = item
+        for field in self.INDEXED_FIELDS:
+            self._index[field].setdefault(item.get(field), set()).add(item["id"])
+
+    async def refresh(self):
+        # Check and reload under one lock, and publish the new stamp only once
+        # the reload is done, so nobody serves the old items under the new ETag
+        async with self._lock:
+            if not await self.version.changed() and self._loaded:
+                return
+            version = self.version.value
+            try:
+                items = await db.catalog.find({}, {"_id": 0}).to_list(None)
+            except BaseException:
+                self.version.reset()
+                raise
+            self._items = {}
+            self._index = {field: {} for field in self.INDEXED_FIELDS}
+            for item in items:
+                self._insert(item)
+            self._loaded = True
+            self._published = version
+
+    @property
+    def etag(self) -> str:
+        return f'"catalog-{self._published or 0}"'
+
+    async def find(self, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Items matching every given filter exactly; None filters are ignored."""
+        await self.refresh()
+        matches = [self._index[field].get(value, set()) for field, value in filters.items() if value is not None]
+        if not matches:
+            return list(self._items.values())
+        ids = set.intersection(*sorted(matches, key=len))
+        return [self._items[item_id] for item_id in ids]
+
+    async def add(self, item: Dict[str, Any]):
+        async with self._lock:
+            if self._loaded:
+                self._insert({key: value for key, value in item.items() if key != "_id"})
+            await self.version.bump()
+            if self._loaded and self.version.value is not None:
+                # Only our own write happened, and it is already in the index
+                self._published = self.version.value
+
+    async def invalidate(self):
+        async with self._lock:
+            self._loaded = False
+            await self.version.bump()
+
+    def clear(self):
+        self._items = {}
+        self._index = {field: {} for field in self.INDEXED_FIELDS}
+        self._loaded = False
+        self._published = None
+        self.version.reset()
+
+
+catalog_index = CatalogIndex()
+
+
+# ============================================================================
+# Conditional GET
+# ============================================================================
+
+# Collections whose writes bump a change stamp that conditional GETs can check
+CHANGE_TRACKED_COLLECTIONS = (
+    "requests", "quotations", "invoices", "payment_breakups", "payments", "notifications", "users"
+)
+WRITE_METHODS = frozenset({
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one", "delete_one", "delete_many",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete", "bulk_write",
+})
+
+
+def change_stamp(collection: str) -> str:
+    return f"changes:{collection}"
+
+
+def _wrote_anything(result) -> bool:
+    if isinstance(result, UpdateResult):
+        return bool(result.modified_count or result.upserted_id is not None)
+    if isinstance(result, DeleteResult):
+        return bool(result.deleted_count)
+    # find_one_and_* return None when nothing matched
+    return result is not None
+
+
+class ChangeTrackedCollection:
+    """A collection whose writes bump its change stamp once they succeed."""
+
+    def __init__(self, collection, database):
+        self._collection = collection
+        self._database = database
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in WRITE_METHODS:
+            return attr
+
+        async def write(*args, **kwargs):
+            result = await attr(*args, **kwargs)
+            if _wrote_anything(result):
+                await bump_cache_version(change_stamp(self._collection.name), self._database)
+            return result
+        return write
+
+
+class ChangeTrackingDatabase:
+    """Database wrapper handing out ChangeTrackedCollections for `tracked` names."""
+
+    def __init__(self, database, tracked: Tuple[str, ...] = CHANGE_TRACKED_COLLECTIONS):
+        self._database = database
+        self.tracked = frozenset(tracked)
+
+    def __getitem__(self, name: str):
+        collection = self._database[name]
+        return ChangeTrackedCollection(collection, self._database) if name in self.tracked else collection
+
+    def __getattr__(self, name: str):
+        if name in self.tracked:
+            return self[name]
+        return getattr(self._database, name)
+
+
+db = ChangeTrackingDatabase(db)
+
+
+class NotModified(Exception):
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers=exc.headers)
+
+
+def local_cache_versions() -> Dict[str, CacheVersion]:
+    """Process-local caches by the stamp they watch."""
+    return {"users": user_directory.version, "admin_settings": admin_settings_provider.version}
+
+
+def conditional(*stamps: str):
+    """
+    Dependency answering a GET with 304 Not Modified, before the endpoint
+    does any work, while none of `stamps` has moved since the client's ETag
+    was issued. The ETag also covers the URL and the caller's credentials.
+    Process-local caches behind a stamp are made to catch up with it, so a
+    new ETag never goes out with a body they still hold from before.
+    Declare it after the auth dependency so unauthorized callers still fail.
+    """
+    async def dependency(request: Request, response: Response, if_none_match: Optional[str] = Header(None)):
+        versions = await read_cache_versions(stamps)
+        caches = local_cache_versions()
+        for name, version in versions.items():
+            if name in caches:
+                caches[name].observe(version)
+        payload = json.dumps(
+            [request.url.path, request.url.query, request.headers.get("authorization"), versions],
+            sort_keys=True
+        )
+        etag = f'"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(etag, if_none_match):
+            raise NotModified(headers)
+        response.headers.update(headers)
+
+    return dependency
+
+
+# ============================================================================
+# Denormalized Request Owners
+# ============================================================================
+
+# Request fields copied onto documents that are filtered per user
+REQUEST_OWNER_FIELDS = ("client_id", "assigned_salesperson_id", "assigned_operation_id")
+
+
+def request_owners(request: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    request = request or {}
+    return {field: request.get(field) or None for field in REQUEST_OWNER_FIELDS}
+
+
+# Collections carrying `request_id` plus a copy of the request's owners
+REQUEST_OWNED_COLLECTIONS = ("payment_breakups", "quotations", "payments")
+
+
+async def invoice_owners(invoice: Dict[str, Any], database=None) -> Dict[str, Any]:
+    """`request_id` and owners for a document created against `invoice`."""
+    database = database if database is not None else db
+    request = await database.requests.find_one({"id": invoice.get("request_id")})
+    return {"request_id": invoice.get("request_id"), **request_owners(request)}
+
+
+async def sync_request_owners(request_id: str, database=None):
+    """Copy the request's current owners onto the documents filed under it. Call after (re)assigning a request."""
+    database = database if database is not None else db
+    request = await database.requests.find_one({"id": request_id}, {"_id": 0, **{f: 1 for f in REQUEST_OWNER_FIELDS}})
+    if not request:
+        return
+    owners = request_owners(request)
+    await asyncio.gather(*[
+        database[name].update_many({"request_id": request_id}, {"$set": owners})
+        for name in REQUEST_OWNED_COLLECTIONS
+    ])
+
+
+@migration(4, "Copy request owners onto quotations and payments")
+async def backfill_quotation_and_payment_owners(database):
+    async for request in database.requests.find({}, {"_id": 0, "id": 1, **{f: 1 for f in REQUEST_OWNER_FIELDS}}):
+        await database.quotations.update_many({"request_id": request["id"]}, {"$set": request_owners(request)})
+    async for invoice in database.invoices.find({}, {"_id": 0, "id": 1, "request_id": 1}):
+        await database.payments.update_many(
+            {"invoice_id": invoice["id"]},
+            {"$set": await invoice_owners(invoice, database)}
+        )
+
+
+@migration(1, "Copy request id and owners onto payment breakups")
+async def backfill_breakup_owners(database):
+    invoice_ids = await database.payment_breakups.distinct("invoice_id", {"request_id": {"$exists": False}})
+    async for invoice in database.invoices.find({"id": {"$in": invoice_ids}}, {"_id": 0, "id": 1, "request_id": 1}):
+        request = await database.requests.find_one({"id": invoice.get("request_id")}, {"_id": 0})
+        await database.payment_breakups.update_many(
+            {"invoice_id": invoice["id"]},
+            {"$set": {"request_id": invoice.get("request_id"), **request_owners(request)}}
+        )
+
+
 # Mock users for login
 MOCK_USERS = {
     "ops@travel.com": {"password": "ops123", "role": UserRole.OPERATIONS, "name": "Operations Manager", "id": "ops-001", "can_see_cost_breakup": True},
@@ -526,6 +1581,7 @@ async def register_customer(user_data: Dict[str, str]):
     }
     
     await db.users.insert_one(new_user)
+    await user_directory.invalidate(new_user["id"])
     return {"success": True, "message": "Account created successfully"}
 
 @api_router.post("/auth/login")
@@ -625,6 +1681,7 @@ async def quick_create_customer(customer_data: Dict[str, str]):
     }
     
     await db.users.insert_one(new_customer)
+    await user_directory.invalidate(new_customer["id"])
     
     # Return customer without password
     return {
@@ -688,23 +1745,25 @@ async def create_request(request: Dict[str, Any], current_user: Dict = Depends(g
     return newRequest
 
 @api_router.get("/requests", response_model=List[Any])
-async def get_requests(status: Optional[str] = None, assigned_to: Optional[str] = None, current_user: Dict = Depends(get_current_user)):
+async def get_requests(
+    status: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    page: Page = Depends(paginate(NEWEST_FIRST, 1000)),
+    current_user: Dict = Depends(get_current_user),
+    _: None = Depends(conditional(change_stamp("requests"), "users"))
+):
     role = current_user.get("role")
     user_id = current_user.get("sub")
     query = {}
     if role == UserRole.CUSTOMER:
         query["client_id"] = user_id
-        requests = await db.requests.find(query).sort("created_at", -1).to_list(1000)
+        requests = await page.fetch(db.requests, query)
         user_ids = set()
 
         for req in requests:
             if req.get("assigned_salesperson_id"):
                 user_ids.add(req["assigned_salesperson_id"])
-        users = await db.users.find(
-            {"id": {"$in": list(user_ids)}}
-        ).to_list(1000)
-
-        user_map = {str(u["id"]): u for u in users}
+        user_map = await user_directory.get_many(user_ids)
 
         response = []
 
@@ -745,7 +1804,7 @@ async def get_requests(status: Optional[str] = None, assigned_to: Optional[str]
         return response
     elif role == UserRole.SALES:
         query["assigned_salesperson_id"] = user_id
-        requests = await db.requests.find(query).sort("created_at", -1).to_list(1000)
+        requests = await page.fetch(db.requests, query)
         user_ids = set()
 
         for req in requests:
@@ -753,11 +1812,7 @@ async def get_requests(status: Optional[str] = None, assigned_to: Optional[str]
                 user_ids.add(req["client_id"])
             if req.get("assigned_salesperson_id"):
                 user_ids.add(req["assigned_salesperson_id"])
-        users = await db.users.find(
-            {"id": {"$in": list(user_ids)}}
-        ).to_list(1000)
-
-        user_map = {str(u["id"]): u for u in users}
+        user_map = await user_directory.get_many(user_ids)
 
         response = []
 
@@ -806,7 +1861,7 @@ async def get_requests(status: Optional[str] = None, assigned_to: Optional[str]
         return response
     elif role == UserRole.OPERATIONS:
         query["assigned_operation_id"] = user_id
-        requests = await db.requests.find(query).sort("created_at", -1).to_list(1000)
+        requests = await page.fetch(db.requests, query)
         user_ids = set()
 
         for req in requests:
@@ -814,11 +1869,7 @@ async def get_requests(status: Optional[str] = None, assigned_to: Optional[str]
                 user_ids.add(req["client_id"])
             if req.get("assigned_salesperson_id"):
                 user_ids.add(req["assigned_salesperson_id"])
-        users = await db.users.find(
-            {"id": {"$in": list(user_ids)}}
-        ).to_list(1000)
-
-        user_map = {str(u["id"]): u for u in users}
+        user_map = await user_directory.get_many(user_ids)
 
         response = []
 
@@ -852,8 +1903,8 @@ async def get_requests(status: Optional[str] = None, assigned_to: Optional[str]
         return response
     else:
         query = {}
-    requests = await db.requests.find(query).sort("created_at", -1).to_list(1000)
-    return [TravelRequest(**req) for req in requests]
+    requests = await page.fetch(db.requests, query, model_projection(TravelRequest))
+    return fast_json_response(shape_rows(requests, TravelRequest), page.response)
 
 @api_router.get("/requests/delegated")
 async def get_delegated_requests(current_user: Dict = Depends(get_current_user)):
@@ -907,11 +1958,7 @@ async def get_delegated_requests(current_user: Dict = Depends(get_current_user))
         if req.get("assigned_salesperson_id"):
             user_ids.add(req["assigned_salesperson_id"])
 
-    users = await db.users.find(
-        {"id": {"$in": list(user_ids)}}
-    ).to_list(1000)
-
-    user_map = {str(u["id"]): u for u in users}
+    user_map = await user_directory.get_many(user_ids)
     
     # Add delegation info to each request
     result = []
@@ -955,13 +2002,24 @@ async def get_delegated_requests(current_user: Dict = Depends(get_current_user))
     
     return result
 
+# The request page only summarises its quotations
+REQUEST_QUOTATION_PROJECTION = {
+    "_id": 0, "id": 1, "status": 1, "expiry_date": 1,
+    "detailed_quotation_data.pricing.depositDue": 1, "detailed_quotation_data.pricing.total": 1,
+}
+
+
 @api_router.get("/requests/{request_id}")
-async def get_request(request_id: str, current_user: Dict = Depends(get_current_user)):
+async def get_request(
+    request_id: str,
+    current_user: Dict = Depends(get_current_user),
+    _: None = Depends(conditional(change_stamp("requests"), change_stamp("quotations"), "users"))
+):
     request = await db.requests.find_one({"id": request_id})
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
-    client = await db.users.find_one({"id": request.get("client_id")})
+    client = await user_directory.get(request.get("client_id"))
     if client:
         request["client_name"] = client["name"]
         request["client_email"] = client["email"]
@@ -969,19 +2027,11 @@ async def get_request(request_id: str, current_user: Dict = Depends(get_current_
         request["client_country_code"] = client.get("country_code", "+91")
 
     # Format dates for display
-    if request.get("start_date") and request.get("end_date"):
-        try:
-            start = datetime.fromisoformat(request["start_date"].replace('Z', '+00:00'))
-            end = datetime.fromisoformat(request["end_date"].replace('Z', '+00:00'))
-            request["preferred_dates"] = f"{start.strftime('%d %b %Y')} - {end.strftime('%d %b %Y')}"
-        except:
-            request["preferred_dates"] = f"{request.get('start_date', 'TBD')} - {request.get('end_date', 'TBD')}"
-    else:
-        request["preferred_dates"] = "TBD"
+    request["preferred_dates"] = format_preferred_dates(request)
 
     filterQuotations = []
     if request["status"] == RequestStatus.ACCEPTED:
-        acceptedQuotation = await db.quotations.find_one({"request_id": request_id, "status": QuotationStatus.ACCEPTED})
+        acceptedQuotation = await db.quotations.find_one({"request_id": request_id, "status": QuotationStatus.ACCEPTED}, REQUEST_QUOTATION_PROJECTION)
         if acceptedQuotation:
             filterQuotations = [{
                 "status": acceptedQuotation["status"],
@@ -993,9 +2043,9 @@ async def get_request(request_id: str, current_user: Dict = Depends(get_current_
     else:
         if(current_user.get("role") == UserRole.OPERATIONS):
             global quotationsOptions
-            quotationsOptions = await db.quotations.find({"request_id": request_id}).to_list(1000)
+            quotationsOptions = await db.quotations.find({"request_id": request_id}, REQUEST_QUOTATION_PROJECTION).to_list(1000)
         elif(current_user.get("role") in [UserRole.SALES, UserRole.CUSTOMER] and (request.get("assigned_salesperson_id") == current_user.get("sub") or request.get("client_id") == current_user.get("sub"))):
-            quotationsOptions = await db.quotations.find({"request_id": request_id, "status": QuotationStatus.SENT}).to_list(1000)
+            quotationsOptions = await db.quotations.find({"request_id": request_id, "status": QuotationStatus.SENT}, REQUEST_QUOTATION_PROJECTION).to_list(1000)
         else:
             raise HTTPException(status_code=403, detail="Not authorized to view this request")
         for quotation in quotationsOptions:
@@ -1014,6 +2064,7 @@ async def get_request(request_id: str, current_user: Dict = Depends(get_current_
 async def update_request(request_id: str, request: TravelRequest):
     request.updated_at = datetime.now(timezone.utc).isoformat()
     await db.requests.update_one({"id": request_id}, {"$set": request.dict()})
+    await sync_request_owners(request_id)
     return request
 
 @api_router.post("/requests/{request_id}/validate")
@@ -1164,6 +2215,7 @@ async def assign_request_to_me(request_id: str, current_user: Dict = Depends(get
         {"id": request_id},
         query
     )
+    await sync_request_owners(request_id)
     
     # Create activity
     activity = Activity(
@@ -1184,7 +2236,9 @@ async def assign_request_to_me(request_id: str, current_user: Dict = Depends(get
 async def create_quotation(quotation: Quotation):
 
     quotation_dict = quotation.model_dump()
-    await db.quotations.insert_one(quotation_dict)
+    # Owners are stored alongside (not on the model) so full-document PUTs leave them alone
+    request = await db.requests.find_one({"id": quotation.request_id})
+    await db.quotations.insert_one({**quotation_dict, **request_owners(request)})
 
     request_id = quotation.request_id
     await db.requests.update_one(
@@ -1197,14 +2251,32 @@ async def create_quotation(quotation: Quotation):
     
     return quotation
 
-@api_router.get("/quotations", response_model=List[Quotation])
-async def get_quotations(request_id: Optional[str] = None):
+# What list screens need: everything but the itinerary, plus its headline fields
+QUOTATION_LIST_FIELDS = [
+    "id", "request_id", "status", "expiry_date", "published_at", "accepted_at", "cost_breakup",
+    "created_at", "updated_at",
+    "detailed_quotation_data.tripTitle", "detailed_quotation_data.city",
+    "detailed_quotation_data.bookingRef", "detailed_quotation_data.pricing",
+]
+
+
+@api_router.get("/quotations", response_model=List[partial_model(Quotation)], response_model_exclude_unset=True)
+async def get_quotations(
+    request_id: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields or dotted paths; * for whole documents"),
+    page: Page = Depends(paginate(NEWEST_FIRST, 1000))
+):
+    """Quotations newest first. Omits the itinerary days unless asked for via `fields`."""
     query = {}
     if request_id:
         query["request_id"] = request_id
     
-    quotations = await db.quotations.find(query).to_list(1000)
-    return [Quotation(**quot) for quot in quotations]
+    projection = fields_projection(fields, Quotation, QUOTATION_LIST_FIELDS)
+    if projection is None:
+        quotations = shape_rows(await page.fetch(db.quotations, query, model_projection(Quotation)), Quotation)
+    else:
+        quotations = await page.fetch(db.quotations, query, projection)
+    return fast_json_response(quotations, page.response)
 
 @api_router.get("/quotations/{quotation_id}/cost-breakup", response_model=List[CostBreakupItem])
 async def get_quotation(quotation_id: str, current_user: Dict = Depends(get_current_user)):
@@ -1230,6 +2302,17 @@ def get_day_suffix(day: int) -> str:
     else:
         return "th"
 
+# date range for display - 18 Mar 2024 - 25 Mar 2024
+def format_preferred_dates(request: Dict[str, Any]) -> str:
+    if not (request.get("start_date") and request.get("end_date")):
+        return "TBD"
+    try:
+        start = datetime.fromisoformat(request["start_date"].replace('Z', '+00:00'))
+        end = datetime.fromisoformat(request["end_date"].replace('Z', '+00:00'))
+        return f"{start.strftime('%d %b %Y')} - {end.strftime('%d %b %Y')}"
+    except ValueError:
+        return f"{request.get('start_date', 'TBD')} - {request.get('end_date', 'TBD')}"
+
 # date formatting helper - 18th Mar, 24 - 25th Mar, 24
 def formatDate(start_date_str: str, end_date_str: str) -> str:
     start_date = datetime.fromisoformat(start_date_str)
@@ -1238,22 +2321,749 @@ def formatDate(start_date_str: str, end_date_str: str) -> str:
     formatted_end = end_date.strftime("%d").lstrip("0") + get_day_suffix(end_date.day) + " " + end_date.strftime("%b, %y")
     return f"{formatted_start} - {formatted_end}"
 
-@api_router.get("/quotations/{quotation_id}/pdf")
-async def get_quotation_pdf(quotation_id: str):
-    quotation = await db.quotations.find_one({"id": quotation_id})
-    if not quotation:
-        raise HTTPException(status_code=404, detail="Quotation not found")
-    
-    request_id = quotation.get("request_id")
-    request = await db.requests.find_one({"id": request_id})
-    if not request:
-        raise HTTPException(status_code=404, detail="Request not found")
+
+# ============================================================================
+# PDF Rendering: Persistent Chromium Pool
+# ============================================================================
+
+PDF_POOL_SIZE = int(os.environ.get("PDF_POOL_SIZE", "2"))
+PDF_POOL_MAX_RENDERS = int(os.environ.get("PDF_POOL_MAX_RENDERS", "50"))
+PDF_POOL_ACQUIRE_TIMEOUT = float(os.environ.get("PDF_POOL_ACQUIRE_TIMEOUT", "30"))
+
+
+class PooledPage:
+    """A warm browser context and page checked out of the pool."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.renders = 0
+
+
+class ChromiumPool:
+    """
+    Keeps a single headless Chromium alive for the lifetime of the app and hands
+    out at most `size` warm pages at a time. Extra requests queue on the semaphore
+    instead of launching their own browser.
+
+    - Pages are health-checked on checkout and discarded if closed or crashed
+    - Each context is recycled after `max_renders` renders to keep memory flat
+    - The browser is relaunched if it disconnects
+    """
+
+    def __init__(self, size: int, max_renders: int, acquire_timeout: float):
+        self.size = size
+        self.max_renders = max_renders
+        self.acquire_timeout = acquire_timeout
+        self._playwright = None
+        self._browser = None
+        self._idle: List[PooledPage] = []
+        self._semaphore = asyncio.Semaphore(size)
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            try:
+                self._browser = await self._playwright.chromium.launch(
+                    headless=True,
+                    args=["--disable-dev-shm-usage"]
+                )
+            except Exception:
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self._idle = []
+
+    async def close(self):
+        async with self._lock:
+            for pooled in self._idle:
+                await self._discard(pooled)
+            self._idle = []
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def _is_healthy(self, pooled: PooledPage) -> bool:
+        return (
+            self._browser is not None
+            and self._browser.is_connected()
+            and not pooled.page.is_closed()
+            and pooled.renders < self.max_renders
+        )
+
+    async def _discard(self, pooled: PooledPage):
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
+
+    async def _checkout(self) -> PooledPage:
+        if self._browser is None or not self._browser.is_connected():
+            logger.warning("Chromium is not running, (re)launching browser for PDF pool")
+            self._browser = None
+            await self.start()
+
+        while self._idle:
+            pooled = self._idle.pop()
+            if self._is_healthy(pooled):
+                return pooled
+            await self._discard(pooled)
+
+        context = await self._browser.new_context()
+        page = await context.new_page()
+        return PooledPage(context, page)
+
+    async def _checkin(self, pooled: PooledPage, failed: bool):
+        pooled.renders += 1
+        if failed or not self._is_healthy(pooled):
+            await self._discard(pooled)
+        else:
+            self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a warm page, waiting up to `acquire_timeout` for a free slot."""
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="PDF renderer is busy. Please try again in a moment.")
+
+        pooled = None
+        failed = False
+        try:
+            pooled = await self._checkout()
+            yield pooled.page
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if pooled is not None:
+                await self._checkin(pooled, failed)
+            self._semaphore.release()
+
+
+pdf_browser_pool = ChromiumPool(
+    size=PDF_POOL_SIZE,
+    max_renders=PDF_POOL_MAX_RENDERS,
+    acquire_timeout=PDF_POOL_ACQUIRE_TIMEOUT
+)
+
+
+# ============================================================================
+# PDF Rendering: Template Registry
+# ============================================================================
+
+PDF_TEMPLATE_DIR = ROOT_DIR / 'templates'
+PDF_TEMPLATE_NAME = 'pdf_template.html'
+# Re-read templates from disk when they change (development only)
+PDF_TEMPLATE_HOT_RELOAD = os.environ.get("PDF_TEMPLATE_HOT_RELOAD", "false").lower() in ("1", "true", "yes")
+# Bump when render options (page format, margins, engine flags) change
+PDF_RENDER_VERSION = "1"
+
+
+class TemplateRegistry:
+    """
+    Shared Jinja environment for document templates.
+
+    Compiled templates are kept in the environment's in-memory cache and the
+    compiled bytecode is persisted, so a fresh worker doesn't re-parse the
+    template either. With hot reload on, edited templates are picked up on the
+    next render and their version changes accordingly.
+    """
+
+    def __init__(self, directory: Path, hot_reload: bool = False):
+        self.hot_reload = hot_reload
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            auto_reload=hot_reload,
+            cache_size=50,
+            bytecode_cache=FileSystemBytecodeCache()
+        )
+        self._versions: Dict[str, str] = {}
+
+    def get(self, name: str):
+        return self.env.get_template(name)
+
+    def version(self, name: str) -> str:
+        """Short hash of the template source, used to key rendered output."""
+        if self.hot_reload or name not in self._versions:
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            self._versions[name] = hashlib.sha256(
+                (source + PDF_RENDER_VERSION).encode("utf-8")
+            ).hexdigest()[:16]
+        return self._versions[name]
+
+    def render(self, name: str, **context) -> str:
+        return self.get(name).render(**context)
+
+
+pdf_templates = TemplateRegistry(PDF_TEMPLATE_DIR, hot_reload=PDF_TEMPLATE_HOT_RELOAD)
+
+
+class PDFAssetsMissing(RuntimeError):
+    pass
+
+
+class PDFAssetPack:
+    """
+    Precompiled Tailwind CSS, vendored fonts and scripts that get inlined into
+    the PDF templates, so renders make no network requests and can wait on
+    `load` instead of `networkidle`. Built by scripts/build_pdf_assets.py.
+    A missing file raises PDFAssetsMissing, which fails the render with a 503
+    rather than producing an unstyled PDF.
+    """
+
+    FONT_URL_RE = re.compile(r"url\((?P<name>fonts/[^)'\"]+)\)")
+
+    def __init__(self, directory: Path, hot_reload: bool = False):
+        self.directory = Path(directory)
+        self.hot_reload = hot_reload
+        self.css = ""
+        self.qrcode_js = ""
+        self.version = ""
+        self._loaded = False
+
+    def _read(self, name: str) -> str:
+        path = self.directory / name
+        if not path.is_file() or path.stat().st_size == 0:
+            raise PDFAssetsMissing(f"PDF asset {path} is missing, run scripts/build_pdf_assets.py")
+        return path.read_text(encoding="utf-8")
+
+    def _inline_fonts(self, css: str) -> str:
+        def to_data_uri(match):
+            font_path = self.directory / match.group("name")
+            if not font_path.is_file():
+                raise PDFAssetsMissing(f"PDF font {font_path} is missing, run scripts/build_pdf_assets.py")
+            encoded = base64.b64encode(font_path.read_bytes()).decode("ascii")
+            return f"url(data:font/woff2;base64,{encoded})"
+        return self.FONT_URL_RE.sub(to_data_uri, css)
+
+    def load(self) -> "PDFAssetPack":
+        if self._loaded and not self.hot_reload:
+            return self
+        fonts_css = self._inline_fonts(self._read("fonts.css"))
+        self.css = fonts_css + "\n" + self._read("tailwind.css")
+        self.qrcode_js = self._read("qrcode.min.js")
+        self.version = hashlib.sha256((self.css + self.qrcode_js).encode("utf-8")).hexdigest()[:16]
+        self._loaded = True
+        return self
+
+
+pdf_assets = PDFAssetPack(PDF_TEMPLATE_DIR / 'assets', hot_reload=PDF_TEMPLATE_HOT_RELOAD)
+
+
+# ============================================================================
+# PDF Rendering: Engines
+# ============================================================================
+
+PDF_TEMPLATE_STATIC_NAME = 'pdf_template_static.html'
+# Engine used when a request doesn't pick one: "chromium" or "weasyprint"
+PDF_RENDERER = os.environ.get("PDF_RENDERER", "chromium").lower()
+
+
+class PDFRenderer(ABC):
+    """Turns a rendered HTML document into PDF bytes."""
+
+    name = ""
+    template_name = PDF_TEMPLATE_NAME
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def version(self) -> str:
+        """Identifies the engine and template in the PDF cache key."""
+        version = self.name + pdf_templates.version(self.template_name)
+        if self.template_name != PDF_TEMPLATE_NAME:
+            # Variants extend the base template, so its edits change their output too
+            version += pdf_templates.version(PDF_TEMPLATE_NAME)
+        return version
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def render(self, html: str) -> bytes:
+        ...
+
+
+class ChromiumRenderer(PDFRenderer):
+    """Headless Chromium through the shared page pool. Runs the QR code script."""
+
+    name = "chromium"
+
+    def __init__(self, pool: ChromiumPool):
+        self.pool = pool
+
+    async def start(self):
+        await self.pool.start()
+
+    async def close(self):
+        await self.pool.close()
+
+    async def render(self, html: str) -> bytes:
+        # CSS, fonts and scripts are inlined, so there is nothing to wait for after `load`
+        async with self.pool.page() as page:
+            await page.set_content(html, wait_until='load')
+            return await page.pdf(
+                format='A4',
+                print_background=True,
+                margin={'top': '0', 'right': '0', 'bottom': '0', 'left': '0'}
+            )
+
+
+class WeasyPrintRenderer(PDFRenderer):
+    """
+    Pure-Python layout engine, no browser process. Doesn't run JavaScript, so
+    it renders the static template variant. Renders run in worker threads,
+    at most `concurrency` at a time.
+    """
+
+    name = "weasyprint"
+    template_name = PDF_TEMPLATE_STATIC_NAME
+    PAGE_CSS = "@page { size: A4; margin: 0 }"
+
+    def __init__(self, concurrency: int, acquire_timeout: float):
+        self.acquire_timeout = acquire_timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._page_css = None
+
+    @property
+    def available(self) -> bool:
+        return weasyprint is not None
+
+    def _write_pdf(self, html: str) -> bytes:
+        if self._page_css is None:
+            self._page_css = weasyprint.CSS(string=self.PAGE_CSS)
+        document = weasyprint.HTML(string=html, base_url=str(PDF_TEMPLATE_DIR))
+        return document.write_pdf(stylesheets=[self._page_css])
+
+    async def render(self, html: str) -> bytes:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="PDF renderer is busy. Please try again in a moment.")
+        try:
+            return await asyncio.to_thread(self._write_pdf, html)
+        finally:
+            self._semaphore.release()
+
+
+pdf_renderers: Dict[str, PDFRenderer] = {
+    "chromium": ChromiumRenderer(pdf_browser_pool),
+    "weasyprint": WeasyPrintRenderer(concurrency=PDF_POOL_SIZE, acquire_timeout=PDF_POOL_ACQUIRE_TIMEOUT),
+}
+
+
+def get_pdf_renderer(engine: Optional[str] = None) -> PDFRenderer:
+    name = (engine or PDF_RENDERER).lower()
+    renderer = pdf_renderers.get(name)
+    if renderer is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown PDF engine '{name}'. Use one of: {', '.join(pdf_renderers)}"
+        )
+    if not renderer.available:
+        raise HTTPException(status_code=503, detail=f"PDF engine '{name}' is not installed on this server")
+    return renderer
+
+
+# ============================================================================
+# PDF Rendering: Content-Addressed Cache
+# ============================================================================
+
+PDF_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR", ROOT_DIR / "pdf_cache"))
+PDF_CACHE_MAX_MB = int(os.environ.get("PDF_CACHE_MAX_MB", "1024"))
+
+
+class PDFCache:
+    """
+    Stores rendered PDFs on disk under the hash of their final render input.
+    Identical input always maps to the same file, so entries never go stale;
+    callers only need to forget which key a document currently points at.
+    Once the files pass `max_bytes` the oldest are deleted; a pointer to an
+    evicted key just renders again. Evicting by write time keeps mtimes,
+    and so Last-Modified, stable for the files that stay. The directory is
+    only scanned when a running byte total crosses the cap, and `write`
+    does blocking file I/O, so call it through asyncio.to_thread.
+    """
+
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Bytes on disk as of the last scan plus our writes since; None until the first scan
+        self._total_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(render_input: Dict[str, Any], template_version: str) -> str:
+        payload = json.dumps(
+            {"template": template_version, "data": render_input},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def write(self, key: str, content: bytes) -> Path:
+        path = self.path(key)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._total_bytes is not None:
+                    self._total_bytes += len(content)
+                if self._total_bytes is None or self._total_bytes > self.max_bytes:
+                    self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path):
+        # Other workers write to the same directory, so rescan for the real total
+        files = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                files.append((path.stat(), path))
+            except FileNotFoundError:
+                # Evicted concurrently by another worker
+                continue
+        total = sum(stat.st_size for stat, _ in files)
+        for stat, path in sorted(files, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+        self._total_bytes = total
+
+    def response(
+        self,
+        key: str,
+        filename: str,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None
+    ):
+        """Conditional, ranged download of `key`. Raises FileNotFoundError if it was evicted."""
+        path = self.path(key)
+        stat_result = path.stat()
+        etag = f'"{key}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "Cache-Control": "private, no-cache"
+        }
+        if if_none_match:
+            if etag_matches(etag, if_none_match):
+                return Response(status_code=304, headers=headers)
+        elif if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and int(stat_result.st_mtime) <= since.timestamp():
+                return Response(status_code=304, headers=headers)
+        return CachedFileResponse(
+            path,
+            media_type='application/pdf',
+            filename=filename,
+            headers=headers,
+            stat_result=stat_result
+        )
+
+
+class CachedFileResponse(FileResponse):
+    """FileResponse that also honours `If-Range` with the cache's content-hash ETag."""
+
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:
+        return http_if_range == self.headers.get("etag") or super()._should_use_range(http_if_range, stat_result)
+
+
+pdf_cache = PDFCache(PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_MB * 1024 * 1024)
+
+
+# ============================================================================
+# PDF Rendering: Image Cache
+# ============================================================================
+
+PDF_IMAGE_CACHE_DIR = Path(os.environ.get("PDF_IMAGE_CACHE_DIR", PDF_CACHE_DIR / "images"))
+PDF_IMAGE_CACHE_MAX_MB = int(os.environ.get("PDF_IMAGE_CACHE_MAX_MB", "200"))
+PDF_IMAGE_QUALITY = int(os.environ.get("PDF_IMAGE_QUALITY", "80"))
+# Device pixels per CSS pixel, so images stay sharp when the PDF is zoomed or printed
+PDF_IMAGE_SCALE = int(os.environ.get("PDF_IMAGE_SCALE", "2"))
+# Largest remote image we are willing to download
+PDF_IMAGE_MAX_FETCH_MB = int(os.environ.get("PDF_IMAGE_MAX_FETCH_MB", "15"))
+
+# Printed box (CSS px) of each image slot in pdf_template.html
+PDF_IMAGE_BOXES = {
+    "cover": (840, 1188),
+    "hotel": (372, 256),
+    "activity": (96, 96),
+    "avatar": (128, 128),
+}
+
+
+class ImageUnavailable(Exception):
+    """An image couldn't be fetched this time, but may be on a later try."""
+
+
+class ImageCache:
+    """
+    Fetches remote itinerary images once, crops/downsizes them to the box they
+    are printed in and keeps the JPEG on disk, so renders are deterministic and
+    PDFs don't embed full-resolution photos.
+
+    Layout under `directory`:
+    - refs/<sha256(url)>: content hash of the image last fetched from that URL
+    - blobs/<content hash>-<w>x<h>q<quality>.jpg: resized variants, evicted LRU
+      (by mtime) once the cache grows past `max_bytes`
+
+    Downloads over `max_fetch_bytes` or not served as an image are rejected.
+    Images that can't be cached are replaced by a local placeholder, never
+    left as remote URLs, so renders stay offline. Placeholders standing in
+    for a failure that may pass (timeouts, 5xx) are reported as degraded so
+    the render using them isn't cached.
+    """
+
+    PLACEHOLDER_COLOR = (226, 232, 240)
+
+    def __init__(self, directory: Path, max_bytes: int, quality: int, scale: int,
+                 max_fetch_bytes: int = PDF_IMAGE_MAX_FETCH_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.refs_dir = self.directory / "refs"
+        self.blobs_dir = self.directory / "blobs"
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.scale = scale
+        self.max_fetch_bytes = max_fetch_bytes
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._placeholders: Dict[Tuple[int, int], str] = {}
+
+    @property
+    def version(self) -> str:
+        return f"img-q{self.quality}x{self.scale}"
+
+    def _ref_path(self, url: str) -> Path:
+        return self.refs_dir / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, content_hash: str, box) -> Path:
+        width, height = box
+        return self.blobs_dir / f"{content_hash}-{width}x{height}q{self.quality}.jpg"
+
+    def _lookup(self, url: str, box) -> Optional[Path]:
+        ref_path = self._ref_path(url)
+        if not ref_path.is_file():
+            return None
+        blob_path = self._blob_path(ref_path.read_text().strip(), box)
+        if not blob_path.is_file():
+            return None
+        # Mark as recently used for LRU eviction
+        os.utime(blob_path)
+        return blob_path
+
+    def _fetch(self, url: str) -> bytes:
+        with http_requests.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            if not content_type.startswith("image/"):
+                raise ValueError(f"not an image: {content_type or 'no content type'}")
+            if int(response.headers.get("Content-Length") or 0) > self.max_fetch_bytes:
+                raise ValueError(f"larger than {self.max_fetch_bytes} bytes")
+            content = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                content.extend(chunk)
+                # Content-Length may be missing or wrong
+                if len(content) > self.max_fetch_bytes:
+                    raise ValueError(f"larger than {self.max_fetch_bytes} bytes")
+            return bytes(content)
+
+    def _resize(self, source: bytes, box) -> bytes:
+        target = (box[0] * self.scale, box[1] * self.scale)
+        with PILImage.open(io.BytesIO(source)) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            # Same crop as CSS `object-fit: cover` / `background-size: cover`, never upscaled
+            if img.width > target[0] or img.height > target[1]:
+                img = ImageOps.fit(img, target, PILImage.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=self.quality, optimize=True, progressive=True)
+            return out.getvalue()
+
+    def _write(self, path: Path, content: bytes):
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        blobs = [(p.stat(), p) for p in self.blobs_dir.glob("*.jpg")]
+        total = sum(stat.st_size for stat, _ in blobs)
+        if total <= self.max_bytes:
+            return
+        for stat, path in sorted(blobs, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """Whether fetching again can't help: the image is missing, too large or not an image."""
+        if isinstance(error, http_requests.HTTPError):
+            status = error.response.status_code if error.response is not None else 0
+            return 400 <= status < 500 and status not in (408, 429)
+        if isinstance(error, http_requests.RequestException):
+            return False
+        # Rejected by _fetch, or PIL couldn't decode it
+        return isinstance(error, (ValueError, PILImage.UnidentifiedImageError))
+
+    def _load(self, url: str, box) -> bytes:
+        blob_path = self._lookup(url, box)
+        if blob_path:
+            return blob_path.read_bytes()
+
+        source = self._fetch(url)
+        content_hash = hashlib.sha256(source).hexdigest()[:32]
+        variant = self._resize(source, box)
+        self._write(self._blob_path(content_hash, box), variant)
+        self._write(self._ref_path(url), content_hash.encode("ascii"))
+        self._evict()
+        return variant
+
+    async def get(self, url: str, box) -> Optional[bytes]:
+        """
+        Resized JPEG bytes for `url`, or None if it can't be fetched or
+        decoded. Raises ImageUnavailable when the failure may pass.
+        """
+        key = f"{url}|{box[0]}x{box[1]}"
+        if key in self._inflight:
+            content, transient = await asyncio.shield(self._inflight[key])
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                content, transient = await asyncio.to_thread(self._load, url, box), None
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Could not cache PDF image {url}: {e}")
+                content, transient = None, None if self._is_permanent(e) else e
+            finally:
+                del self._inflight[key]
+            future.set_result((content, transient))
+        if transient is not None:
+            raise ImageUnavailable(f"{url}: {transient}")
+        return content
+
+    def placeholder(self, box) -> str:
+        """Data URI of a plain JPEG the size of `box`, used for images that can't be cached."""
+        if box not in self._placeholders:
+            out = io.BytesIO()
+            PILImage.new("RGB", (box[0] * self.scale, box[1] * self.scale), self.PLACEHOLDER_COLOR).save(
+                out, format="JPEG", quality=self.quality
+            )
+            self._placeholders[box] = "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode("ascii")
+        return self._placeholders[box]
+
+    async def embed(self, url: Optional[str], slot: str, degraded: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Replace a remote image URL with a data URI of its cached, resized
+        variant. URLs given a placeholder for a failure that may pass are
+        appended to `degraded`.
+        """
+        if not url or not url.startswith(("http://", "https://")):
+            return url
+        box = PDF_IMAGE_BOXES[slot]
+        try:
+            content = await self.get(url, box)
+        except ImageUnavailable:
+            if degraded is not None:
+                degraded.append(url)
+            content = None
+        if content is None:
+            return self.placeholder(box)
+        return "data:image/jpeg;base64," + base64.b64encode(content).decode("ascii")
+
+    async def embed_quotation_images(self, quotation_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Copy of the template input with every image pointing at the local
+        cache, and the URLs that only got a placeholder because of a failure
+        that may pass.
+        """
+        data = copy.deepcopy(quotation_data)
+        jobs = []
+        degraded: List[str] = []
+
+        async def replace(container, field, slot):
+            if isinstance(container, list):
+                container[field] = await self.embed(container[field], slot, degraded)
+            elif container.get(field):
+                container[field] = await self.embed(container[field], slot, degraded)
+
+        jobs.append(replace(data, "coverImage", "cover"))
+        if data.get("salesperson"):
+            jobs.append(replace(data["salesperson"], "photo", "avatar"))
+        for day in data.get("days") or []:
+            if day.get("hotel"):
+                jobs.append(replace(day["hotel"], "image", "hotel"))
+            for activity in day.get("activities") or []:
+                jobs.append(replace(activity, "image", "activity"))
+                images = activity.get("images") or []
+                for index in range(len(images)):
+                    jobs.append(replace(images, index, "activity"))
+
+        await asyncio.gather(*jobs)
+        return data, degraded
+
+
+pdf_images = ImageCache(
+    PDF_IMAGE_CACHE_DIR,
+    max_bytes=PDF_IMAGE_CACHE_MAX_MB * 1024 * 1024,
+    quality=PDF_IMAGE_QUALITY,
+    scale=PDF_IMAGE_SCALE
+)
+
+
+async def invalidate_quotation_pdfs(quotation_id: Optional[str] = None):
+    """Forget the cached PDF pointer for one quotation, or for all of them."""
+    query = {"id": quotation_id} if quotation_id else {"pdf_cache": {"$exists": True}}
+    await db.quotations.update_many(query, {"$unset": {"pdf_cache": ""}})
+
+
+async def build_quotation_pdf_data(quotation: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge request, client, salesperson and admin settings into the template input."""
+    request_id = quotation.get("request_id")
+    request = await db.requests.find_one({"id": request_id})
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
     
     client_id = request.get("client_id")
     salesPerson_id = request.get("assigned_salesperson_id")
 
-    client = await db.users.find_one({"id": client_id})
-    salesPerson = await db.users.find_one({"id": salesPerson_id})
+    people = await user_directory.get_many([client_id, salesPerson_id])
+    client = people.get(client_id)
+    salesPerson = people.get(salesPerson_id)
     
     quotation_data = quotation.get("detailed_quotation_data", {})
     quotation_data["customerName"] = client.get("name", "Valued Customer")
@@ -1268,70 +3078,439 @@ async def get_quotation_pdf(quotation_id: str):
     }
     quotation_data["salesperson"] = salesPerson
 
-    admin_settings = await db.admin_settings.find_one({})
+    admin_settings = await admin_settings_provider.get()
     if admin_settings:
         quotation_data["detailedTerms"] = admin_settings.get("terms_and_conditions", "")
         quotation_data["privacyPolicy"] = admin_settings.get("privacy_policy", "")
 
+    return quotation_data
+
+
+async def _no_progress(progress: int, stage: str):
+    pass
+
+
+async def render_quotation_pdf(
+    quotation_id: str,
+    on_progress: Callable[[int, str], Awaitable[None]] = _no_progress,
+    renderer: Optional[PDFRenderer] = None
+) -> Dict[str, Any]:
+    """
+    Render a quotation to the PDF cache (or reuse an identical earlier render)
+    and remember the cache key on the quotation. Returns the cache entry.
+    A render with placeholders for images that failed transiently is stored
+    under a one-off key and not remembered, so the next request retries them.
+    """
+    renderer = renderer or get_pdf_renderer()
+    await on_progress(10, "loading")
+    quotation = await db.quotations.find_one({"id": quotation_id})
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    # Terms and privacy policy are printed on the PDF, so don't render with
+    # settings older than the current stamp, and remember which one was used
+    settings_version = await read_cache_version("admin_settings")
+    admin_settings_provider.version.observe(settings_version)
+    quotation_data = await build_quotation_pdf_data(quotation)
     try:
-        # Read HTML template
-        template_path = os.path.join(os.path.dirname(__file__), 'templates', 'pdf_template.html')
-        
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-        
-        # Render template with data
-        template = Template(template_content)
-        html_content = template.render(data=quotation_data)
-        
-        # Create temporary files
-        temp_dir = tempfile.mkdtemp()
-        html_file = os.path.join(temp_dir, 'quotation.html')
-        pdf_file = os.path.join(temp_dir, f'quotation-{quotation_data["bookingRef"]}.pdf')
-
-        # Write HTML to file
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        # Generate PDF using Playwright
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            await page.goto(f'file://{html_file}', wait_until='networkidle')
-            await page.pdf(
-                path=pdf_file,
-                format='A4',
-                print_background=True,
-                margin={'top': '0', 'right': '0', 'bottom': '0', 'left': '0'}
-            )
-            await browser.close()
-        
-        # Check if PDF was created
-        if not os.path.exists(pdf_file):
-            raise Exception("PDF file was not created")
-        
-        # Return PDF file
-        response = FileResponse(
-            pdf_file,
-            media_type='application/pdf',
-            filename=f'quotation-{quotation_data["bookingRef"]}.pdf'
-        )
-        
-        # Clean up temp HTML file immediately
-        os.remove(html_file)
-        
-        return response
-        
+        assets = pdf_assets.load()
+    except PDFAssetsMissing as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    key = PDFCache.key_for(
+        quotation_data,
+        renderer.version + assets.version + pdf_images.version
+    )
+
+    degraded: List[str] = []
+    if not pdf_cache.exists(key):
+        await on_progress(30, "images")
+        render_data, degraded = await pdf_images.embed_quotation_images(quotation_data)
+        html_content = pdf_templates.render(renderer.template_name, data=render_data, assets=assets)
+
+        await on_progress(60, "rendering")
+        pdf_bytes = await renderer.render(html_content)
+        if degraded:
+            key = f"{key}-{uuid.uuid4().hex[:12]}"
+        await asyncio.to_thread(pdf_cache.write, key, pdf_bytes)
+
+    entry = {
+        "key": key,
+        "engine": renderer.name,
+        "filename": f'quotation-{quotation_data["bookingRef"]}.pdf',
+        "settings_version": settings_version,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    if degraded:
+        logger.warning(f"Quotation {quotation_id} PDF rendered with placeholders for {len(degraded)} images, not caching it")
+        return entry
+    # Only record the pointer if the quotation wasn't edited while we were rendering
+    await db.quotations.update_one(
+        {"id": quotation_id, "updated_at": quotation.get("updated_at")},
+        {"$set": {"pdf_cache": entry}}
+    )
+    return entry
+
+
+async def quotation_pdf_entry(quotation_id: str, renderer: PDFRenderer) -> Dict[str, Any]:
+    """Cache entry for the quotation's current PDF, rendering it if needed."""
+    # Fast path: reuse the last render while none of its inputs changed
+    quotation, settings_version = await asyncio.gather(
+        db.quotations.find_one({"id": quotation_id}, {"_id": 0, "pdf_cache": 1}),
+        read_cache_version("admin_settings")
+    )
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    entry = quotation.get("pdf_cache")
+    # A render that raced a settings change may have re-recorded its pointer after the change dropped it
+    if (entry and entry.get("engine", "chromium") == renderer.name
+            and entry.get("settings_version") == settings_version and pdf_cache.exists(entry["key"])):
+        return entry
+    return await render_quotation_pdf(quotation_id, renderer=renderer)
+
+
+@api_router.get("/quotations/{quotation_id}/pdf")
+async def get_quotation_pdf(
+    quotation_id: str,
+    engine: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    renderer = get_pdf_renderer(engine)
+    try:
+        entry = await quotation_pdf_entry(quotation_id, renderer)
+        try:
+            return pdf_cache.response(entry["key"], entry["filename"], if_none_match)
+        except FileNotFoundError:
+            # Another worker evicted it since the lookup
+            entry = await render_quotation_pdf(quotation_id, renderer=renderer)
+            return pdf_cache.response(entry["key"], entry["filename"], if_none_match)
+
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
 
+# ============================================================================
+# PDF Rendering: Background Job Queue
+# ============================================================================
+
+PDF_JOB_WORKERS = int(os.environ.get("PDF_JOB_WORKERS", str(PDF_POOL_SIZE)))
+PDF_JOB_MAX_ATTEMPTS = int(os.environ.get("PDF_JOB_MAX_ATTEMPTS", "3"))
+PDF_JOB_POLL_INTERVAL = float(os.environ.get("PDF_JOB_POLL_INTERVAL", "1.0"))
+# A running job whose worker hasn't finished within this many seconds is handed to another worker
+PDF_JOB_LOCK_TIMEOUT = int(os.environ.get("PDF_JOB_LOCK_TIMEOUT", "300"))
+
+
+class PDFJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class PDFJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    quotation_id: str
+    engine: str = PDF_RENDERER
+    status: PDFJobStatus = PDFJobStatus.QUEUED
+    progress: int = 0
+    stage: str = "queued"
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    # Set while the job is pending so a unique index rejects duplicate renders of the same quotation and engine
+    dedupe_key: Optional[str] = None
+    run_after: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    locked_at: Optional[str] = None
+    worker_id: Optional[str] = None
+    # A BSON date rather than an ISO string, since the TTL index only expires dates
+    finished_at: Optional[datetime] = None
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+def pdf_job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    response = {
+        "job_id": job["id"],
+        "quotation_id": job["quotation_id"],
+        "engine": job.get("engine"),
+        "status": job["status"],
+        "progress": job.get("progress", 0),
+        "stage": job.get("stage"),
+        "attempts": job.get("attempts", 0),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "updated_at": job.get("updated_at"),
+    }
+    if job["status"] == PDFJobStatus.DONE:
+        response["download_url"] = f"/api/pdf-jobs/{job['id']}/download"
+    return response
+
+
+class PDFJobQueue:
+    """
+    Mongo-backed queue of quotation PDF renders drained by a fixed number of
+    worker tasks, so a burst of requests is rendered at the pace of the
+    Chromium pool instead of all at once.
+
+    - Jobs survive restarts; any worker task in any process can claim them
+    - Only one pending job per quotation (unique `dedupe_key`); if that index
+      can't be built, `start` says so and enqueue falls back to a racy lookup
+    - Failed renders are retried with exponential backoff up to `max_attempts`
+    - Jobs left `running` by a dead worker are reclaimed after `lock_timeout`,
+      or failed once they have used up their attempts (a render that keeps
+      killing its worker must not be retried forever)
+    - Done and failed jobs expire after PDF_JOB_RETENTION_SECONDS
+    """
+
+    ENQUEUE_ATTEMPTS = 3
+
+    def __init__(self, workers: int, max_attempts: int, poll_interval: float, lock_timeout: int):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        # Whether the unique dedupe_key index is known to be in place
+        self.deduplicated = True
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def _ensure_dedupe_index(self) -> bool:
+        try:
+            await db.pdf_jobs.create_indexes(INDEXES["pdf_jobs"])
+        except PyMongoError as e:
+            logger.error(f"pdf_jobs indexes not created: {e}")
+        indexes = await db.pdf_jobs.index_information()
+        return any(index["key"] == [("dedupe_key", 1)] and index.get("unique") for index in indexes.values())
+
+    async def start(self):
+        # Startup carries on when the database bootstrap fails, so check the index this queue relies on
+        self.deduplicated = await self._ensure_dedupe_index()
+        if not self.deduplicated:
+            logger.error("pdf_jobs has no unique dedupe_key index, concurrent requests may queue duplicate renders")
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, quotation_id: str, engine: str) -> Dict[str, Any]:
+        """Queue a render, or return the job already pending for this quotation."""
+        dedupe_key = f"{quotation_id}:{engine}"
+        job = PDFJob(quotation_id=quotation_id, engine=engine, dedupe_key=dedupe_key)
+        if not self.deduplicated:
+            existing = await db.pdf_jobs.find_one({"dedupe_key": dedupe_key}, {"_id": 0})
+            if existing:
+                return existing
+        for _ in range(self.ENQUEUE_ATTEMPTS):
+            try:
+                await db.pdf_jobs.insert_one(job.model_dump())
+            except DuplicateKeyError:
+                existing = await db.pdf_jobs.find_one({"dedupe_key": dedupe_key}, {"_id": 0})
+                if existing:
+                    return existing
+                # The pending job finished between our insert and lookup; try to queue a fresh one
+                continue
+            self._wakeup.set()
+            return job.model_dump()
+        raise HTTPException(status_code=503, detail="Could not queue the PDF job, please retry")
+
+    async def _fail_abandoned(self, stale_before: str, now: datetime):
+        """Fail jobs whose worker died on their last allowed attempt."""
+        await db.pdf_jobs.update_many(
+            {"status": PDFJobStatus.RUNNING, "locked_at": {"$lt": stale_before},
+             "attempts": {"$gte": self.max_attempts}},
+            {
+                "$set": {
+                    "status": PDFJobStatus.FAILED,
+                    "stage": "failed",
+                    "error": "The worker rendering this PDF stopped responding",
+                    "finished_at": now,
+                    "updated_at": now.isoformat()
+                },
+                "$unset": {"dedupe_key": ""}
+            }
+        )
+
+    async def _claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        stale_before = (now - timedelta(seconds=self.lock_timeout)).isoformat()
+        await self._fail_abandoned(stale_before, now)
+        return await db.pdf_jobs.find_one_and_update(
+            {"$or": [
+                {"status": PDFJobStatus.QUEUED, "run_after": {"$lte": now.isoformat()}},
+                {"status": PDFJobStatus.RUNNING, "locked_at": {"$lt": stale_before},
+                 "attempts": {"$lt": self.max_attempts}}
+            ]},
+            {
+                "$set": {
+                    "status": PDFJobStatus.RUNNING,
+                    "stage": "starting",
+                    "locked_at": now.isoformat(),
+                    "worker_id": worker_id,
+                    "updated_at": now.isoformat()
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_after", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run(self, job: Dict[str, Any]):
+        # Writes are conditional on still holding the claim, in case the job was reclaimed as stale
+        claim = {"id": job["id"], "worker_id": job["worker_id"]}
+
+        async def on_progress(progress: int, stage: str):
+            await db.pdf_jobs.update_one(
+                claim,
+                {"$set": {"progress": progress, "stage": stage, "updated_at": datetime.now(timezone.utc).isoformat()}}
+            )
+
+        try:
+            entry = await render_quotation_pdf(
+                job["quotation_id"],
+                on_progress=on_progress,
+                renderer=get_pdf_renderer(job.get("engine"))
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            # Missing quotations won't appear on retry
+            retryable = not (isinstance(e, HTTPException) and e.status_code == 404)
+            now = datetime.now(timezone.utc)
+            if retryable and job["attempts"] < self.max_attempts:
+                backoff = 2 ** job["attempts"]
+                update = {
+                    "$set": {
+                        "status": PDFJobStatus.QUEUED,
+                        "stage": "retrying",
+                        "error": error,
+                        "run_after": (now + timedelta(seconds=backoff)).isoformat(),
+                        "updated_at": now.isoformat()
+                    }
+                }
+            else:
+                update = {
+                    "$set": {
+                        "status": PDFJobStatus.FAILED,
+                        "stage": "failed",
+                        "error": error,
+                        "finished_at": now,
+                        "updated_at": now.isoformat()
+                    },
+                    "$unset": {"dedupe_key": ""}
+                }
+            logger.warning(f"PDF job {job['id']} attempt {job['attempts']} failed: {error}")
+            await db.pdf_jobs.update_one(claim, update)
+            return
+
+        await db.pdf_jobs.update_one(
+            claim,
+            {
+                "$set": {
+                    "status": PDFJobStatus.DONE,
+                    "stage": "done",
+                    "progress": 100,
+                    "error": None,
+                    "result": entry,
+                    "finished_at": datetime.now(timezone.utc),
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                },
+                "$unset": {"dedupe_key": ""}
+            }
+        )
+
+    async def _worker(self, index: int):
+        # Per task, so a task reclaiming another task's stale job in the same process isn't mistaken for its owner
+        worker_id = f"{os.getpid()}-{index}-{uuid.uuid4().hex[:8]}"
+        while True:
+            try:
+                job = await self._claim(worker_id)
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"PDF job worker {index} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+
+pdf_job_queue = PDFJobQueue(
+    workers=PDF_JOB_WORKERS,
+    max_attempts=PDF_JOB_MAX_ATTEMPTS,
+    poll_interval=PDF_JOB_POLL_INTERVAL,
+    lock_timeout=PDF_JOB_LOCK_TIMEOUT
+)
+
+
+@api_router.post("/quotations/{quotation_id}/pdf-jobs", status_code=202)
+async def create_quotation_pdf_job(quotation_id: str, engine: Optional[str] = None):
+    """Queue a quotation PDF render. Poll GET /pdf-jobs/{job_id} for progress."""
+    renderer = get_pdf_renderer(engine)
+    quotation = await db.quotations.find_one({"id": quotation_id}, {"_id": 0, "pdf_cache": 1})
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    # Nothing to render if the current version is already cached
+    entry = quotation.get("pdf_cache")
+    if entry and entry.get("engine", "chromium") == renderer.name and pdf_cache.exists(entry["key"]):
+        job = PDFJob(
+            quotation_id=quotation_id,
+            engine=renderer.name,
+            status=PDFJobStatus.DONE,
+            progress=100,
+            stage="done",
+            result=entry,
+            finished_at=datetime.now(timezone.utc)
+        )
+        await db.pdf_jobs.insert_one(job.model_dump())
+        return pdf_job_response(job.model_dump())
+
+    job = await pdf_job_queue.enqueue(quotation_id, renderer.name)
+    return pdf_job_response(job)
+
+
+@api_router.get("/pdf-jobs/{job_id}")
+async def get_pdf_job(job_id: str):
+    job = await db.pdf_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    return pdf_job_response(job)
+
+
+@api_router.get("/pdf-jobs/{job_id}/download")
+async def download_pdf_job(job_id: str, if_none_match: Optional[str] = Header(None)):
+    job = await db.pdf_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    if job["status"] != PDFJobStatus.DONE:
+        raise HTTPException(status_code=409, detail=f"PDF job is {job['status']}")
+
+    entry = job["result"]
+    try:
+        return pdf_cache.response(entry["key"], entry["filename"], if_none_match)
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="PDF is no longer cached. Please create a new job.")
+
+
 @api_router.put("/quotations/{quotation_id}", response_model=Quotation)
 async def update_quotation(quotation_id: str, quotation: Quotation):
     # If detailed_quotation_data is provided, populate with AdminSettings defaults
     if quotation.detailed_quotation_data:
-        admin_settings = await db.admin_settings.find_one({})
+        admin_settings = await admin_settings_provider.get()
         if admin_settings:
             # Populate privacy_policy from AdminSettings if not set
             if not quotation.detailed_quotation_data.privacyPolicy:
@@ -1350,7 +3529,10 @@ async def update_quotation(quotation_id: str, quotation: Quotation):
                 quotation.detailed_quotation_data.exclusions = admin_settings.get("default_exclusions", [])
     
     quotation.updated_at = datetime.now(timezone.utc).isoformat()
-    await db.quotations.update_one({"id": quotation_id}, {"$set": quotation.dict()})
+    await db.quotations.update_one(
+        {"id": quotation_id},
+        {"$set": quotation.dict(), "$unset": {"pdf_cache": ""}}
+    )
     return quotation
 
 @api_router.post("/quotations/{quotation_id}/publish")
@@ -1369,7 +3551,8 @@ async def publish_quotation(quotation_id: str, data: Dict[str, Any]):
             "expiry_date": expiry_date,
             "published_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+        },
+        "$unset": {"pdf_cache": ""}}
     )
     
     # Create activity
@@ -1394,39 +3577,105 @@ async def full_payment(invoice_id: str, current_user: Dict = Depends(get_current
         method="Bank Transfer",
         type="full-payment",
     )
-    await db.payments.insert_one(payment.model_dump())
+    await db.payments.insert_one({**payment.model_dump(), **await invoice_owners(invoice)})
 
     return {"success": True}
     
 
 
 # Step 2.1: Get accepted quotations pending invoice generation
+PENDING_INVOICE_REQUEST_FIELDS = ["title", "client_id", "destination", "start_date", "end_date", "people_count"]
+# The pending-invoice screens read the quotation minus its itinerary days
+PENDING_INVOICE_QUOTATION_FIELDS = QUOTATION_LIST_FIELDS
+PENDING_INVOICE_REQUIRED_FIELDS = ("id", "request_id")
+PENDING_INVOICE_SORTS = {"accepted_at": 1, "-accepted_at": -1}
+
+
+def _pending_invoice_joined() -> List[Dict[str, Any]]:
+    """Accepted quotations with no invoice yet, joined to their request; those without one are dropped."""
+    return [
+        {"$lookup": {"from": "invoices", "localField": "id", "foreignField": "quotation_id", "as": "invoice"}},
+        {"$match": {"invoice": {"$size": 0}}},
+        *_lookup_one("requests", "request_id", "request", PENDING_INVOICE_REQUEST_FIELDS),
+        {"$unwind": "$request"},
+    ]
+
+
+def pending_invoice_count_pipeline() -> List[Dict[str, Any]]:
+    return [
+        {"$match": {"status": QuotationStatus.ACCEPTED}},
+        {"$project": {"_id": 0, "id": 1, "request_id": 1}},
+        *_pending_invoice_joined(),
+        {"$count": "count"},
+    ]
+
+
+def pending_invoice_quotations_pipeline(
+    sort: int = 1,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    One page of accepted quotations with no invoice yet, ordered by
+    acceptance time, with a trimmed itinerary (or `projection`) and their
+    request's details. Rows come back as a cursor, not inside one `$facet`
+    document, so whole itineraries aren't bound by the 16 MB document
+    limit; pending_invoice_count_pipeline gives the total.
+    """
+    page = ([{"$skip": skip}] if skip else []) + ([{"$limit": limit}] if limit else [])
+    projection = projection or fields_projection(None, Quotation, PENDING_INVOICE_QUOTATION_FIELDS, PENDING_INVOICE_REQUIRED_FIELDS)
+    return [
+        {"$match": {"status": QuotationStatus.ACCEPTED}},
+        {"$sort": {"accepted_at": sort, "id": sort}},
+        {"$project": projection},
+        *_pending_invoice_joined(),
+        {"$project": {"invoice": 0}},
+        *page,
+    ]
+
+
 @api_router.get("/quotations/pending-invoice")
-async def get_pending_invoice_quotations(current_user: Dict = Depends(get_current_user)):
-    """Get all accepted quotations that don't have invoices yet"""
-    # Find all accepted quotations
-    accepted_quotations = await db.quotations.find({"status": QuotationStatus.ACCEPTED}).to_list(length=None)
-    
-    result = []
-    for quotation in accepted_quotations:
-        # Check if invoice exists for this quotation
-        existing_invoice = await db.invoices.find_one({"quotation_id": quotation["id"]})
-        
-        if not existing_invoice:
-            # Get request details
-            request = await db.requests.find_one({"id": quotation["request_id"]})
-            if request:
-                quotation["request_details"] = {
-                    "title": request.get("title"),
-                    "client_id": request.get("client_id"),
-                    "destination": request.get("destination"),
-                    "start_date": request.get("start_date"),
-                    "end_date": request.get("end_date"),
-                    "people_count": request.get("people_count")
-                }
-                result.append(serialize_mongo(quotation))
-    
-    return result
+async def get_pending_invoice_quotations(
+    response: Response,
+    page: int = 1,
+    limit: Optional[int] = None,
+    sort: str = "accepted_at",
+    fields: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Get all accepted quotations that don't have invoices yet.
+    Oldest acceptance first (`sort=-accepted_at` for newest); pass `limit`
+    (and `page`) to paginate. The total is returned in `X-Total-Count`.
+    `fields` narrows (or with `*` widens) the quotation fields returned.
+    """
+    if page < 1 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="page and limit must be positive")
+    if sort not in PENDING_INVOICE_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(PENDING_INVOICE_SORTS)}")
+    skip = (page - 1) * limit if limit else 0
+
+    projection = fields_projection(fields, Quotation, PENDING_INVOICE_QUOTATION_FIELDS, PENDING_INVOICE_REQUIRED_FIELDS)
+    pipeline = pending_invoice_quotations_pipeline(PENDING_INVOICE_SORTS[sort], skip, limit, projection or {"_id": 0})
+    counted = await db.quotations.aggregate(pending_invoice_count_pipeline()).to_list(1)
+    response.headers["X-Total-Count"] = str(counted[0]["count"] if counted else 0)
+
+    quotations = []
+    async for quotation in db.quotations.aggregate(pipeline, allowDiskUse=True):
+        request = quotation.pop("request")
+        quotation["request_details"] = {field: request.get(field) for field in PENDING_INVOICE_REQUEST_FIELDS}
+        quotations.append(serialize_mongo(quotation))
+    return quotations
+
+
+@migration(2, "Backfill accepted_at on accepted quotations")
+async def backfill_quotation_accepted_at(database):
+    # Before accepted_at existed, accepting was the last write to an accepted quotation
+    await database.quotations.update_many(
+        {"status": QuotationStatus.ACCEPTED, "accepted_at": None},
+        [{"$set": {"accepted_at": "$updated_at"}}]
+    )
 
 
 @api_router.post("/quotations/{quotation_id}/accept")
@@ -1437,9 +3686,10 @@ async def accept_quotation(quotation_id: str, current_user: Dict = Depends(get_c
         raise HTTPException(status_code=404, detail="Quotation not found")
     
     # Update quotation status
+    accepted_at = datetime.now(timezone.utc).isoformat()
     await db.quotations.update_one(
         {"id": quotation_id},
-        {"$set": {"status": QuotationStatus.ACCEPTED, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"status": QuotationStatus.ACCEPTED, "accepted_at": accepted_at, "updated_at": accepted_at}}
     )
     
     # Update request status
@@ -1499,7 +3749,7 @@ async def create_invoice_from_quotation(data: CreateInvoiceRequest, current_user
         raise HTTPException(status_code=404, detail="Request not found")
     
     client_id = request.get("client_id")
-    client = await db.users.find_one({"id": client_id})
+    client = await user_directory.get(client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
@@ -1522,6 +3772,7 @@ async def create_invoice_from_quotation(data: CreateInvoiceRequest, current_user
     )
     
     await db.invoices.insert_one(invoice.model_dump())
+    invoice_pdf_materializer.schedule(invoice.id)
     
     # Create activity log
     activity = Activity(
@@ -1627,6 +3878,7 @@ async def create_payment_breakup(invoice_id: str, data: CreatePaymentBreakupRequ
         previous_date = due_date
     
     # Create breakup records
+    owners = await invoice_owners(invoice)
     breakup_ids = []
     for item in data.breakups:
         breakup = PaymentBreakup(
@@ -1636,7 +3888,8 @@ async def create_payment_breakup(invoice_id: str, data: CreatePaymentBreakupRequ
             remaining_amount=item.amount,  # Initially, full amount is remaining
             description=item.description,
             status="pending",
-            paid_amount=0.0
+            paid_amount=0.0,
+            **owners
         )
         await db.payment_breakups.insert_one(breakup.model_dump())
         breakup_ids.append(breakup.id)
@@ -1669,7 +3922,11 @@ async def create_payment_breakup(invoice_id: str, data: CreatePaymentBreakupRequ
 
 # Step 3.2: Get Payment Breakup
 @api_router.get("/invoices/{invoice_id}/payment-breakup")
-async def get_payment_breakup(invoice_id: str, current_user: Dict = Depends(get_current_user)):
+async def get_payment_breakup(
+    invoice_id: str,
+    current_user: Dict = Depends(get_current_user),
+    _: None = Depends(conditional(change_stamp("invoices"), change_stamp("payment_breakups")))
+):
     """Get payment breakup for an invoice"""
     # Get invoice
     invoice = await db.invoices.find_one({"id": invoice_id})
@@ -1876,8 +4133,9 @@ async def update_invoice_status(invoice_id: str):
     # Update invoice status
     await db.invoices.update_one(
         {"id": invoice_id},
-        {"$set": {"status": new_status}}
+        {"$set": {"status": new_status, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    invoice_pdf_materializer.schedule(invoice_id)
 
 
 # Step 5.2: Accountant Verification Endpoint
@@ -2016,6 +4274,7 @@ async def verify_payment_by_operations(payment_id: str, data: Dict[str, Any], cu
     invoice = await db.invoices.find_one({"id": invoice_id})
     
     if invoice:
+        invoice_pdf_materializer.schedule(invoice_id)
         request_id = invoice.get("request_id")
         
         # Create activity log
@@ -2061,13 +4320,56 @@ async def verify_payment_by_operations(payment_id: str, data: Dict[str, Any], cu
 # ============================================================================
 
 # Step 6.1: Get Payment Allocations for Invoice
+PAYMENT_ALLOCATION_INCLUDES = {"allocations"}
+
+
+async def allocation_details_by_breakup(breakup_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Allocation rows with payment details, grouped by breakup, from one fetch per collection."""
+    allocations = await db.payment_allocations.find(
+        {"breakup_id": {"$in": breakup_ids}},
+        {"_id": 0, "breakup_id": 1, "payment_id": 1, "allocated_amount": 1, "allocated_at": 1}
+    ).sort("allocated_at", 1).to_list(length=None)
+
+    payment_ids = list({allocation["payment_id"] for allocation in allocations})
+    payments = {
+        payment["id"]: payment
+        async for payment in db.payments.find(
+            {"id": {"$in": payment_ids}},
+            {"_id": 0, "id": 1, "method": 1, "status": 1, "amount": 1}
+        )
+    }
+
+    details = {breakup_id: [] for breakup_id in breakup_ids}
+    for allocation in allocations:
+        payment = payments.get(allocation["payment_id"])
+        if payment:
+            details[allocation["breakup_id"]].append({
+                "payment_id": allocation["payment_id"],
+                "amount": allocation["allocated_amount"],
+                "date": allocation["allocated_at"],
+                "payment_method": payment.get("method", ""),
+                "payment_status": payment.get("status", ""),
+                "payment_total": payment.get("amount", 0.0)
+            })
+    return details
+
+
 @api_router.get("/invoices/{invoice_id}/payment-allocations")
-async def get_payment_allocations(invoice_id: str, current_user: Dict = Depends(get_current_user)):
+async def get_payment_allocations(
+    invoice_id: str,
+    include: str = Query("allocations", description="Comma-separated optional sections; pass an empty value to skip allocation detail"),
+    current_user: Dict = Depends(get_current_user)
+):
     """
     Get comprehensive payment allocation view for an invoice.
     Shows all breakups with their payment allocations.
     Used by accountants to view payment settlement history.
     """
+    includes = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = includes - PAYMENT_ALLOCATION_INCLUDES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+
     # Get invoice
     invoice = await db.invoices.find_one({"id": invoice_id})
     if not invoice:
@@ -2109,31 +4411,11 @@ async def get_payment_allocations(invoice_id: str, current_user: Dict = Depends(
     # Build breakups array with allocations
     breakups_with_allocations = []
     
+    allocations = None
+    if "allocations" in includes:
+        allocations = await allocation_details_by_breakup([breakup["id"] for breakup in breakups])
+
     for breakup in breakups:
-        # Get all allocations for this breakup
-        allocations_cursor = db.payment_allocations.find(
-            {"breakup_id": breakup["id"]}
-        ).sort("allocated_at", 1)
-        
-        allocations = await allocations_cursor.to_list(length=None)
-        
-        # Build allocations array with payment details
-        allocation_details = []
-        
-        for allocation in allocations:
-            # Get payment details
-            payment = await db.payments.find_one({"id": allocation["payment_id"]})
-            
-            if payment:
-                allocation_details.append({
-                    "payment_id": allocation["payment_id"],
-                    "amount": allocation["allocated_amount"],
-                    "date": allocation["allocated_at"],
-                    "payment_method": payment.get("method", ""),
-                    "payment_status": payment.get("status", ""),
-                    "payment_total": payment.get("amount", 0.0)
-                })
-        
         # Build breakup object
         breakup_obj = {
             "id": breakup["id"],
@@ -2144,8 +4426,9 @@ async def get_payment_allocations(invoice_id: str, current_user: Dict = Depends(
             "remaining_amount": breakup.get("remaining_amount", breakup["amount"]),
             "description": breakup.get("description", ""),
             "created_at": breakup.get("created_at", ""),
-            "allocations": allocation_details
         }
+        if allocations is not None:
+            breakup_obj["allocations"] = allocations[breakup["id"]]
         
         breakups_with_allocations.append(breakup_obj)
     
@@ -2169,92 +4452,149 @@ async def get_payment_allocations(invoice_id: str, current_user: Dict = Depends(
 # ============================================================================
 
 # Step 8.1: Get Overdue Breakups
+OVERDUE_BREAKUP_STATUSES = ["pending", "partial_paid"]
+
+
+def overdue_breakups_match(today_str: str) -> Dict[str, Any]:
+    """Breakups past their due date and not fully paid."""
+    return {
+        "status": {"$in": OVERDUE_BREAKUP_STATUSES},
+        "due_date": {"$lt": today_str}
+    }
+
+
+def _lookup_one(collection: str, local_field: str, as_field: str, fields: List[str]) -> List[Dict[str, Any]]:
+    """$lookup by `id` trimmed to `fields`, leaving an empty list when nothing matches."""
+    return [
+        {"$lookup": {"from": collection, "localField": local_field, "foreignField": "id", "as": as_field}},
+        {"$addFields": {as_field: {"$map": {
+            "input": f"${as_field}",
+            "as": "doc",
+            "in": {field: f"$$doc.{field}" for field in fields}
+        }}}},
+    ]
+
+
+def _overdue_breakups_joined(today: datetime) -> List[Dict[str, Any]]:
+    """Overdue breakups with their invoice and request; those missing either are dropped."""
+    return [
+        {"$match": overdue_breakups_match(today.date().isoformat())},
+        {"$lookup": {"from": "invoices", "localField": "invoice_id", "foreignField": "id", "as": "invoice"}},
+        {"$unwind": "$invoice"},
+        {"$lookup": {"from": "requests", "localField": "invoice.request_id", "foreignField": "id", "as": "request"}},
+        {"$unwind": "$request"},
+    ]
+
+
+def overdue_breakups_count_pipeline(now: datetime) -> List[Dict[str, Any]]:
+    today = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+    return _overdue_breakups_joined(today) + [{"$count": "count"}]
+
+
+def overdue_breakups_pipeline(now: datetime, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    One page of overdue breakups joined with their invoice and request, most
+    overdue first. Rows come back as a cursor rather than inside a single
+    `$facet` document, so an unpaginated report isn't bound by the 16 MB
+    document limit; overdue_breakups_count_pipeline gives the total. The
+    people on each request come from the user directory.
+    """
+    today = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+    page = ([{"$skip": skip}] if skip else []) + ([{"$limit": limit}] if limit else [])
+    return _overdue_breakups_joined(today) + [
+        {"$project": {
+            "_id": 0,
+            "id": 1, "amount": 1, "paid_amount": 1, "remaining_amount": 1,
+            "due_date": 1, "status": 1, "description": 1,
+            "invoice": {"id": 1, "invoice_number": 1},
+            "request": {
+                "id": 1, "title": 1, "client_id": 1,
+                "assigned_salesperson_id": 1, "assigned_operation_id": 1
+            },
+            # Whole days between the due date and today (UTC)
+            "days_overdue": {"$toInt": {"$divide": [
+                {"$subtract": [today, {"$dateFromString": {"dateString": {"$substrCP": ["$due_date", 0, 10]}}}]},
+                86400000
+            ]}}
+        }},
+        {"$sort": {"days_overdue": -1, "id": 1}},
+    ] + page
+
+
+OVERDUE_PEOPLE_FIELDS = ("client_id", "assigned_salesperson_id", "assigned_operation_id")
+
+
+def format_overdue_breakup(doc: Dict[str, Any], people: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    invoice = doc["invoice"]
+    request = doc["request"]
+    client = people.get(request.get("client_id"))
+    salesperson = people.get(request.get("assigned_salesperson_id"))
+    operations = people.get(request.get("assigned_operation_id"))
+    return {
+        "breakup_id": doc["id"],
+        "invoice_id": invoice["id"],
+        "invoice_number": invoice.get("invoice_number"),
+        "request_id": request["id"],
+        "request_title": request.get("title"),
+        "breakup_amount": doc["amount"],
+        "paid_amount": doc.get("paid_amount", 0.0),
+        "remaining_amount": doc.get("remaining_amount", doc["amount"]),
+        "due_date": doc["due_date"],
+        "days_overdue": doc["days_overdue"],
+        "status": doc["status"],
+        "description": doc.get("description", ""),
+        "client_name": client.get("name") if client else "Unknown",
+        "client_email": client.get("email") if client else "",
+        "client_phone": client.get("phone") if client else "",
+        "salesperson_name": salesperson.get("name") if salesperson else "Not Assigned",
+        "salesperson_email": salesperson.get("email") if salesperson else "",
+        "operations_name": operations.get("name") if operations else "Not Assigned",
+        "operations_email": operations.get("email") if operations else ""
+    }
+
+
 @api_router.get("/payment-breakups/overdue")
-async def get_overdue_breakups(current_user: Dict = Depends(get_current_user)):
+async def get_overdue_breakups(
+    page: int = 1,
+    limit: Optional[int] = None,
+    current_user: Dict = Depends(get_current_user)
+):
     """
     Get all overdue payment breakups.
     Returns breakups where due_date < today AND status != 'paid'
     Includes invoice, request, and assigned personnel details.
+    Most overdue first; pass `limit` (and `page`) to paginate.
     """
-    # Get current date
+    if page < 1 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="page and limit must be positive")
+    skip = (page - 1) * limit if limit else 0
+
     now = datetime.now(timezone.utc)
-    today_str = now.date().isoformat()
-    
-    # Find all overdue breakups (due_date < today and not fully paid)
-    all_breakups = await db.payment_breakups.find({
-        "status": {"$in": ["pending", "partial_paid"]},
-        "due_date": {"$lt": today_str}
-    }).to_list(length=None)
-    
-    if not all_breakups:
-        return {
-            "overdue_count": 0,
-            "overdue_breakups": []
-        }
-    
-    # Build response with invoice and request details
-    overdue_list = []
-    
-    for breakup in all_breakups:
-        # Get invoice
-        invoice = await db.invoices.find_one({"id": breakup["invoice_id"]})
-        if not invoice:
-            continue
-        
-        # Get request
-        request = await db.requests.find_one({"id": invoice.get("request_id")})
-        if not request:
-            continue
-        
-        # Get client details
-        client = await db.users.find_one({"id": request.get("client_id")})
-        
-        # Get assigned salesperson
-        salesperson = None
-        if request.get("assigned_salesperson_id"):
-            salesperson = await db.users.find_one({"id": request["assigned_salesperson_id"]})
-        
-        # Get assigned operations
-        operations = None
-        if request.get("assigned_operation_id"):
-            operations = await db.users.find_one({"id": request["assigned_operation_id"]})
-        
-        # Calculate days overdue
-        due_date = datetime.fromisoformat(breakup["due_date"].replace('Z', '+00:00'))
-        days_overdue = (now.date() - due_date.date()).days
-        
-        overdue_list.append({
-            "breakup_id": breakup["id"],
-            "invoice_id": invoice["id"],
-            "invoice_number": invoice.get("invoice_number"),
-            "request_id": request["id"],
-            "request_title": request.get("title"),
-            "breakup_amount": breakup["amount"],
-            "paid_amount": breakup.get("paid_amount", 0.0),
-            "remaining_amount": breakup.get("remaining_amount", breakup["amount"]),
-            "due_date": breakup["due_date"],
-            "days_overdue": days_overdue,
-            "status": breakup["status"],
-            "description": breakup.get("description", ""),
-            "client_name": client.get("name") if client else "Unknown",
-            "client_email": client.get("email") if client else "",
-            "client_phone": client.get("phone") if client else "",
-            "salesperson_name": salesperson.get("name") if salesperson else "Not Assigned",
-            "salesperson_email": salesperson.get("email") if salesperson else "",
-            "operations_name": operations.get("name") if operations else "Not Assigned",
-            "operations_email": operations.get("email") if operations else ""
-        })
-    
-    # Sort by days_overdue (most overdue first)
-    overdue_list.sort(key=lambda x: x["days_overdue"], reverse=True)
-    
+    counted, rows = await asyncio.gather(
+        db.payment_breakups.aggregate(overdue_breakups_count_pipeline(now), allowDiskUse=True).to_list(1),
+        db.payment_breakups.aggregate(overdue_breakups_pipeline(now, skip, limit), allowDiskUse=True).to_list(None)
+    )
+    total = counted[0]["count"] if counted else 0
+    people = await user_directory.get_many(row["request"].get(field) for row in rows for field in OVERDUE_PEOPLE_FIELDS)
+    overdue_list = [format_overdue_breakup(doc, people) for doc in rows]
+
     return {
-        "overdue_count": len(overdue_list),
-        "overdue_breakups": overdue_list
+        "overdue_count": total,
+        "overdue_breakups": overdue_list,
+        "page": page,
+        "limit": limit,
+        "has_more": (skip + len(overdue_list)) < total
     }
 
 
 # Step 8.2: Get Alert Count (Overdue payments for current user)
+OVERDUE_OWNER_FIELD_BY_ROLE = {
+    "sales": "assigned_salesperson_id",
+    "operations": "assigned_operation_id",
+    "customer": "client_id",
+}
+
+
 @api_router.get("/alerts/overdue-count")
 async def get_overdue_count(current_user: Dict = Depends(get_current_user)):
     """
@@ -2266,48 +4606,18 @@ async def get_overdue_count(current_user: Dict = Depends(get_current_user)):
     """
     user_id = current_user.get("sub")
     role = current_user.get("role")
-    
-    # Get current date
-    now = datetime.now(timezone.utc)
-    today_str = now.date().isoformat()
-    
-    # Find all overdue breakups
-    all_overdue_breakups = await db.payment_breakups.find({
-        "status": {"$in": ["pending", "partial_paid"]},
-        "due_date": {"$lt": today_str}
-    }).to_list(length=None)
-    
-    if not all_overdue_breakups:
-        return {"overdue_count": 0}
-    
-    # Filter based on role
+    today_str = datetime.now(timezone.utc).date().isoformat()
+
+    query = overdue_breakups_match(today_str)
     if role in ["accountant", "admin"]:
-        # Return all overdue count
-        return {"overdue_count": len(all_overdue_breakups)}
-    
-    # For sales, operations, and customers - filter by their requests
-    relevant_count = 0
-    
-    for breakup in all_overdue_breakups:
-        # Get invoice
-        invoice = await db.invoices.find_one({"id": breakup["invoice_id"]})
-        if not invoice:
-            continue
-        
-        # Get request
-        request = await db.requests.find_one({"id": invoice.get("request_id")})
-        if not request:
-            continue
-        
-        # Check if this request belongs to current user
-        if role == "sales" and request.get("assigned_salesperson_id") == user_id:
-            relevant_count += 1
-        elif role == "operations" and request.get("assigned_operation_id") == user_id:
-            relevant_count += 1
-        elif role == "customer" and request.get("client_id") == user_id:
-            relevant_count += 1
-    
-    return {"overdue_count": relevant_count}
+        pass
+    elif role in OVERDUE_OWNER_FIELD_BY_ROLE:
+        # Owners are denormalized onto breakups, so this is a single indexed count
+        query[OVERDUE_OWNER_FIELD_BY_ROLE[role]] = user_id
+    else:
+        return {"overdue_count": 0}
+
+    return {"overdue_count": await db.payment_breakups.count_documents(query)}
 
 
 # Step 8.3: Alert Model already exists in the models section
@@ -2514,205 +4824,254 @@ async def get_invoice_summary(invoice_id: str, current_user: Dict = Depends(get_
 
 
 
-# New endpoint: Download Proforma Invoice PDF
-@api_router.get("/quotations/{quotation_id}/download-proforma")
-async def download_proforma_invoice(quotation_id: str):
-    """Generate and download proforma invoice as PDF"""
-    quotation = await db.quotations.find_one({"id": quotation_id})
-    if not quotation:
-        raise HTTPException(status_code=404, detail="Quotation not found")
-    
+# ============================================================================
+# Invoice PDFs: ReportLab Process Pool
+# ============================================================================
+
+INVOICE_PDF_WORKERS = int(os.environ.get("INVOICE_PDF_WORKERS", "2"))
+INVOICE_PDF_ACQUIRE_TIMEOUT = float(os.environ.get("INVOICE_PDF_ACQUIRE_TIMEOUT", "30"))
+
+
+class InvoicePDFPool:
+    """
+    Runs the ReportLab builders in invoice_pdf.py on a small pool of worker
+    processes, so laying out a document never blocks the event loop. At most
+    `workers` builds run at once; further requests wait for a free worker.
+
+    Workers are spawned rather than forked (they only import invoice_pdf) and
+    build their styles once at startup. A crashed pool is replaced on the
+    next build.
+    """
+
+    def __init__(self, workers: int, acquire_timeout: float):
+        self.workers = workers
+        self.acquire_timeout = acquire_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(workers)
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=invoice_pdf.init_worker
+            )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def build(self, builder: Callable[[Dict[str, Any]], bytes], data: Dict[str, Any]) -> bytes:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="PDF renderer is busy. Please try again in a moment.")
+        try:
+            self.start()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, builder, data)
+            except BrokenProcessPool:
+                logger.warning("Invoice PDF worker died, restarting the process pool")
+                self.close()
+                raise HTTPException(status_code=503, detail="PDF renderer restarted. Please try again.")
+        finally:
+            self._semaphore.release()
+
+
+invoice_pdf_pool = InvoicePDFPool(workers=INVOICE_PDF_WORKERS, acquire_timeout=INVOICE_PDF_ACQUIRE_TIMEOUT)
+
+
+def pdf_download_response(pdf_bytes: bytes, filename: str) -> Response:
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+async def build_proforma_pdf_data(quotation: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain-dict input for invoice_pdf.build_proforma_pdf."""
     request = await db.requests.find_one({"id": quotation["request_id"]})
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
-    
-    # Create PDF in memory
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#f97316'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#ea580c'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    normal_style = styles['Normal']
-    
-    # Title
-    elements.append(Paragraph("PROFORMA INVOICE", title_style))
-    elements.append(Spacer(1, 12))
-    
-    # Company Details
-    company_data = [
-        ["Travel Company Pvt Ltd", ""],
-        ["123 Business Street", f"Date: {datetime.now().strftime('%d %B %Y')}"],
-        ["City, State - 123456", f"Proforma #: PI-{quotation_id[:8].upper()}"],
-        ["Phone: +91-1234567890", f"Valid Until: {datetime.fromisoformat(quotation['expiry_date']).strftime('%d %B %Y') if quotation.get('expiry_date') else 'N/A'}"],
-    ]
-    
-    company_table = Table(company_data, colWidths=[3*inch, 3*inch])
-    company_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-    ]))
-    elements.append(company_table)
-    elements.append(Spacer(1, 20))
-    
-    # Client Details
-    elements.append(Paragraph("BILL TO:", heading_style))
-    client_data = [
-        ["Client Name:", request["client_name"]],
-        ["Email:", request["client_email"]],
-        ["Phone:", f"{request.get('client_country_code', '+91')} {request['client_phone']}"],
-        ["Destination:", request.get("destination", "N/A")],
-        ["Travel Dates:", request["preferred_dates"]],
-        ["Number of People:", str(request["people_count"])],
-    ]
-    
-    client_table = Table(client_data, colWidths=[1.5*inch, 4.5*inch])
-    client_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    elements.append(client_table)
-    elements.append(Spacer(1, 20))
-    
+    client = await user_directory.get(request.get("client_id")) or {}
+
     # Get current version
     current_version = None
     for version in quotation.get("versions", []):
         if version.get("is_current", False):
             current_version = version
             break
-    
+
     if not current_version and quotation.get("versions"):
         current_version = quotation["versions"][-1]
-    
-    if current_version and current_version.get("options"):
-        # Process each option
-        for option in current_version["options"]:
-            elements.append(Paragraph(f"<b>{option['name']}</b>", heading_style))
-            
-            # Line items table
-            line_items_data = [["Item", "Supplier", "Qty", "Unit Price", "Tax %", "Total"]]
-            
-            for item in option.get("line_items", []):
-                line_items_data.append([
-                    f"{item['name']}\n({item['type']})",
-                    item.get('supplier', 'N/A'),
-                    str(item['quantity']),
-                    f"₹{item['unit_price']:,.2f}",
-                    f"{item['tax_percent']}%",
-                    f"₹{item['total']:,.2f}"
-                ])
-            
-            # Add subtotal, tax, and total rows
-            line_items_data.append(["", "", "", "", "Subtotal:", f"₹{option['subtotal']:,.2f}"])
-            line_items_data.append(["", "", "", "", "Tax:", f"₹{option['tax_amount']:,.2f}"])
-            line_items_data.append(["", "", "", "", "Total:", f"₹{option['total']:,.2f}"])
-            
-            items_table = Table(line_items_data, colWidths=[2*inch, 1.2*inch, 0.5*inch, 1*inch, 0.8*inch, 1*inch])
-            items_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f97316')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -4), colors.white),
-                ('GRID', (0, 0), (-1, -4), 1, colors.grey),
-                ('LINEABOVE', (4, -3), (-1, -3), 2, colors.grey),
-                ('LINEABOVE', (4, -1), (-1, -1), 2, colors.HexColor('#f97316')),
-                ('FONTNAME', (4, -1), (-1, -1), 'Helvetica-Bold'),
-            ]))
-            elements.append(items_table)
-            elements.append(Spacer(1, 20))
-    
-    # Payment Terms
-    elements.append(Paragraph("PAYMENT TERMS:", heading_style))
-    advance_amount = quotation.get("advance_amount", 0)
-    advance_percent = quotation.get("advance_percent", 30)
-    grand_total = quotation.get("grand_total", 0)
-    
-    payment_terms_data = [
-        [f"Advance Payment ({advance_percent}%):", f"₹{advance_amount:,.2f}"],
-        ["Balance Payment:", f"₹{grand_total - advance_amount:,.2f}"],
-        ["Grand Total:", f"₹{grand_total:,.2f}"],
-    ]
-    
-    payment_table = Table(payment_terms_data, colWidths=[4*inch, 2*inch])
-    payment_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('TEXTCOLOR', (0, -1), (-1, -1), colors.HexColor('#f97316')),
-        ('FONTSIZE', (0, -1), (-1, -1), 14),
-        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#f97316')),
-    ]))
-    elements.append(payment_table)
-    elements.append(Spacer(1, 20))
-    
-    # Bank Details
-    elements.append(Paragraph("BANK DETAILS:", heading_style))
-    bank_details_text = """
-    <b>Account Name:</b> Travel Company Pvt Ltd<br/>
-    <b>Account Number:</b> 1234567890<br/>
-    <b>IFSC Code:</b> BANK0001234<br/>
-    <b>Bank Name:</b> Example Bank<br/>
-    <b>UPI ID:</b> travelcompany@upi
+
+    return {
+        "quotation_id": quotation["id"],
+        "date": datetime.now().strftime('%d %B %Y'),
+        "expiry_date": quotation.get("expiry_date"),
+        "client": {
+            "name": client.get("name", "N/A"),
+            "email": client.get("email", "N/A"),
+            "phone": client.get("phone", ""),
+            "country_code": client.get("country_code", "+91"),
+            "destination": request.get("destination", "N/A"),
+            "travel_dates": format_preferred_dates(request),
+            "people_count": request["people_count"],
+        },
+        "options": (current_version or {}).get("options") or [],
+        "advance_amount": quotation.get("advance_amount", 0),
+        "advance_percent": quotation.get("advance_percent", 30),
+        "grand_total": quotation.get("grand_total", 0),
+    }
+
+
+# Invoice fields printed on the PDF; nothing else about the invoice affects its content
+INVOICE_PDF_FIELDS = (
+    "invoice_number", "status", "due_date", "gst_number", "advance_amount", "total_amount",
+    "received_at", "verified_at", "method", "accountant_notes", "ops_notes"
+)
+# Bump when invoice_pdf.build_invoice_pdf changes its layout
+INVOICE_PDF_VERSION = "1"
+
+
+async def build_invoice_pdf_data(invoice: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain-dict input for invoice_pdf.build_invoice_pdf."""
+    quotation = await db.quotations.find_one({"id": invoice["quotation_id"]}, {"_id": 1})
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    request = await db.requests.find_one({"id": invoice["request_id"]})
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    return {
+        "invoice": {field: invoice.get(field) for field in INVOICE_PDF_FIELDS if field in invoice},
+        "date": datetime.now().strftime('%d %B %Y'),
+        "client": {
+            "name": invoice["client_name"],
+            "email": invoice["client_email"],
+            "phone": invoice["client_phone"],
+            "country_code": invoice.get("client_country_code", "+91"),
+            "destination": request.get("destination", "N/A"),
+            "travel_dates": format_preferred_dates(request),
+            "people_count": request["people_count"],
+        },
+    }
+
+
+def invoice_pdf_key(data: Dict[str, Any]) -> str:
+    # The print date is stamped at render time and doesn't make a new version
+    content = {k: v for k, v in data.items() if k != "date"}
+    return PDFCache.key_for(content, f"invoice-{INVOICE_PDF_VERSION}")
+
+
+async def materialize_invoice_pdf(invoice_id: str) -> Dict[str, Any]:
     """
-    elements.append(Paragraph(bank_details_text, normal_style))
-    elements.append(Spacer(1, 20))
-    
-    # Terms and Conditions
-    elements.append(Paragraph("TERMS & CONDITIONS:", heading_style))
-    terms_text = """
-    1. This proforma invoice is valid until the expiry date mentioned above.<br/>
-    2. Advance payment is required to confirm the booking.<br/>
-    3. Balance payment must be made before the travel date.<br/>
-    4. Cancellation charges apply as per company policy.<br/>
-    5. All prices are subject to availability at the time of booking.
+    Make sure the PDF for the invoice's current state is in the PDF cache,
+    laying it out only if this exact content hasn't been rendered before.
+    Records the artifact on the invoice and returns it.
     """
-    elements.append(Paragraph(terms_text, normal_style))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get the value of the BytesIO buffer and return as response
-    buffer.seek(0)
-    
-    filename = f"proforma_invoice_{quotation_id[:8]}.pdf"
-    
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    invoice = await db.invoices.find_one({"id": invoice_id})
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    # Read before the data it versions, so a concurrent edit leaves the artifact looking stale, never fresh
+    request = await db.requests.find_one({"id": invoice["request_id"]}, {"_id": 0, "updated_at": 1}) or {}
+
+    data = await build_invoice_pdf_data(invoice)
+    key = invoice_pdf_key(data)
+    if not pdf_cache.exists(key):
+        pdf_bytes = await invoice_pdf_pool.build(invoice_pdf.build_invoice_pdf, data)
+        await asyncio.to_thread(pdf_cache.write, key, pdf_bytes)
+
+    entry = {
+        "key": key,
+        "filename": f"invoice_{invoice['invoice_number']}.pdf",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "invoice_updated_at": invoice.get("updated_at"),
+        "request_updated_at": request.get("updated_at"),
+    }
+    artifact = invoice.get("pdf_artifact") or {}
+    if any(artifact.get(field) != entry[field] for field in ("key", "invoice_updated_at", "request_updated_at")):
+        await db.invoices.update_one({"id": invoice_id}, {"$set": {"pdf_artifact": entry}})
+    return entry
+
+
+async def current_invoice_pdf_artifact(invoice_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The recorded artifact if it was rendered from the invoice and request as
+    they are now and is still in the PDF cache; two point reads, no layout.
+    """
+    invoice = await db.invoices.find_one(
+        {"id": invoice_id}, {"_id": 0, "request_id": 1, "updated_at": 1, "pdf_artifact": 1}
     )
+    artifact = (invoice or {}).get("pdf_artifact")
+    if not artifact or "request_updated_at" not in artifact:
+        return None
+    if artifact.get("invoice_updated_at") != invoice.get("updated_at") or not pdf_cache.exists(artifact["key"]):
+        return None
+    request = await db.requests.find_one({"id": invoice["request_id"]}, {"_id": 0, "updated_at": 1}) or {}
+    if request.get("updated_at") != artifact["request_updated_at"]:
+        return None
+    return artifact
+
+
+class InvoicePDFMaterializer:
+    """
+    Re-renders invoice PDFs in the background after payment state changes,
+    so downloads are served from disk. Transitions arriving while an invoice
+    is being rendered are coalesced into one more render of its latest state.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._dirty: set = set()
+
+    def schedule(self, invoice_id: Optional[str]):
+        if not invoice_id:
+            return
+        task = self._tasks.get(invoice_id)
+        if task is not None and not task.done():
+            self._dirty.add(invoice_id)
+            return
+        self._tasks[invoice_id] = asyncio.create_task(self._run(invoice_id))
+
+    async def _run(self, invoice_id: str):
+        try:
+            while True:
+                self._dirty.discard(invoice_id)
+                try:
+                    await materialize_invoice_pdf(invoice_id)
+                except Exception as e:
+                    detail = e.detail if isinstance(e, HTTPException) else str(e)
+                    logger.warning(f"Invoice {invoice_id} PDF not materialized, will render on download: {detail}")
+                if invoice_id not in self._dirty:
+                    break
+        finally:
+            self._tasks.pop(invoice_id, None)
+
+    async def close(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+invoice_pdf_materializer = InvoicePDFMaterializer()
+
+
+# New endpoint: Download Proforma Invoice PDF
+@api_router.get("/quotations/{quotation_id}/download-proforma")
+async def download_proforma_invoice(quotation_id: str):
+    """Generate and download proforma invoice as PDF"""
+    quotation = await db.quotations.find_one({"id": quotation_id})
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    data = await build_proforma_pdf_data(quotation)
+    pdf_bytes = await invoice_pdf_pool.build(invoice_pdf.build_proforma_pdf, data)
+    return pdf_download_response(pdf_bytes, f"proforma_invoice_{quotation_id[:8]}.pdf")
 
 # Invoice endpoints
 @api_router.get("/invoice", response_model=Invoice)
@@ -2734,227 +5093,107 @@ async def get_invoice(invoice_id: str):
 
 # New endpoint: Download Invoice PDF (after payment verification)
 @api_router.get("/invoices/{invoice_id}/download")
-async def download_invoice(invoice_id: str):
-    """Generate and download invoice as PDF after payment verification"""
-    invoice = await db.invoices.find_one({"id": invoice_id}) 
-    if not invoice:
-        raise HTTPException(status_code=404, detail="Invoice not found")
-    
-    status = invoice.get("status", "Verification Pending")
-
-    # Get quotation and request details
-    quotation = await db.quotations.find_one({"id": invoice["quotation_id"]})
-    if not quotation:
-        raise HTTPException(status_code=404, detail="Quotation not found")
-    
-    request = await db.requests.find_one({"id": invoice["request_id"]})
-    if not request:
-        raise HTTPException(status_code=404, detail="Request not found")
-    
-    # Create PDF in memory
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=40, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#10b981'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#059669'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    normal_style = styles['Normal']
-    
-    # Title with PAID badge
-    elements.append(Paragraph("INVOICE", title_style))
-    paid_style = ParagraphStyle(
-        'PaidBadge',
-        parent=styles['Normal'],
-        fontSize=16,
-        textColor=colors.HexColor('#10b981' if status == "Paid" else '#f59e0b' if status == "Partially Paid" else '#ef4444'), # Verification Pending, Partially Paid, Paid
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    elements.append(Paragraph((status or "").upper(), paid_style))
-    elements.append(Spacer(1, 12))
-    
-    # Company Details
-    company_data = [
-        ["Traveego Company Pvt Ltd", ""],
-        ["123 Business Street", f"Date: {datetime.now().strftime('%d %B %Y')}"],
-        ["City, State - 123456", f"Invoice #: {invoice['invoice_number']}"],
-        ["Phone: +91-1234567890", f"Due Date: {datetime.fromisoformat(invoice['due_date']).strftime('%d %B %Y')}"],
-        ["GST: " + (invoice.get('gst_number', 'N/A')), ""],
-    ]
-    
-    company_table = Table(company_data, colWidths=[3*inch, 3*inch])
-    company_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-    ]))
-    elements.append(company_table)
-    elements.append(Spacer(1, 20))
-    
-    # Client Details
-    elements.append(Paragraph("BILL TO:", heading_style))
-    client_data = [
-        ["Client Name:", invoice["client_name"]],
-        ["Email:", invoice["client_email"]],
-        ["Phone:", f"{invoice.get('client_country_code', '+91')} {invoice['client_phone']}"],
-        ["Destination:", request.get("destination", "N/A")],
-        ["Travel Dates:", request["preferred_dates"]],
-        ["Number of People:", str(request["people_count"])],
-    ]
-    
-    client_table = Table(client_data, colWidths=[1.5*inch, 4.5*inch])
-    client_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    elements.append(client_table)
-    elements.append(Spacer(1, 20))    
-    
-    # Payment Summary
-    elements.append(Paragraph("PAYMENT SUMMARY:", heading_style))
-    advance_amount = invoice.get("advance_amount", 0)
-    total_amount = invoice.get("total_amount", 0)
-    
-    payment_summary_data = [
-        ["Advance Payment:", f"Rs. {advance_amount:,.2f}"],
-        ["Balance Payment:", f"Rs. {total_amount - advance_amount:,.2f}"],
-        ["Total Amount:", f"Rs. {total_amount:,.2f}"],
-    ]
-    
-    payment_table = Table(payment_summary_data, colWidths=[4*inch, 2*inch])
-    payment_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('TOPPADDING', (0, 0), (-1, -2), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -2), 6),
-        ('BOTTOMPADDING', (0, -2), (-1, -2), 14),
-        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#10b981')),
-        ('TOPPADDING', (0, -1), (-1, -1), 14),
-        ('TEXTCOLOR', (0, -1), (-1, -1), colors.HexColor('#10b981')),
-        ('FONTSIZE', (0, -1), (-1, -1), 14),
-    ]))
-    elements.append(payment_table)
-    elements.append(Spacer(1, 20))
-    
-    # Payment Verification Details
-    elements.append(Paragraph("PAYMENT VERIFICATION:", heading_style))
-    if not (status == "Paid" or status == "Partially Paid"):
-        global verification_text
-        verification_text = "<b style='color:red;'>Payment not yet verified by Operations.</b>"
-    else:
-        verification_text = f"""
-        <b>Payment Received:</b> {datetime.fromisoformat(invoice['received_at']).strftime('%d %B %Y, %I:%M %p') if invoice.get('received_at') else 'N/A'}<br/>
-        <b>Verified by Operations:</b> {datetime.fromisoformat(invoice['verified_at']).strftime('%d %B %Y, %I:%M %p') if invoice.get('verified_at') else 'N/A'}<br/>
-        <b>Payment Method:</b> {invoice.get('method', 'N/A').replace('_', ' ').title()}<br/>
-        """
-        if invoice.get('accountant_notes'):
-            verification_text += f"<b>Accountant Notes:</b> {invoice['accountant_notes']}<br/>"
-        if invoice.get('ops_notes'):
-            verification_text += f"<b>Operations Notes:</b> {invoice['ops_notes']}<br/>"
-    
-    elements.append(Paragraph(verification_text, normal_style))
-    elements.append(Spacer(1, 20))
-    
-    # Terms and Conditions
-    elements.append(Paragraph("TERMS & CONDITIONS:", heading_style))
-    if status == "Paid" or status == "Partially Paid":
-        global terms_text
-        terms_text = """
-        1. This invoice confirms the payment received for the travel services booked.<br/>
-        2. All services are subject to availability and confirmation from suppliers.<br/>
-        3. Cancellation charges apply as per company policy.<br/>
-        4. Any disputes are subject to the jurisdiction of the company's registered office.<br/>
-        5. Thank you for choosing our services.
-        """
-    else:
-        terms_text = """
-        1. This invoice is issued pending payment verification.<br/>
-        2. Please ensure payment is verified to confirm your booking.<br/>
-        3. Cancellation charges apply as per company policy.<br/>
-        4. Any disputes are subject to the jurisdiction of the company's registered office.<br/>
-        5. Thank you for choosing our services.
-        """
-    elements.append(Paragraph(terms_text, normal_style))
-    elements.append(Spacer(1, 20))
-    
-    # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#10b981'),
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    elements.append(Paragraph("Thank you for your business!", footer_style))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get the value of the BytesIO buffer and return as response
-    buffer.seek(0)
-    
-    filename = f"invoice_{invoice['invoice_number']}.pdf"
-    
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+async def download_invoice(
+    invoice_id: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    """Download the invoice PDF. Served from the artifact rendered after the last payment transition."""
+    entry = await current_invoice_pdf_artifact(invoice_id)
+    if entry is None:
+        # The background render hasn't caught up yet (or the file was evicted)
+        entry = await materialize_invoice_pdf(invoice_id)
+    try:
+        return pdf_cache.response(entry["key"], entry["filename"], if_none_match, if_modified_since)
+    except FileNotFoundError:
+        # Another worker evicted it since the lookup
+        entry = await materialize_invoice_pdf(invoice_id)
+        return pdf_cache.response(entry["key"], entry["filename"], if_none_match, if_modified_since)
 
 # Payment endpoints
-@api_router.get("/payments")
+@api_router.get("/payments", response_model=List[Payment])
 async def get_payments(status: Optional[str] = None):
     query = {}
     if status:
         query["status"] = status
     
-    payments = await db.payments.find(query).to_list(1000)
+    payments = await db.payments.find(query, model_projection(Payment)).to_list(1000)
+    await attach_payment_clients(payments)
+    return fast_json_response(shape_rows(payments, Payment))
 
-    invoice_ids = []
-    for payment in payments:
-        invoice_id = payment.get("invoice_id")
-        invoice_ids.append(invoice_id)
-    
-    # get invoice data
-    invoices = await db.invoices.find({"id": {"$in": invoice_ids}}).to_list(1000)
-    
+
+PAYMENT_CLIENT_FIELDS = ["client_name", "client_phone", "client_email", "client_country_code"]
+
+
+async def attach_payment_clients(payments: List[Dict[str, Any]], projection: Optional[Dict[str, int]] = None):
+    """Copy the client fields (those in `projection`, if given) from each payment's invoice, fetched in one query."""
+    fields = [field for field in PAYMENT_CLIENT_FIELDS if projection is None or field in projection]
+    if not fields:
+        return
+    invoice_ids = list({payment.get("invoice_id") for payment in payments})
+    invoices = {
+        invoice["id"]: invoice
+        async for invoice in db.invoices.find(
+            {"id": {"$in": invoice_ids}},
+            {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+        )
+    }
     for payment in payments:
-        invoice = next((inv for inv in invoices if inv.get("id") == payment.get("invoice_id")), None)
+        invoice = invoices.get(payment.get("invoice_id"))
         if invoice:
-            payment["client_name"] = invoice.get("client_name")
-            payment["client_phone"] = invoice.get("client_phone")
-            payment["client_email"] = invoice.get("client_email")
-            payment["client_country_code"] = invoice.get("client_country_code")
+            payment.update({field: invoice.get(field) for field in fields})
+
+
+LEDGER_ROLES = ["accountant", "operations", "admin"]
+LEDGER_MAX_LIMIT = int(os.environ.get('LEDGER_MAX_LIMIT', '200'))
 
 
-    return [Payment(**pay) for pay in payments]
+@api_router.get("/payments/ledger")
+async def get_payments_ledger(
+    status: Optional[PaymentStatus] = None,
+    method: Optional[str] = None,
+    invoice_id: Optional[str] = None,
+    client_id: Optional[str] = None,
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    fields: Optional[str] = None,
+    page: Page = Depends(paginate(NEWEST_FIRST, 50, LEDGER_MAX_LIMIT)),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Payments newest first (`sort=created_at` for oldest), paginated on
+    (created_at, id). Pass the returned `next_cursor` back as `cursor` for
+    the next page; it is null on the last. `fields` limits the payment
+    fields returned.
+    """
+    if current_user.get("role") not in LEDGER_ROLES:
+        raise HTTPException(status_code=403, detail="Not authorized to view the payments ledger")
+
+    query: Dict[str, Any] = {}
+    if status:
+        query["status"] = status
+    if method:
+        query["method"] = method
+    if invoice_id:
+        query["invoice_id"] = invoice_id
+    if client_id:
+        request_ids = await db.requests.distinct("id", {"client_id": client_id})
+        client_invoice_ids = await db.invoices.distinct("id", {"request_id": {"$in": request_ids}})
+        query.setdefault("invoice_id", {"$in": client_invoice_ids})
+        if invoice_id and invoice_id not in client_invoice_ids:
+            return {"payments": [], "next_cursor": None, "limit": page.limit}
+    created_at = export_date_range(from_date, to_date)
+    if created_at:
+        query["created_at"] = created_at
+
+    projection = fields_projection(fields, Payment, None)
+    if projection and any(field in projection for field in PAYMENT_CLIENT_FIELDS):
+        projection["invoice_id"] = 1
+    payments = await page.fetch(db.payments, query, projection or {"_id": 0})
+    if projection is None or "invoice_id" in projection:
+        await attach_payment_clients(payments, projection)
+
+    return {"payments": shape_documents(payments, Payment, projection), "next_cursor": page.next_cursor, "limit": page.limit}
 
 @api_router.get("/payments/{payment_id}", response_model=Payment)
 async def get_payment(payment_id: str):
@@ -3091,7 +5330,7 @@ async def create_payment(data: CreatePaymentRequest, current_user: Dict = Depend
         type="partial_payment"
     )
     
-    await db.payments.insert_one(payment.model_dump())
+    await db.payments.insert_one({**payment.model_dump(), **await invoice_owners(invoice)})
     
     # Create activity log
     request_id = invoice.get("request_id")
@@ -3151,7 +5390,7 @@ async def mark_payment_received(payment_id: str, data: Dict[str, Any]):
         )
         await db.invoices.update_one(
             {"id": payment.get("invoice_id")},
-            {"$set": {"status": "PAID"}}
+            {"$set": {"status": "PAID", "updated_at": datetime.now(timezone.utc).isoformat()}}
         )
     else:
         await db.payments.update_one(
@@ -3164,6 +5403,7 @@ async def mark_payment_received(payment_id: str, data: Dict[str, Any]):
             }}
         )
 
+    invoice_pdf_materializer.schedule(payment.get("invoice_id"))
     return {"success": True}
 
 @api_router.put("/payments/{payment_id}/verify")
@@ -3194,6 +5434,7 @@ async def verify_payment(payment_id: str, data: Dict[str, Any]):
         {"id": invoice_id},
         {"$set": {
             "status": "Partial Paid" if status == PaymentStatus.VERIFIED_BY_OPS else "Refund Initiated",
+            "updated_at": datetime.now(timezone.utc).isoformat(),
         }}
     )
 
@@ -3216,12 +5457,12 @@ async def verify_payment(payment_id: str, data: Dict[str, Any]):
 
 # Activity endpoints
 @api_router.get("/activities", response_model=List[Activity])
-async def get_activities(request_id: Optional[str] = None):
+async def get_activities(request_id: Optional[str] = None, page: Page = Depends(paginate(NEWEST_FIRST, 1000))):
     query = {}
     if request_id:
         query["request_id"] = request_id
     
-    activities = await db.activities.find(query).sort("created_at", -1).to_list(1000)
+    activities = await page.fetch(db.activities, query)
     return [Activity(**act) for act in activities]
 
 @api_router.post("/activities", response_model=Activity)
@@ -3230,31 +5471,49 @@ async def create_activity(activity: Activity):
     return activity
 
 # Catalog endpoints
+CATALOG_SORTS = {
+    "name": [("name", ASCENDING), ("id", ASCENDING)],
+    **NEWEST_FIRST,
+}
+
+
 @api_router.get("/catalog", response_model=List[CatalogItem])
-async def get_catalog(type: Optional[str] = None, destination: Optional[str] = None):
-    query = {}
-    if type:
-        query["type"] = type
-    if destination:
-        query["destination"] = destination
-    
-    items = await db.catalog.find(query).to_list(1000)
-    return [CatalogItem(**item) for item in items]
+async def get_catalog(
+    response: Response,
+    type: Optional[str] = None,
+    destination: Optional[str] = None,
+    supplier: Optional[str] = None,
+    page: Page = Depends(paginate(CATALOG_SORTS, 1000)),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Served from the in-memory catalog index; unchanged catalogs get 304 Not Modified."""
+    items = await catalog_index.find(type=type or None, destination=destination or None, supplier=supplier or None)
+    headers = {"ETag": catalog_index.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(catalog_index.etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return fast_json_response(shape_rows(page.select(items), CatalogItem), response)
 
 @api_router.post("/catalog", response_model=CatalogItem)
 async def create_catalog_item(item: CatalogItem):
     await db.catalog.insert_one(item.dict())
+    await catalog_index.add(item.dict())
     return item
 
 # Notification endpoints with params unreadOnly and need to fetch user-specific notifications
 @api_router.get("/notifications", response_model=List[Notification])
-async def get_notifications(unread_only: Optional[bool] = False, current_user: Dict = Depends(get_current_user)):
+async def get_notifications(
+    unread_only: Optional[bool] = False,
+    page: Page = Depends(paginate(NEWEST_FIRST, 100)),
+    current_user: Dict = Depends(get_current_user),
+    _: None = Depends(conditional(change_stamp("notifications")))
+):
     user_id = current_user.get("sub")
     query = {"user_id": user_id}
     if unread_only:
         query["is_read"] = False
     
-    notifications = await db.notifications.find(query).sort("created_at", -1).to_list(100)
+    notifications = await page.fetch(db.notifications, query)
     return [Notification(**notif) for notif in notifications]
 
 @api_router.put("/notifications/{notification_id}/read")
@@ -3298,14 +5557,23 @@ async def send_message(request_id: str, message: Message, current_user: Dict = D
     
     # Save the message
     await db.messages.insert_one(message.model_dump())
+    await db.requests.update_one(
+        {"id": request_id},
+        {"$inc": {"message_count": 1}, "$max": {"last_message_at": message.created_at}}
+    )
     
     # Create notifications for all participants except the sender
     participants = []
+    people = await user_directory.get_many([
+        request_data.get("client_id"),
+        request_data.get("assigned_salesperson_id"),
+        request_data.get("assigned_operation_id"),
+    ])
     
     # Add client (request creator)
     if request_data.get("client_id") and request_data.get("client_id") != user_id:
         # Get client info
-        client = await db.users.find_one({"id": request_data["client_id"]})
+        client = people.get(request_data["client_id"])
         
         if client:
             participants.append({
@@ -3316,7 +5584,7 @@ async def send_message(request_id: str, message: Message, current_user: Dict = D
     # Add assigned salesperson
     if request_data.get("assigned_salesperson_id") and request_data.get("assigned_salesperson_id") != user_id:
 
-        salesPerson = await db.users.find_one({"id": request_data["assigned_salesperson_id"]})
+        salesPerson = people.get(request_data["assigned_salesperson_id"]) or {}
 
         participants.append({
             "user_id": request_data["assigned_salesperson_id"],
@@ -3325,7 +5593,7 @@ async def send_message(request_id: str, message: Message, current_user: Dict = D
 
     # Add assigned operations
     if request_data.get("assigned_operation_id") and request_data.get("assigned_operation_id") != user_id:
-        operationsPerson = await db.users.find_one({"id": request_data["assigned_operation_id"]})
+        operationsPerson = people.get(request_data["assigned_operation_id"]) or {}
 
         participants.append({
             "user_id": request_data["assigned_operation_id"],
@@ -3344,9 +5612,30 @@ async def send_message(request_id: str, message: Message, current_user: Dict = D
     
     return message
 
+MESSAGE_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+MESSAGE_SORT_OLDEST_FIRST = [("created_at", ASCENDING), ("id", ASCENDING)]
+MESSAGE_MAX_LIMIT = 100
+
+
+def message_cursor(message: Dict[str, Any]) -> str:
+    return encode_cursor([message["created_at"], message["id"]])
+
+
 @api_router.get("/requests/{request_id}/messages")
-async def get_messages(request_id: str, page: int = 1, limit: int = 10, authorization: str = Header(None), current_user: Dict = Depends(get_current_user)):
-    """Get messages for a request with pagination (10 messages per page, latest first)"""
+async def get_messages(
+    request_id: str,
+    page: Optional[int] = Query(None, ge=1),
+    limit: int = Query(10, ge=1, le=MESSAGE_MAX_LIMIT),
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Get messages for a request, latest first (10 per page by default).
+    Pass `next_cursor` back as `before` for older messages, or
+    `latest_cursor` as `since` to fetch only messages sent after it.
+    `page` is kept for older clients and still pages with a skip.
+    """
 
     user_id = current_user.get("sub")
     
@@ -3363,27 +5652,54 @@ async def get_messages(request_id: str, page: int = 1, limit: int = 10, authoriz
     
     if not (is_client or is_assigned_sales or is_assigned_operations or is_admin):
         raise HTTPException(status_code=403, detail="You don't have access to this chat")
-    
-    # Calculate skip for pagination
-    skip = (page - 1) * limit
-    
-    # Get messages sorted by created_at descending (latest first)
-    messages = await db.messages.find(
-        {"request_id": request_id}
-    ).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    
-    # Get total count for pagination info
-    total_count = await db.messages.count_documents({"request_id": request_id})
-    
+
+    if before and since:
+        raise HTTPException(status_code=400, detail="Pass either before or since, not both")
+
+    query = {"request_id": request_id}
+    if since:
+        # Oldest new messages first, so a burst larger than `limit` arrives in order over several polls
+        query.update(keyset_filter(MESSAGE_SORT_OLDEST_FIRST, decode_cursor(since, 2)))
+        cursor = db.messages.find(query).sort(MESSAGE_SORT_OLDEST_FIRST)
+    else:
+        if before:
+            query.update(keyset_filter(MESSAGE_SORT, decode_cursor(before, 2)))
+        cursor = db.messages.find(query).sort(MESSAGE_SORT)
+        if page and not before:
+            cursor = cursor.skip((page - 1) * limit)
+    # One extra row tells us whether there is more
+    messages = await cursor.limit(limit + 1).to_list(limit + 1)
+    has_more = len(messages) > limit
+    messages = messages[:limit][::-1] if since else messages[:limit]
+    newest_page = not before and not (page and page > 1)
+
+    # Maintained by send_message; requests that predate it get it from migration 3
+    total_count = request_data.get("message_count")
+    if total_count is None:
+        total_count = await db.messages.count_documents({"request_id": request_id})
+
     return {
         "messages": [Message(**msg) for msg in messages],
-        "page": page,
+        "page": page or 1,
         "limit": limit,
         "total": total_count,
-        "has_more": (skip + len(messages)) < total_count
+        "has_more": has_more,
+        "next_cursor": message_cursor(messages[-1]) if has_more and not since else None,
+        "latest_cursor": message_cursor(messages[0]) if messages and newest_page else since,
     }
 
 
+@migration(3, "Backfill message_count and last_message_at on requests")
+async def backfill_request_message_counts(database):
+    async for row in database.messages.aggregate([
+        {"$group": {"_id": "$request_id", "count": {"$sum": 1}, "last": {"$max": "$created_at"}}}
+    ]):
+        await database.requests.update_one(
+            {"id": row["_id"]},
+            {"$set": {"message_count": row["count"], "last_message_at": row["last"]}}
+        )
+
+
 # Leave Management Endpoints
 @api_router.post("/leaves", response_model=Leave)
 async def create_leave(leave: Leave):
@@ -3423,8 +5739,18 @@ async def create_leave(leave: Leave):
     
     return leave
 
+LEAVE_SORTS = {
+    "-start_date": [("start_date", DESCENDING), ("id", DESCENDING)],
+    "start_date": [("start_date", ASCENDING), ("id", ASCENDING)],
+}
+
+
 @api_router.get("/leaves", response_model=List[Leave])
-async def get_leaves(user_id: Optional[str] = None, status: Optional[str] = None):
+async def get_leaves(
+    user_id: Optional[str] = None,
+    status: Optional[str] = None,
+    page: Page = Depends(paginate(LEAVE_SORTS, 1000))
+):
     """Get all leaves with optional filters"""
     query = {}
     if user_id:
@@ -3432,8 +5758,8 @@ async def get_leaves(user_id: Optional[str] = None, status: Optional[str] = None
     if status:
         query["status"] = status
     
-    leaves = await db.leaves.find(query).sort("start_date", -1).to_list(1000)
-    return [Leave(**leave) for leave in leaves]
+    leaves = await page.fetch(db.leaves, query, model_projection(Leave))
+    return fast_json_response(shape_rows(leaves, Leave), page.response)
 
 @api_router.get("/leaves/my-leaves")
 async def get_my_leaves(user_id: str):
@@ -3576,6 +5902,7 @@ async def toggle_cost_breakup_permission(
         {"id": user_id},
         {"$set": {"can_see_cost_breakup": can_see}}
     )
+    await user_directory.invalidate(user_id)
     
     # Log the activity
     activity = Activity(
@@ -3591,9 +5918,9 @@ async def toggle_cost_breakup_permission(
 
 # Admin Settings Management
 @api_router.get("/admin/settings", response_model=AdminSettings)
-async def get_admin_settings():
+async def get_admin_settings(_: None = Depends(conditional("admin_settings"))):
     """Get admin settings. Creates default settings if none exist."""
-    settings = await db.admin_settings.find_one({})
+    settings = await admin_settings_provider.get()
     
     if not settings:
         # Create default settings
@@ -3605,6 +5932,7 @@ async def get_admin_settings():
             testimonials=[]
         )
         await db.admin_settings.insert_one(default_settings.dict())
+        await admin_settings_provider.invalidate()
         return default_settings
     
     return AdminSettings(**settings)
@@ -3629,7 +5957,7 @@ async def update_admin_settings(
         "testimonials": settings_data.get("testimonials", []),
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
-    
+
     if existing_settings:
         # Update existing
         await db.admin_settings.update_one(
@@ -3637,11 +5965,16 @@ async def update_admin_settings(
             {"$set": update_data}
         )
         updated_settings = await db.admin_settings.find_one({"id": existing_settings["id"]})
+        await admin_settings_provider.invalidate()
+        # Terms and privacy policy are baked into every quotation PDF
+        await invalidate_quotation_pdfs()
         return AdminSettings(**updated_settings)
     else:
         # Create new
         new_settings = AdminSettings(**update_data)
         await db.admin_settings.insert_one(new_settings.dict())
+        await admin_settings_provider.invalidate()
+        await invalidate_quotation_pdfs()
         return new_settings
     
 # User Management Endpoints (Admin Only)
@@ -3680,13 +6013,15 @@ async def create_user(
     }
     
     await db.users.insert_one(new_user)
+    await user_directory.invalidate(new_user["id"])
     
     return {"success": True, "message": "User created successfully"}
 
 @api_router.get("/admin/users")
 async def get_all_users(
     current_user: dict = Depends(get_current_user),
-    role: Optional[str] = None
+    role: Optional[str] = None,
+    page: Page = Depends(paginate(NEWEST_FIRST, 1000))
 ):
     """Get all users. Only accessible by admin role."""
     if current_user.get("role") != "admin":
@@ -3698,8 +6033,7 @@ async def get_all_users(
         query["role"] = role
     
     # Get users from database
-    users_cursor = db.users.find(query).sort("created_at", -1)
-    users = await users_cursor.to_list(length=None)
+    users = await page.fetch(db.users, query)
     
     # Remove passwords from response
     for user in users:
@@ -3781,6 +6115,7 @@ async def update_user(
         {"id": user_id},
         {"$set": update_data}
     )
+    await user_directory.invalidate(user_id)
     # Get updated user
     updated_user = await db.users.find_one({"id": user_id})
     updated_user.pop("password", None)
@@ -3811,6 +6146,7 @@ async def delete_user(
             "deactivated_by": current_user.get("id")
         }}
     )
+    await user_directory.invalidate(user_id)
     
     
     return {"success": True, "message": "User deactivated successfully"}
@@ -3910,7 +6246,8 @@ async def update_quotation_detailed_data(
             "$set": {
                 "detailed_quotation_data": updated_detailed_data,
                 "updated_at": datetime.now(timezone.utc).isoformat()
-            }
+            },
+            "$unset": {"pdf_cache": ""}
         }
     )
     
@@ -3931,52 +6268,63 @@ async def upload_file(file: UploadFile = File(...)):
     return {"file_url": f"/uploads/{file_path.name}"}
 
 # Dashboard stats
-@api_router.get("/dashboard/stats")
-async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
-    role = current_user.get("role")
-    user_id = current_user.get("sub")
-    stats = {}
-    
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', '5'))
+
+
+async def _sum_amount(collection, match: Dict[str, Any]) -> float:
+    result = await collection.aggregate([
+        {"$match": match},
+        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
+    ]).to_list(1)
+    return result[0]["total"] if result else 0
+
+
+async def compute_dashboard_stats(role: str, user_id: str) -> Dict[str, Any]:
+    """
+    The tiles for one user's dashboard. Each tile is an indexed count against
+    the owner fields copied from the request, run concurrently.
+    """
     if role == "operations":
-        # Expiring quotes
-        expiring_count = await db.quotations.count_documents({
-            "status": QuotationStatus.SENT,
-            "assigned_operation_id": user_id,
-            "expiry_date": {"$lte": (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()}
-        })
-        
-        # Pending payments
-        pending_payments = await db.payments.count_documents({
-            "status": {"$in": [PaymentStatus.PENDING, PaymentStatus.RECEIVED_BY_ACCOUNTANT]},
-            "assigned_operation_id": user_id
-        })
-        
-        stats = {
-            "expiring_quotes": expiring_count,
-            "pending_payments": pending_payments,
-            "active_requests": await db.requests.count_documents({"status": RequestStatus.PENDING, "assigned_operation_id": user_id}),
-            "open_requests": await db.requests.count_documents({"status": RequestStatus.PENDING, "assigned_operation_id": {"$exists": False}}),
-            "total_revenue": await db.payments.aggregate([
-                {"$match": {"status": PaymentStatus.VERIFIED_BY_OPS, "assigned_operation_id": user_id}},
-                {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-            ]).to_list(1)
+        tiles = {
+            "expiring_quotes": db.quotations.count_documents({
+                "status": QuotationStatus.SENT,
+                "assigned_operation_id": user_id,
+                "expiry_date": {"$lte": (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()}
+            }),
+            "pending_payments": db.payments.count_documents({
+                "status": {"$in": [PaymentStatus.PENDING, PaymentStatus.RECEIVED_BY_ACCOUNTANT]},
+                "assigned_operation_id": user_id
+            }),
+            "active_requests": db.requests.count_documents({"status": RequestStatus.PENDING, "assigned_operation_id": user_id}),
+            "open_requests": db.requests.count_documents({"status": RequestStatus.PENDING, "assigned_operation_id": {"$exists": False}}),
+            "total_revenue": _sum_amount(db.payments, {"status": PaymentStatus.VERIFIED_BY_OPS, "assigned_operation_id": user_id}),
         }
-    
     elif role == "sales":
-        stats = {
-            "my_requests": await db.requests.count_documents({"assigned_salesperson_id": user_id}),
-            "pending_quotes": await db.quotations.count_documents({"status": QuotationStatus.SENT, "assigned_salesperson_id": user_id}),
-            "accepted_quotes": await db.quotations.count_documents({"status": QuotationStatus.ACCEPTED, "assigned_salesperson_id": user_id}),
+        tiles = {
+            "my_requests": db.requests.count_documents({"assigned_salesperson_id": user_id}),
+            "pending_quotes": db.quotations.count_documents({"status": QuotationStatus.SENT, "assigned_salesperson_id": user_id}),
+            "accepted_quotes": db.quotations.count_documents({"status": QuotationStatus.ACCEPTED, "assigned_salesperson_id": user_id}),
         }
-    
     elif role == "accountant":
-        stats = {
-            "pending_verification": await db.payments.count_documents({"status": PaymentStatus.RECEIVED_BY_ACCOUNTANT}),
-            "pending_payments": await db.payments.count_documents({"status": PaymentStatus.PENDING}),
-            "verified_payments": await db.payments.count_documents({"status": PaymentStatus.VERIFIED_BY_OPS})
+        tiles = {
+            "pending_verification": db.payments.count_documents({"status": PaymentStatus.RECEIVED_BY_ACCOUNTANT}),
+            "pending_payments": db.payments.count_documents({"status": PaymentStatus.PENDING}),
+            "verified_payments": db.payments.count_documents({"status": PaymentStatus.VERIFIED_BY_OPS}),
         }
-    
-    return stats
+    else:
+        return {}
+    return dict(zip(tiles, await asyncio.gather(*tiles.values())))
+
+
+dashboard_stats_cache = TTLCache(DASHBOARD_CACHE_TTL)
+
+
+@api_router.get("/dashboard/stats")
+async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+    role = current_user.get("role")
+    user_id = current_user.get("sub")
+    # A few seconds stale is fine for tiles; simultaneous loads share one computation
+    return await dashboard_stats_cache.get((role, user_id), lambda: compute_dashboard_stats(role, user_id))
 
 
 @api_router.get("/download")
@@ -4041,6 +6389,172 @@ async def download_data(table: str, format: str = "csv"):
         raise HTTPException(status_code=400, detail="Invalid format. Use 'csv' or 'sql'")
 
 
+# ============================================================================
+# Bulk PDF Exports
+# ============================================================================
+
+EXPORT_ROLES = ["operations", "accountant", "admin"]
+
+
+class ZipChunkSink:
+    """
+    Write-only, non-seekable file object for zipfile. Written bytes are
+    collected until drained, so the archive can be streamed out entry by
+    entry instead of being built in memory.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def export_date_range(from_date: Optional[str], to_date: Optional[str]) -> Dict[str, str]:
+    """`created_at` filter for an inclusive YYYY-MM-DD range."""
+    created_at = {}
+    try:
+        if from_date:
+            created_at["$gte"] = datetime.fromisoformat(from_date).date().isoformat()
+        if to_date:
+            created_at["$lt"] = (datetime.fromisoformat(to_date).date() + timedelta(days=1)).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    return created_at
+
+
+async def stream_pdf_zip(
+    ids,
+    fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+    concurrency: int
+):
+    """
+    Yield a ZIP archive of the PDFs for `ids` (an async iterator), rendering
+    up to `concurrency` documents ahead of the one being written. Documents
+    that fail to render are listed in errors.txt instead of aborting the
+    download half way through.
+    """
+    sink = ZipChunkSink()
+    pending = deque()
+    names = set()
+    errors = []
+
+    async def schedule_next() -> bool:
+        try:
+            doc_id = await ids.__anext__()
+        except StopAsyncIteration:
+            return False
+        pending.append((doc_id, asyncio.create_task(fetch(doc_id))))
+        return True
+
+    try:
+        # PDFs are already compressed, so entries are stored as-is
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for _ in range(concurrency * 2):
+                if not await schedule_next():
+                    break
+
+            while pending:
+                doc_id, task = pending.popleft()
+                try:
+                    entry = await task
+                except Exception as e:
+                    errors.append(f"{doc_id}: {e.detail if isinstance(e, HTTPException) else e}")
+                    entry = None
+                await schedule_next()
+
+                content = None
+                if entry is not None:
+                    try:
+                        content = await asyncio.to_thread(pdf_cache.path(entry["key"]).read_bytes)
+                    except FileNotFoundError:
+                        # Evicted by another worker since it was rendered; fetching again re-renders it
+                        try:
+                            entry = await fetch(doc_id)
+                            content = await asyncio.to_thread(pdf_cache.path(entry["key"]).read_bytes)
+                        except Exception as e:
+                            errors.append(f"{doc_id}: {e.detail if isinstance(e, HTTPException) else e}")
+
+                if content is not None:
+                    name = entry["filename"]
+                    if name in names:
+                        name = f"{Path(name).stem}-{doc_id[:8]}.pdf"
+                    names.add(name)
+                    archive.writestr(name, content)
+                    yield sink.drain()
+
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+        yield sink.drain()
+    finally:
+        # Client went away: stop rendering what nobody will download
+        for _, task in pending:
+            task.cancel()
+
+
+async def export_ids(collection, created_at: Dict[str, str]):
+    query = {"created_at": created_at} if created_at else {}
+    async for doc in collection.find(query, {"_id": 0, "id": 1}).sort("created_at", 1):
+        yield doc["id"]
+
+
+def zip_download_response(chunks, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@api_router.get("/exports/invoices.zip")
+async def export_invoices_zip(
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    current_user: Dict = Depends(get_current_user)
+):
+    """ZIP of every invoice PDF created in the date range."""
+    if current_user.get("role") not in EXPORT_ROLES:
+        raise HTTPException(status_code=403, detail="Not allowed to export invoices")
+    created_at = export_date_range(from_date, to_date)
+
+    chunks = stream_pdf_zip(
+        export_ids(db.invoices, created_at),
+        materialize_invoice_pdf,
+        concurrency=invoice_pdf_pool.workers
+    )
+    return zip_download_response(chunks, f"invoices_{from_date or 'all'}_{to_date or 'all'}.zip")
+
+
+@api_router.get("/exports/quotations.zip")
+async def export_quotations_zip(
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    engine: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    """ZIP of every quotation PDF created in the date range."""
+    if current_user.get("role") not in EXPORT_ROLES:
+        raise HTTPException(status_code=403, detail="Not allowed to export quotations")
+    created_at = export_date_range(from_date, to_date)
+    renderer = get_pdf_renderer(engine)
+
+    chunks = stream_pdf_zip(
+        export_ids(db.quotations, created_at),
+        lambda quotation_id: quotation_pdf_entry(quotation_id, renderer),
+        concurrency=PDF_POOL_SIZE
+    )
+    return zip_download_response(chunks, f"quotations_{from_date or 'all'}_{to_date or 'all'}.zip")
+
+
 # Seed mock data
 @api_router.post("/seed")
 async def seed_data():
@@ -4148,6 +6662,7 @@ async def seed_data():
     ]
     for item in catalog_items:
         await db.catalog.insert_one(item.dict())
+    await catalog_index.invalidate()
     
     # Seed Admin Settings with defaults
     admin_settings = AdminSettings(
@@ -4257,6 +6772,7 @@ async def seed_data():
         ]
     )
     await db.admin_settings.insert_one(admin_settings.dict())
+    await admin_settings_provider.invalidate()
     
     # Seed requests
     requests = [
@@ -4352,7 +6868,7 @@ async def seed_data():
         grand_total=option_a.total
     )
     
-    await db.quotations.insert_one(quotation.dict())
+    await db.quotations.insert_one({**quotation.dict(), **request_owners(requests[1].dict())})
     
     # Create activity
     activity = Activity(
@@ -4629,8 +7145,13 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "X-Total-Count"],
 )
 
+# Compress JSON responses; small bodies aren't worth the CPU
+GZIP_MINIMUM_SIZE = int(os.environ.get('GZIP_MINIMUM_SIZE', '1024'))
+app.add_middleware(JSONGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
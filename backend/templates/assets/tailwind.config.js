@@ -0,0 +1,12 @@
+/** @type {import('tailwindcss').Config} */
+// Used by scripts/build_pdf_assets.py to compile only the Tailwind CSS the PDF templates use
+module.exports = {
+  content: {
+    relative: true,
+    files: ["../*.html"],
+  },
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};
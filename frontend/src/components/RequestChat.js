@@ -13,7 +13,8 @@ export const RequestChat = ({ requestId, currentUser }) => {
   const [newMessage, setNewMessage] = useState('');
   const [loading, setLoading] = useState(false);
   const [sending, setSending] = useState(false);
-  const [page, setPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [latestCursor, setLatestCursor] = useState(null);
   const [hasMore, setHasMore] = useState(false);
   const [totalMessages, setTotalMessages] = useState(0);
   const messagesEndRef = useRef(null);
@@ -22,20 +23,21 @@ export const RequestChat = ({ requestId, currentUser }) => {
     loadMessages();
   }, [requestId]);
 
-  const loadMessages = async (pageNum = 1, append = false) => {
+  const loadMessages = async (before = null, append = false) => {
     try {
       setLoading(true);
-      const response = await api.getMessages(requestId, pageNum);
+      const response = await api.getMessages(requestId, before ? { before } : {});
       
       if (append) {
         // When loading older messages, prepend them to the list
         setMessages([...response.messages.reverse(), ...messages]);
       } else {
-        // Initial load or refresh - reverse to show latest at bottom
+        // Initial load - reverse to show latest at bottom
         setMessages(response.messages.reverse());
+        setLatestCursor(response.latest_cursor);
       }
       
-      setPage(response.page);
+      setNextCursor(response.next_cursor);
       setHasMore(response.has_more);
       setTotalMessages(response.total);
       
@@ -52,8 +54,7 @@ export const RequestChat = ({ requestId, currentUser }) => {
   };
 
   const loadMoreMessages = async () => {
-    const nextPage = page + 1;
-    await loadMessages(nextPage, true);
+    await loadMessages(nextCursor, true);
   };
 
   const handleSendMessage = async () => {
@@ -92,8 +93,34 @@ export const RequestChat = ({ requestId, currentUser }) => {
   };
 
   const handleRefresh = async () => {
-    await loadMessages(1, false);
-    toast.success('Messages refreshed');
+    if (!latestCursor) {
+      await loadMessages();
+      toast.success('Messages refreshed');
+      return;
+    }
+    try {
+      setLoading(true);
+      // Only fetch what arrived since the newest message we have
+      let cursor = latestCursor;
+      let fresh = [];
+      let response;
+      do {
+        response = await api.getMessages(requestId, { since: cursor, limit: 50 });
+        fresh = [...fresh, ...response.messages.reverse()];
+        cursor = response.latest_cursor;
+      } while (response.has_more);
+      const known = new Set(messages.map((message) => message.id));
+      setMessages([...messages, ...fresh.filter((message) => !known.has(message.id))]);
+      setLatestCursor(cursor);
+      setTotalMessages(response.total);
+      toast.success('Messages refreshed');
+      setTimeout(() => scrollToBottom(), 100);
+    } catch (error) {
+      console.error('Failed to refresh messages:', error);
+      toast.error('Failed to refresh messages');
+    } finally {
+      setLoading(false);
+    }
   };
 
   const scrollToBottom = () => {
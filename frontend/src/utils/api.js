@@ -57,6 +57,7 @@ export const api = {
   
   // Payments
   getPayments: (params) => axios.get(`${API_BASE}/payments`, { params }),
+  getPaymentsLedger: (params) => axios.get(`${API_BASE}/payments/ledger`, { params }),
   getPayment: (id) => axios.get(`${API_BASE}/payments/${id}`),
   createPayment: (data) => axios.post(`${API_BASE}/payments`, data),
   uploadPaymentProof: (file) => {
@@ -133,9 +134,10 @@ export const api = {
 
   // Messages/Chat
   sendMessage: (requestId, data) => axios.post(`${API_BASE}/requests/${requestId}/messages`, data),
-  getMessages: (requestId, page = 1, limit = 10) => 
+  // params: { limit, before } for older messages, { limit, since } for new ones
+  getMessages: (requestId, params = {}) => 
     axios.get(`${API_BASE}/requests/${requestId}/messages`, { 
-      params: { page, limit } 
+      params: { limit: 10, ...params } 
     }).then(res => res.data),
 
   //Quotation Builder
@@ -0,0 +1,146 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def sample_quotation_data():
+    """Template input in the shape build_quotation_pdf_data() produces."""
+    return {
+        "id": "quote-test-001",
+        "tripTitle": "Goa Beach Escape",
+        "city": "Goa",
+        "bookingRef": "TRV-TEST-001",
+        "customerName": "John Customer",
+        "dates": "18th Mar, 25 - 21st Mar, 25",
+        "coverImage": "",
+        "salesperson": {
+            "name": "Sales Executive",
+            "email": "sales@travel.com",
+            "phone": "+91 9876543210",
+            "photo": ""
+        },
+        "summary": {
+            "duration": "4 Days / 3 Nights",
+            "travelers": 2,
+            "rating": 4.8,
+            "highlights": ["Beach resort stay", "Sunset cruise"]
+        },
+        "pricing": {
+            "subtotal": 50000,
+            "taxes": 9000,
+            "discount": 0,
+            "total": 59000,
+            "perPerson": 29500,
+            "depositDue": 17700,
+            "currency": "INR"
+        },
+        "days": [
+            {
+                "dayNumber": 1,
+                "date": "18 Mar 2025",
+                "location": "North Goa",
+                "meals": {"breakfast": "Included", "lunch": "Not Included", "dinner": "Included"},
+                "hotel": {
+                    "id": "hotel-1",
+                    "name": "Beach Resort",
+                    "stars": 5,
+                    "image": "",
+                    "address": "Calangute, Goa",
+                    "amenities": ["Pool", "Spa"]
+                },
+                "activities": [
+                    {
+                        "id": "act-1",
+                        "time": "17:00",
+                        "title": "Sunset Cruise",
+                        "description": "Cruise along the Mandovi river",
+                        "meetingPoint": "Panjim Jetty",
+                        "type": "included"
+                    }
+                ]
+            }
+        ],
+        "inclusions": ["Airport transfers"],
+        "exclusions": ["Flights"],
+        "detailedTerms": "Standard terms apply.",
+        "privacyPolicy": "We respect your privacy."
+    }
+
+
+@pytest.fixture
+def pdf_asset_pack():
+    """The built PDF asset pack; skips when scripts/build_pdf_assets.py hasn't been run."""
+    import server
+
+    try:
+        return server.pdf_assets.load()
+    except server.PDFAssetsMissing as e:
+        pytest.skip(str(e))
+
+
+async def _with_test_db(test):
+    import server
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(server.mongo_url, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        client.close()
+        pytest.skip(f"MongoDB is not reachable: {e}")
+    database = client[f"{server.db.name}_test"]
+    await client.drop_database(database.name)
+    # Process-local caches must not carry entries over from another test's data
+    server.user_directory.clear()
+    server.admin_settings_provider.clear()
+    server.catalog_index.clear()
+    try:
+        return await test(database)
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+@pytest.fixture
+def run_with_test_db():
+    """
+    Run `async def test(database)` against a throwaway database on the MongoDB
+    in MONGO_URL. Skips the test when MongoDB isn't reachable.
+    """
+    def run(test):
+        return asyncio.run(_with_test_db(test))
+    return run
+
+
+@pytest.fixture
+def seeded_db(run_with_test_db, monkeypatch):
+    """
+    `seeded_db(seed)` gives a runner like run_with_test_db whose database is
+    filled from `seed` first and then patched in as `server.db`. `seed` maps
+    collection names to documents, or is `async def seed(database)` for data
+    that takes more than inserts. `migrate=True` then applies the migrations,
+    for documents written before a migration existed.
+    """
+    import server
+
+    def with_seed(seed, migrate=False):
+        def run(check):
+            async def seeded(database):
+                if callable(seed):
+                    await seed(database)
+                else:
+                    for collection, docs in seed.items():
+                        await database[collection].insert_many([dict(doc) for doc in docs])
+                if migrate:
+                    await server.apply_migrations(database)
+                monkeypatch.setattr(server, "db", database)
+                return await check(database)
+            return run_with_test_db(seeded)
+        return run
+    return with_seed
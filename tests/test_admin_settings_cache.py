@@ -0,0 +1,69 @@
+"""
+AdminSettingsProvider: settings are served from memory and reloaded only
+when the version stamp moves. Needs MongoDB; skipped when unreachable.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import server
+
+
+class CountingCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.reads = 0
+
+    def find_one(self, *args, **kwargs):
+        self.reads += 1
+        return self.collection.find_one(*args, **kwargs)
+
+
+def test_reads_are_served_from_memory(run_with_test_db, monkeypatch):
+    async def check(database):
+        await database.admin_settings.insert_one({"id": "s-1", "terms_and_conditions": "v1"})
+        settings = CountingCollection(database.admin_settings)
+        monkeypatch.setattr(server, "db", SimpleNamespace(
+            admin_settings=settings, cache_versions=database.cache_versions
+        ))
+        provider = server.AdminSettingsProvider(version_check=3600)
+        results = [await provider.get() for _ in range(5)]
+        results[0]["terms_and_conditions"] = "mutated"
+        return await provider.get(), settings.reads
+
+    latest, reads = run_with_test_db(check)
+
+    assert latest["terms_and_conditions"] == "v1"
+    assert "_id" not in latest
+    assert reads == 1
+
+
+def test_other_workers_pick_up_updates_through_the_version_stamp(run_with_test_db, monkeypatch):
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        await database.admin_settings.insert_one({"id": "s-1", "terms_and_conditions": "v1"})
+        writer = server.AdminSettingsProvider(version_check=0)
+        reader = server.AdminSettingsProvider(version_check=0)
+        before = await reader.get()
+        await database.admin_settings.update_one({"id": "s-1"}, {"$set": {"terms_and_conditions": "v2"}})
+        stale = await reader.get()
+        await writer.invalidate()
+        return before, stale, await reader.get(), await writer.get()
+
+    before, stale, after, written = run_with_test_db(check)
+
+    assert before["terms_and_conditions"] == stale["terms_and_conditions"] == "v1"
+    assert after["terms_and_conditions"] == written["terms_and_conditions"] == "v2"
+
+
+def test_concurrent_first_reads_wait_for_the_load(run_with_test_db, monkeypatch):
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        await database.admin_settings.insert_one({"id": "s-1", "terms_and_conditions": "v1"})
+        provider = server.AdminSettingsProvider(version_check=3600)
+        return await asyncio.gather(*(provider.get() for _ in range(10)))
+
+    results = run_with_test_db(check)
+
+    assert [settings["terms_and_conditions"] for settings in results] == ["v1"] * 10
+
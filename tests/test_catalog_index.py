@@ -0,0 +1,136 @@
+"""
+CatalogIndex and the in-memory catalog endpoint. Paging over documents in
+memory runs anywhere; the index itself needs MongoDB and is skipped when it
+is unreachable.
+"""
+
+import asyncio
+
+import orjson
+import pytest
+from fastapi import Response
+
+import server
+
+paginate = server.paginate(server.CATALOG_SORTS, 1000)
+
+ITEMS = [
+    {"id": f"c-{i:03d}", "name": f"Item {i % 7}", "type": "hotel" if i % 2 else "activity",
+     "destination": "Goa" if i % 3 else "Kerala", "supplier": f"Supplier {i % 4}",
+     "default_price": 1000 + i, "created_at": f"2025-06-{i % 5 + 1:02d}T10:00:00+00:00"}
+    for i in range(40)
+]
+
+
+def _walk(docs, sort, limit):
+    rows, cursor = [], None
+    while True:
+        page = paginate(Response(), cursor=cursor, limit=limit, sort=sort)
+        rows.extend(page.select(docs))
+        cursor = page.next_cursor
+        if cursor is None:
+            return rows
+
+
+def test_select_pages_through_documents_in_sort_order():
+    by_name = _walk(ITEMS, "name", 6)
+    newest = _walk(ITEMS, "-created_at", 7)
+
+    assert [row["id"] for row in by_name] == [
+        item["id"] for item in sorted(ITEMS, key=lambda item: (item["name"], item["id"]))
+    ]
+    assert [row["id"] for row in newest] == [
+        item["id"] for item in sorted(ITEMS, key=lambda item: (item["created_at"], item["id"]), reverse=True)
+    ]
+
+
+def test_rows_without_the_sort_key_are_paged_first_ascending_and_last_descending():
+    items = [dict(item) for item in ITEMS]
+    for item in items[::6]:
+        item.pop("name")
+        item["created_at"] = None
+
+    by_name = _walk(items, "name", 4)
+    newest = _walk(items, "-created_at", 5)
+
+    missing = sorted(item["id"] for item in items[::6])
+    assert len(by_name) == len(newest) == len(items)
+    assert [row["id"] for row in by_name[:len(missing)]] == missing
+    assert [row["id"] for row in newest[-len(missing):]] == missing[::-1]
+
+
+@pytest.fixture
+def catalog_db(seeded_db):
+    return seeded_db({"catalog": ITEMS})
+
+
+def test_filters_are_served_from_the_index(catalog_db):
+    async def check(database):
+        index = server.CatalogIndex(version_check=3600)
+        loaded = await index.find(type="hotel", destination="Goa")
+        await database.catalog.delete_many({})
+        return loaded, await index.find(type="hotel", destination="Goa", supplier="Supplier 1")
+
+    loaded, cached = catalog_db(check)
+
+    expected = {item["id"] for item in ITEMS if item["type"] == "hotel" and item["destination"] == "Goa"}
+    assert {item["id"] for item in loaded} == expected
+    assert {item["id"] for item in cached} == {
+        item["id"] for item in ITEMS if item["id"] in expected and item["supplier"] == "Supplier 1"
+    }
+
+
+def test_writes_move_the_etag_and_reach_other_workers(catalog_db):
+    async def check(database):
+        writer = server.CatalogIndex(version_check=0)
+        reader = server.CatalogIndex(version_check=0)
+        before = await reader.find(type="meal")
+        etag = reader.etag
+        item = server.CatalogItem(name="Thali", type="meal", destination="Goa", default_price=300)
+        await database.catalog.insert_one(item.dict())
+        await writer.add(item.dict())
+        return before, etag, await reader.find(type="meal"), reader.etag
+
+    before, etag, after, new_etag = catalog_db(check)
+
+    assert before == []
+    assert [item["name"] for item in after] == ["Thali"]
+    assert new_etag != etag
+
+
+def test_unchanged_catalog_is_not_modified(catalog_db, monkeypatch):
+    async def check(database):
+        monkeypatch.setattr(server, "catalog_index", server.CatalogIndex(version_check=3600))
+        response = Response()
+        page = paginate(response, cursor=None, limit=1000, sort="name")
+        items = await server.get_catalog(response, type="hotel", page=page, if_none_match=None)
+        page = paginate(Response(), cursor=None, limit=1000, sort="name")
+        repeat = await server.get_catalog(
+            Response(), type="hotel", page=page, if_none_match=response.headers["etag"]
+        )
+        return items, repeat
+
+    items, repeat = catalog_db(check)
+
+    assert len(orjson.loads(items.body)) == 20
+    assert repeat.status_code == 304
+
+
+def test_etag_moves_only_with_the_reloaded_items(catalog_db):
+    async def check(database):
+        index = server.CatalogIndex(version_check=0)
+        await index.find()
+        item = server.CatalogItem(name="Thali", type="meal", destination="Goa", default_price=300)
+        await database.catalog.insert_one(item.dict())
+        await server.bump_cache_version("catalog", database)
+
+        async def read():
+            items = await index.find()
+            return len(items), index.etag
+
+        return await asyncio.gather(*(read() for _ in range(5)))
+
+    reads = catalog_db(check)
+
+    assert len(set(reads)) == 1
+    assert reads[0][0] == len(ITEMS) + 1
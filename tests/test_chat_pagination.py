@@ -0,0 +1,78 @@
+"""
+Keyset chat paging and the message counter kept on the request. Needs
+MongoDB; skipped when unreachable.
+"""
+
+import pytest
+
+import server
+
+USER = {"sub": "client-1", "role": "customer", "name": "Client"}
+
+
+@pytest.fixture
+def chat_db(seeded_db):
+    return seeded_db({
+        "requests": [{"id": "req-1", "client_id": "client-1", "title": "Trip"}],
+        "messages": [
+            {"id": f"m-{i:03d}", "request_id": "req-1", "sender_id": "client-1", "sender_name": "Client",
+             "sender_role": "customer", "message_text": f"#{i}",
+             # Shared timestamps, so pages have to break ties on id
+             "created_at": f"2025-06-01T10:{i // 3:02d}:00+00:00"}
+            for i in range(47)
+        ],
+    }, migrate=True)
+
+
+async def _get(**params):
+    params = {"page": None, "limit": 10, "before": None, "since": None, **params}
+    return await server.get_messages("req-1", current_user=USER, **params)
+
+
+def test_before_cursors_walk_the_whole_history(chat_db):
+    async def check(database):
+        pages = [await _get()]
+        while pages[-1]["has_more"]:
+            pages.append(await _get(before=pages[-1]["next_cursor"]))
+        return pages
+
+    pages = chat_db(check)
+
+    ids = [m.id for page in pages for m in page["messages"]]
+    assert ids == [f"m-{i:03d}" for i in reversed(range(47))]
+    assert all(page["total"] == 47 for page in pages)
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_since_returns_only_new_messages(chat_db):
+    async def check(database):
+        first = await _get()
+        for text in ["hello", "again"]:
+            await server.send_message(
+                "req-1",
+                server.Message(request_id="req-1", sender_id="", sender_name="", sender_role="", message_text=text),
+                current_user=USER,
+            )
+        fresh = await _get(since=first["latest_cursor"], limit=1)
+        rest = await _get(since=fresh["latest_cursor"], limit=1)
+        idle = await _get(since=rest["latest_cursor"])
+        request = await database.requests.find_one({"id": "req-1"})
+        return fresh, rest, idle, request
+
+    fresh, rest, idle, request = chat_db(check)
+
+    assert [m.message_text for m in fresh["messages"]] == ["hello"] and fresh["has_more"]
+    assert [m.message_text for m in rest["messages"]] == ["again"] and not rest["has_more"]
+    assert idle["messages"] == [] and idle["latest_cursor"] == rest["latest_cursor"]
+    assert request["message_count"] == idle["total"] == 49
+    assert request["last_message_at"] == rest["messages"][0].created_at
+
+
+def test_legacy_page_parameter_still_works(chat_db):
+    async def check(database):
+        return await _get(page=2)
+
+    page = chat_db(check)
+
+    assert [m.id for m in page["messages"]] == [f"m-{i:03d}" for i in reversed(range(27, 37))]
+    assert page["has_more"]
@@ -0,0 +1,103 @@
+"""
+Change stamps on tracked collections and the `conditional` dependency.
+Everything but the result check needs MongoDB and is skipped when it is
+unreachable.
+"""
+
+import httpx
+from fastapi import Depends, FastAPI
+from pymongo.results import DeleteResult, UpdateResult
+
+import server
+
+
+def test_only_effective_writes_count_as_changes():
+    assert server._wrote_anything(UpdateResult({"n": 1, "nModified": 1}, True))
+    assert server._wrote_anything(UpdateResult({"n": 1, "nModified": 0, "upserted": "x"}, True))
+    assert not server._wrote_anything(UpdateResult({"n": 0, "nModified": 0}, True))
+    assert not server._wrote_anything(DeleteResult({"n": 0}, True))
+    assert not server._wrote_anything(None)
+
+
+def test_writes_to_tracked_collections_bump_their_stamp(run_with_test_db):
+    async def check(database):
+        tracked = server.ChangeTrackingDatabase(database)
+        await tracked.notifications.insert_one({"id": "n-1", "is_read": False})
+        await tracked.notifications.update_one({"id": "n-1"}, {"$set": {"is_read": True}})
+        # Already read, so nothing changes
+        await tracked.notifications.update_one({"id": "n-1"}, {"$set": {"is_read": True}})
+        await tracked.catalog.insert_one({"id": "c-1"})
+        return await server.read_cache_versions(
+            [server.change_stamp("notifications"), server.change_stamp("catalog")], database
+        )
+
+    assert run_with_test_db(check) == {"changes:notifications": 2, "changes:catalog": 0}
+
+
+def test_unchanged_responses_are_not_modified(run_with_test_db, monkeypatch):
+    async def check(database):
+        monkeypatch.setattr(server, "db", server.ChangeTrackingDatabase(database))
+        calls = []
+        app = FastAPI()
+        app.add_exception_handler(server.NotModified, server.not_modified_handler)
+
+        @app.get("/notifications")
+        async def notifications(_: None = Depends(server.conditional(server.change_stamp("notifications")))):
+            calls.append(1)
+            return await server.db.notifications.find({}, {"_id": 0}).to_list(None)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/notifications")
+            etag = first.headers["etag"]
+            repeat = await client.get("/notifications", headers={"If-None-Match": etag})
+            other_user = await client.get(
+                "/notifications", headers={"If-None-Match": etag, "Authorization": "Bearer other"}
+            )
+            await server.db.notifications.insert_one({"id": "n-1"})
+            changed = await client.get("/notifications", headers={"If-None-Match": etag})
+        return first, repeat, other_user, changed, len(calls)
+
+    first, repeat, other_user, changed, calls = run_with_test_db(check)
+
+    assert first.status_code == 200 and first.json() == []
+    assert repeat.status_code == 304
+    assert other_user.status_code == 200
+    assert changed.status_code == 200 and changed.json() == [{"id": "n-1"}]
+    assert changed.headers["etag"] != first.headers["etag"]
+    assert calls == 3
+
+
+def test_local_caches_catch_up_with_a_newer_stamp():
+    version = server.CacheVersion("admin_settings", 3600)
+    version._version = 3
+
+    version.observe(3)
+    assert version.value == 3
+    version.observe(4)
+    assert version.value is None
+
+
+def test_new_etag_is_never_paired_with_a_stale_cached_body(run_with_test_db, monkeypatch):
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        await database.admin_settings.insert_one({"id": "s-1", "terms_and_conditions": "v1"})
+        reader = server.AdminSettingsProvider(version_check=3600)
+        writer = server.AdminSettingsProvider(version_check=3600)
+        monkeypatch.setattr(server, "admin_settings_provider", reader)
+
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/api/admin/settings")
+            # Another worker saves new settings; this one's provider hasn't re-checked yet
+            await database.admin_settings.update_one({"id": "s-1"}, {"$set": {"terms_and_conditions": "v2"}})
+            await writer.invalidate()
+            second = await client.get("/api/admin/settings", headers={"If-None-Match": first.headers["etag"]})
+        return first, second
+
+    first, second = run_with_test_db(check)
+
+    assert first.json()["terms_and_conditions"] == "v1"
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json()["terms_and_conditions"] == "v2"
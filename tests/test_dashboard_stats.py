@@ -0,0 +1,54 @@
+"""
+Dashboard tiles filter quotations and payments on the owners copied from
+their request. Needs MongoDB; skipped when unreachable.
+"""
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def dashboard_db(seeded_db):
+    # Documents written before owners were copied get them from the migration
+    return seeded_db({
+        "requests": [
+            {"id": "req-1", "client_id": "client-1", "assigned_salesperson_id": "sales-1",
+             "assigned_operation_id": "ops-1", "status": "PENDING"},
+            {"id": "req-2", "client_id": "client-2", "assigned_salesperson_id": "sales-2", "status": "PENDING"},
+        ],
+        "quotations": [
+            {"id": "q-1", "request_id": "req-1", "status": "SENT", "expiry_date": "2000-01-01"},
+            {"id": "q-2", "request_id": "req-1", "status": "ACCEPTED"},
+            {"id": "q-3", "request_id": "req-2", "status": "SENT", "expiry_date": "2000-01-01"},
+        ],
+        "invoices": [
+            {"id": "inv-1", "request_id": "req-1"},
+            {"id": "inv-2", "request_id": "req-2"},
+        ],
+        "payments": [
+            {"id": "p-1", "invoice_id": "inv-1", "amount": 500.0, "status": "VERIFIED_BY_OPS"},
+            {"id": "p-2", "invoice_id": "inv-1", "amount": 700.0, "status": "PENDING"},
+            {"id": "p-3", "invoice_id": "inv-2", "amount": 900.0, "status": "VERIFIED_BY_OPS"},
+        ],
+    }, migrate=True)
+
+
+def test_tiles_are_scoped_to_the_owner(dashboard_db):
+    async def check(database):
+        operations = await server.compute_dashboard_stats("operations", "ops-1")
+        sales = await server.compute_dashboard_stats("sales", "sales-1")
+        # Reassigning the request moves its quotations and payments along
+        await database.requests.update_one({"id": "req-2"}, {"$set": {"assigned_operation_id": "ops-1"}})
+        await server.sync_request_owners("req-2", database)
+        reassigned = await server.compute_dashboard_stats("operations", "ops-1")
+        return operations, sales, reassigned
+
+    operations, sales, reassigned = dashboard_db(check)
+
+    assert operations == {
+        "expiring_quotes": 1, "pending_payments": 1, "active_requests": 1,
+        "open_requests": 1, "total_revenue": 500.0,
+    }
+    assert sales == {"my_requests": 1, "pending_quotes": 1, "accepted_quotes": 1}
+    assert reassigned["expiring_quotes"] == 2 and reassigned["total_revenue"] == 1400.0
@@ -0,0 +1,115 @@
+"""
+The orjson fast path for list endpoints: rows must match what the
+response_model path would have produced for the same documents.
+"""
+
+import json
+
+import orjson
+from bson import ObjectId
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from fastapi.encoders import jsonable_encoder
+
+import server
+
+REQUEST_DOC = {
+    "_id": ObjectId(),
+    "id": "req-1",
+    "client_id": "c-1",
+    "title": "Goa Beach Escape",
+    "people_count": 2,
+    "budget_min": 40000.5,
+    "budget_max": 60000.0,
+    "start_date": "2025-03-18",
+    "end_date": "2025-03-21",
+    "destination": "Goa",
+    "status": "PENDING",
+    "created_by": "c-1",
+    "created_at": "2025-03-01T10:00:00+00:00",
+    "updated_at": "2025-03-02T10:00:00+00:00",
+    "message_count": 4,
+}
+
+
+def test_rows_match_the_response_model():
+    doc = {key: value for key, value in REQUEST_DOC.items() if key != "_id"}
+
+    fast = orjson.loads(server.fast_json_response(server.shape_rows([doc], server.TravelRequest)).body)
+    slow = jsonable_encoder([server.TravelRequest(**doc)])
+
+    assert fast == slow
+    # Fields outside the model are dropped and missing ones defaulted
+    assert "message_count" not in fast[0]
+    assert fast[0]["is_visa_required"] is False
+
+
+def test_response_keeps_dependency_headers():
+    injected = Response()
+    injected.headers[server.NEXT_CURSOR_HEADER] = "abc"
+    injected.headers["ETag"] = '"v1"'
+
+    response = server.fast_json_response([{"id": "x"}], injected)
+
+    assert response.headers[server.NEXT_CURSOR_HEADER] == "abc"
+    assert response.headers["etag"] == '"v1"'
+    assert response.headers["content-length"] == str(len(response.body))
+    assert json.loads(response.body) == [{"id": "x"}]
+
+
+def test_values_without_a_json_type_are_stringified():
+    object_id = REQUEST_DOC["_id"]
+
+    assert orjson.loads(server.FastJSONResponse({"ref": object_id}).body) == {"ref": str(object_id)}
+
+
+def test_json_responses_are_gzipped():
+    app = FastAPI()
+    app.add_middleware(server.JSONGZipMiddleware, minimum_size=100)
+
+    @app.get("/rows")
+    async def rows():
+        return server.fast_json_response([{"id": f"row-{i}"} for i in range(100)])
+
+    response = TestClient(app).get("/rows", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 100
+
+
+LEGACY_QUOTATION_DOC = {
+    "id": "q-1",
+    "request_id": "req-1",
+    "status": "SENT",
+    "detailed_quotation_data": {
+        "tripTitle": "Goa Beach Escape",
+        "city": "Goa",
+        "bookingRef": "BK-1",
+        "start_date": "2025-03-18",
+        "end_date": "2025-03-21",
+        "coverImage": "cover.jpg",
+        "summary": {"duration": "3 nights", "travelers": "2", "highlights": []},
+        "pricing": {"subtotal": 100, "taxes": 18, "discount": 0, "total": 118, "perPerson": 59, "depositDue": 30},
+        "days": [],
+    },
+    "cost_breakup": [{"name": "Hotel", "date": "2025-03-18", "quantity": "2", "unit_cost": 5000}],
+    "created_at": "2025-03-01T10:00:00+00:00",
+    "updated_at": "2025-03-02T10:00:00+00:00",
+}
+
+
+def test_nested_models_get_their_defaults_and_coercion():
+    fast = orjson.loads(server.fast_json_response(server.shape_rows([LEGACY_QUOTATION_DOC], server.Quotation)).body)[0]
+    slow = jsonable_encoder(server.Quotation(**LEGACY_QUOTATION_DOC))
+
+    data = fast["detailed_quotation_data"]
+    assert data["summary"] == {"duration": "3 nights", "travelers": 2, "rating": 4.8, "highlights": []}
+    assert data["pricing"]["currency"] == "INR"
+    assert data["inclusions"] is None
+    assert fast["cost_breakup"][0]["quantity"] == 2
+    assert fast["cost_breakup"][0]["id"]
+    # Identical apart from the ids generated for the missing ones
+    for row in (fast, slow):
+        del row["detailed_quotation_data"]["id"]
+        del row["cost_breakup"][0]["id"]
+    assert fast == slow
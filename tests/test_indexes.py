@@ -0,0 +1,115 @@
+"""
+Hot queries must be served by an index. Runs against the MongoDB in
+MONGO_URL using a throwaway database; skipped when MongoDB isn't reachable.
+"""
+
+import server
+
+TODAY = "2025-03-01"
+
+# (collection, filter, sort) as issued by the endpoints
+HOT_QUERIES = [
+    ("users", {"id": "u-1"}, None),
+    ("users", {"id": {"$in": ["u-1", "u-2"]}}, None),
+    ("users", {"email": "a@example.com"}, None),
+    ("users", {"role": "operations", "is_active": True}, None),
+    ("requests", {"id": "r-1"}, None),
+    ("requests", {}, [("created_at", -1)]),
+    ("requests", {"client_id": "u-1"}, [("created_at", -1)]),
+    ("requests", {"assigned_salesperson_id": {"$in": ["u-1"]}, "status": {"$in": ["PENDING"]}}, [("created_at", -1)]),
+    ("requests", {"status": "PENDING", "assigned_operation_id": "u-1"}, None),
+    ("quotations", {"id": "q-1"}, None),
+    ("quotations", {"request_id": "r-1", "status": "ACCEPTED"}, None),
+    ("quotations", {"status": "ACCEPTED"}, [("accepted_at", 1), ("id", 1)]),
+    ("quotations", {"status": "SENT", "assigned_operation_id": "u-1", "expiry_date": {"$lte": TODAY}}, None),
+    ("quotations", {"status": "ACCEPTED", "assigned_salesperson_id": "u-1"}, None),
+    ("payments", {"status": {"$in": ["PENDING", "RECEIVED_BY_ACCOUNTANT"]}, "assigned_operation_id": "u-1"}, None),
+    ("payments", {"request_id": "r-1"}, None),
+    ("invoices", {"id": "i-1"}, None),
+    ("invoices", {"quotation_id": "q-1"}, None),
+    ("invoices", {"has_breakup": False}, None),
+    ("payments", {"id": "p-1"}, None),
+    ("payments", {"invoice_id": "i-1"}, [("created_at", -1)]),
+    ("payments", {"status": "PENDING"}, None),
+    ("payments", {}, [("created_at", -1), ("id", -1)]),
+    ("payments", {"status": "PENDING"}, [("created_at", -1), ("id", -1)]),
+    ("payments", {"method": "upi", "created_at": {"$gte": TODAY}}, [("created_at", -1), ("id", -1)]),
+    ("payments", {"invoice_id": {"$in": ["i-1", "i-2"]}}, [("created_at", -1), ("id", -1)]),
+    ("payment_breakups", {"invoice_id": "i-1"}, [("due_date", 1)]),
+    ("payment_breakups", {"status": {"$in": ["pending", "partial_paid"]}, "due_date": {"$lt": TODAY}}, None),
+    ("payment_breakups", {"request_id": "r-1"}, None),
+    ("payment_breakups", {"status": {"$in": ["pending", "partial_paid"]}, "due_date": {"$lt": TODAY}, "assigned_salesperson_id": "u-1"}, None),
+    ("payment_breakups", {"status": {"$in": ["pending", "partial_paid"]}, "due_date": {"$lt": TODAY}, "assigned_operation_id": "u-1"}, None),
+    ("payment_breakups", {"status": {"$in": ["pending", "partial_paid"]}, "due_date": {"$lt": TODAY}, "client_id": "u-1"}, None),
+    ("payment_allocations", {"breakup_id": "b-1"}, [("allocated_at", 1)]),
+    ("payment_allocations", {"breakup_id": {"$in": ["b-1", "b-2"]}}, [("allocated_at", 1)]),
+    ("payments", {"id": {"$in": ["p-1", "p-2"]}}, None),
+    ("messages", {"request_id": "r-1"}, [("created_at", -1), ("id", -1)]),
+    ("messages", {"request_id": "r-1", "created_at": {"$gt": TODAY}}, [("created_at", 1), ("id", 1)]),
+    ("activities", {"request_id": "r-1"}, [("created_at", -1)]),
+    ("notifications", {"user_id": "u-1"}, [("created_at", -1)]),
+    ("notifications", {"user_id": "u-1", "is_read": False}, [("created_at", -1)]),
+    ("requests", {"assigned_salesperson_id": "u-1"}, [("created_at", -1), ("id", -1)]),
+    ("requests", {"assigned_operation_id": "u-1"}, [("created_at", -1), ("id", -1)]),
+    ("requests", {"client_id": "u-1"}, [("created_at", -1), ("id", -1)]),
+    ("quotations", {"request_id": "r-1"}, [("created_at", -1), ("id", -1)]),
+    ("activities", {}, [("created_at", -1), ("id", -1)]),
+    ("notifications", {"user_id": "u-1", "is_read": False}, [("created_at", -1), ("id", -1)]),
+    ("leaves", {"user_id": "u-1"}, [("start_date", -1), ("id", -1)]),
+    ("catalog", {"type": "hotel"}, [("name", 1), ("id", 1)]),
+    ("users", {"role": {"$in": ["sales", "operations"]}}, [("created_at", -1), ("id", -1)]),
+    ("leaves", {"backup_user_id": "u-1", "status": "active", "start_date": {"$lte": TODAY}, "end_date": {"$gte": TODAY}}, None),
+]
+
+
+def _stages(plan):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+def test_hot_queries_use_an_index(run_with_test_db):
+    async def check(database):
+        await server.bootstrap_database(database)
+        for collection, _, _ in HOT_QUERIES:
+            await database[collection].insert_one({"id": f"seed-{collection}", "email": f"seed@{collection}"})
+
+        missing = []
+        for collection, query, sort in HOT_QUERIES:
+            cursor = database[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+            stages = set(_stages(plan))
+            if "COLLSCAN" in stages or not stages & {"IXSCAN", "EXPRESS_IXSCAN", "IDHACK"}:
+                missing.append((collection, query, sort, sorted(s for s in stages if s)))
+        return missing
+
+    assert run_with_test_db(check) == []
+
+
+def test_bootstrap_is_idempotent_and_versioned(run_with_test_db):
+    calls = []
+
+    async def backfill(database):
+        calls.append(database.name)
+
+    migrations = [server.Migration(1, "test backfill", backfill)]
+
+    async def check(database):
+        await server.ensure_indexes(database)
+        await server.ensure_indexes(database)
+        await server.apply_migrations(database, migrations)
+        await server.apply_migrations(database, migrations)
+        recorded = await database.schema_migrations.find_one({"_id": "indexes"})
+        applied = await database.schema_migrations.find_one({"_id": 1})
+        return recorded, applied
+
+    recorded, applied = run_with_test_db(check)
+
+    assert recorded["version"] == server.index_registry_version(server.INDEXES)
+    assert applied["name"] == "test backfill"
+    assert len(calls) == 1
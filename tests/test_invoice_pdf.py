@@ -0,0 +1,157 @@
+"""
+Invoice and proforma PDFs are laid out by pure builders on a process pool,
+keeping the event loop free while ReportLab works. The download test needs
+MongoDB and is skipped when it is unreachable.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import invoice_pdf
+import server
+
+CLIENT = {
+    "name": "John Customer",
+    "email": "john@example.com",
+    "phone": "9876543210",
+    "country_code": "+91",
+    "destination": "Goa",
+    "travel_dates": "18 Mar 2025 - 21 Mar 2025",
+    "people_count": 2,
+}
+
+
+def _invoice_data(status="Paid"):
+    return {
+        "date": "01 March 2025",
+        "client": CLIENT,
+        "invoice": {
+            "invoice_number": "INV-2025-0001",
+            "status": status,
+            "due_date": "2025-03-15",
+            "gst_number": None,
+            "advance_amount": 17700.0,
+            "total_amount": 59000.0,
+            "received_at": "2025-03-01T10:30:00",
+            "verified_at": "2025-03-02T09:00:00",
+            "method": "bank_transfer",
+            "accountant_notes": "UTR 1234",
+        },
+    }
+
+
+def _proforma_data(line_items=3):
+    items = [
+        {"name": f"Item {i}", "type": "hotel", "supplier": "Supplier", "quantity": 2,
+         "unit_price": 5000.0, "tax_percent": 18, "total": 11800.0}
+        for i in range(line_items)
+    ]
+    return {
+        "quotation_id": "3f1c2a9b-quote",
+        "date": "01 March 2025",
+        "expiry_date": "2025-03-31",
+        "client": CLIENT,
+        "options": [{"name": "Standard", "line_items": items, "subtotal": 30000.0,
+                     "tax_amount": 5400.0, "total": 35400.0}],
+        "advance_amount": 10620.0,
+        "advance_percent": 30,
+        "grand_total": 35400.0,
+    }
+
+
+@pytest.mark.parametrize("status", ["Paid", "Partially Paid", "Verification Pending", None])
+def test_invoice_builder_returns_pdf(status):
+    assert invoice_pdf.build_invoice_pdf(_invoice_data(status)).startswith(b"%PDF")
+
+
+def test_proforma_builder_returns_pdf():
+    assert invoice_pdf.build_proforma_pdf(_proforma_data()).startswith(b"%PDF")
+
+
+def test_static_flowables_are_reusable_across_builds():
+    first = invoice_pdf.build_proforma_pdf(_proforma_data())
+    second = invoice_pdf.build_proforma_pdf(_proforma_data())
+    # Only the creation timestamp and document ID differ between runs
+    assert abs(len(first) - len(second)) < 64
+
+
+def test_pool_build_does_not_stall_event_loop():
+    pool = server.InvoicePDFPool(workers=1, acquire_timeout=30)
+    data = _proforma_data(line_items=400)
+
+    async def measure():
+        pool.start()
+        # Warm the worker so process startup isn't part of the measurement
+        await pool.build(invoice_pdf.build_proforma_pdf, _proforma_data())
+
+        max_stall = 0.0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal max_stall
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                max_stall = max(max_stall, time.perf_counter() - started - 0.005)
+
+        tick = asyncio.create_task(ticker())
+        pdf_bytes = await pool.build(invoice_pdf.build_proforma_pdf, data)
+        done.set()
+        await tick
+        return pdf_bytes, max_stall
+
+    try:
+        pdf_bytes, max_stall = asyncio.run(measure())
+    finally:
+        pool.close()
+
+    assert pdf_bytes.startswith(b"%PDF")
+    assert max_stall < 0.05
+
+
+def test_downloads_serve_the_current_artifact_without_rebuilding(run_with_test_db, monkeypatch, tmp_path):
+    pool = server.InvoicePDFPool(workers=1, acquire_timeout=30)
+    monkeypatch.setattr(server, "invoice_pdf_pool", pool)
+    monkeypatch.setattr(server, "pdf_cache", server.PDFCache(tmp_path))
+    builds = []
+    build_invoice_pdf_data = server.build_invoice_pdf_data
+
+    async def counting_build(invoice):
+        builds.append(invoice["id"])
+        return await build_invoice_pdf_data(invoice)
+
+    monkeypatch.setattr(server, "build_invoice_pdf_data", counting_build)
+
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        await database.requests.insert_one({
+            "id": "req-1", "destination": "Goa", "start_date": "2025-03-18", "end_date": "2025-03-21",
+            "people_count": 2, "updated_at": "2025-02-01T10:00:00+00:00"
+        })
+        await database.quotations.insert_one({"id": "q-1"})
+        await database.invoices.insert_one(server.Invoice(
+            id="inv-1", invoice_number="INV-1", quotation_id="q-1", request_id="req-1",
+            client_name="John", client_email="john@example.com", client_country_code="+91",
+            client_phone="9876543210", total_amount=59000, advance_amount=17700, due_date="2025-03-15"
+        ).model_dump())
+
+        first = await server.download_invoice("inv-1", if_none_match=None, if_modified_since=None)
+        second = await server.download_invoice("inv-1", if_none_match=None, if_modified_since=None)
+        after_download = len(builds)
+        await database.invoices.update_one(
+            {"id": "inv-1"}, {"$set": {"status": "Fully Paid", "updated_at": "2025-03-10T10:00:00+00:00"}}
+        )
+        third = await server.download_invoice("inv-1", if_none_match=None, if_modified_since=None)
+        return first, second, third, after_download, len(builds)
+
+    try:
+        first, second, third, after_download, total = run_with_test_db(check)
+    finally:
+        pool.close()
+
+    assert after_download == 1
+    assert first.headers["etag"] == second.headers["etag"]
+    assert total == 2
+    assert third.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,185 @@
+"""
+The aggregation-based overdue report must return exactly what the original
+per-breakup lookup loop returned. Needs MongoDB; skipped when unreachable.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+USER = {"sub": "acc-001", "role": "accountant"}
+
+
+async def legacy_get_overdue_breakups(db):
+    """The N+1 implementation this endpoint replaced, kept as the reference."""
+    now = datetime.now(timezone.utc)
+    today_str = now.date().isoformat()
+    all_breakups = await db.payment_breakups.find({
+        "status": {"$in": ["pending", "partial_paid"]},
+        "due_date": {"$lt": today_str}
+    }).to_list(length=None)
+    if not all_breakups:
+        return {"overdue_count": 0, "overdue_breakups": []}
+
+    overdue_list = []
+    for breakup in all_breakups:
+        invoice = await db.invoices.find_one({"id": breakup["invoice_id"]})
+        if not invoice:
+            continue
+        request = await db.requests.find_one({"id": invoice.get("request_id")})
+        if not request:
+            continue
+        client = await db.users.find_one({"id": request.get("client_id")})
+        salesperson = None
+        if request.get("assigned_salesperson_id"):
+            salesperson = await db.users.find_one({"id": request["assigned_salesperson_id"]})
+        operations = None
+        if request.get("assigned_operation_id"):
+            operations = await db.users.find_one({"id": request["assigned_operation_id"]})
+        due_date = datetime.fromisoformat(breakup["due_date"].replace('Z', '+00:00'))
+        days_overdue = (now.date() - due_date.date()).days
+        overdue_list.append({
+            "breakup_id": breakup["id"],
+            "invoice_id": invoice["id"],
+            "invoice_number": invoice.get("invoice_number"),
+            "request_id": request["id"],
+            "request_title": request.get("title"),
+            "breakup_amount": breakup["amount"],
+            "paid_amount": breakup.get("paid_amount", 0.0),
+            "remaining_amount": breakup.get("remaining_amount", breakup["amount"]),
+            "due_date": breakup["due_date"],
+            "days_overdue": days_overdue,
+            "status": breakup["status"],
+            "description": breakup.get("description", ""),
+            "client_name": client.get("name") if client else "Unknown",
+            "client_email": client.get("email") if client else "",
+            "client_phone": client.get("phone") if client else "",
+            "salesperson_name": salesperson.get("name") if salesperson else "Not Assigned",
+            "salesperson_email": salesperson.get("email") if salesperson else "",
+            "operations_name": operations.get("name") if operations else "Not Assigned",
+            "operations_email": operations.get("email") if operations else ""
+        })
+    overdue_list.sort(key=lambda x: x["days_overdue"], reverse=True)
+    return {"overdue_count": len(overdue_list), "overdue_breakups": overdue_list}
+
+
+async def _seed(db, seed=7, requests=40):
+    rng = random.Random(seed)
+    today = datetime.now(timezone.utc).date()
+    users = [{"id": f"user-{i}", "name": f"User {i}", "email": f"user{i}@example.com"} for i in range(8)]
+    users[3].pop("name")
+    await db.users.insert_many(users)
+
+    for r in range(requests):
+        request = {
+            "id": f"req-{r}",
+            "title": f"Trip {r}",
+            "client_id": rng.choice([f"user-{rng.randrange(8)}", "missing-user"]),
+        }
+        if rng.random() < 0.7:
+            request["assigned_salesperson_id"] = f"user-{rng.randrange(8)}"
+        if rng.random() < 0.5:
+            request["assigned_operation_id"] = rng.choice([f"user-{rng.randrange(8)}", ""])
+        if r % 9 != 0:  # some invoices point at a missing request
+            await db.requests.insert_one(request)
+
+        invoice_id = f"inv-{r}"
+        if r % 11 != 0:  # some breakups point at a missing invoice
+            await db.invoices.insert_one({"id": invoice_id, "invoice_number": f"INV-{r}", "request_id": request["id"]})
+
+        for b in range(rng.randrange(1, 5)):
+            due = today + timedelta(days=rng.randrange(-90, 30))
+            due_date = due.isoformat() if rng.random() < 0.7 else f"{due.isoformat()}T10:00:00+00:00"
+            breakup = {
+                "id": f"brk-{r}-{b}",
+                "invoice_id": invoice_id,
+                "amount": 1000.0 * (b + 1),
+                "due_date": due_date,
+                "status": rng.choice(["pending", "partial_paid", "paid"]),
+            }
+            if rng.random() < 0.8:
+                breakup["paid_amount"] = 100.0
+                breakup["remaining_amount"] = breakup["amount"] - 100.0
+            if rng.random() < 0.5:
+                breakup["description"] = f"Installment {b + 1}"
+            await db.payment_breakups.insert_one(breakup)
+
+
+def _by_id(rows):
+    return sorted(rows, key=lambda row: row["breakup_id"])
+
+
+@pytest.fixture
+def overdue_db(seeded_db):
+    return seeded_db(_seed)
+
+
+def test_pipeline_matches_legacy_loop(overdue_db):
+    async def check(database):
+        return (
+            await legacy_get_overdue_breakups(database),
+            await server.get_overdue_breakups(page=1, limit=None, current_user=USER),
+        )
+
+    legacy, current = overdue_db(check)
+
+    assert current["overdue_count"] == legacy["overdue_count"] > 0
+    assert _by_id(current["overdue_breakups"]) == _by_id(legacy["overdue_breakups"])
+    days = [row["days_overdue"] for row in current["overdue_breakups"]]
+    assert days == sorted(days, reverse=True)
+
+
+def test_pages_cover_the_full_report(overdue_db):
+    async def check(database):
+        full = await server.get_overdue_breakups(page=1, limit=None, current_user=USER)
+        pages, page = [], 1
+        while True:
+            result = await server.get_overdue_breakups(page=page, limit=7, current_user=USER)
+            pages.append(result)
+            if not result["has_more"]:
+                return full, pages
+            page += 1
+
+    full, pages = overdue_db(check)
+
+    assert all(result["overdue_count"] == full["overdue_count"] for result in pages)
+    assert [row for result in pages for row in result["overdue_breakups"]] == full["overdue_breakups"]
+
+
+async def legacy_overdue_count(db, user_id, role):
+    """The per-breakup invoice/request walk /alerts/overdue-count used to do."""
+    owner_field = server.OVERDUE_OWNER_FIELD_BY_ROLE[role]
+    count = 0
+    async for breakup in db.payment_breakups.find(server.overdue_breakups_match(datetime.now(timezone.utc).date().isoformat())):
+        invoice = await db.invoices.find_one({"id": breakup["invoice_id"]})
+        request = invoice and await db.requests.find_one({"id": invoice.get("request_id")})
+        if request and request.get(owner_field) == user_id:
+            count += 1
+    return count
+
+
+def test_role_scoped_counts_match_legacy_walk(overdue_db):
+    async def counts(database):
+        return {
+            (user_id, role): (
+                await legacy_overdue_count(database, user_id, role),
+                (await server.get_overdue_count(current_user={"sub": user_id, "role": role}))["overdue_count"],
+            )
+            for user_id in [f"user-{i}" for i in range(8)]
+            for role in server.OVERDUE_OWNER_FIELD_BY_ROLE
+        }
+
+    async def check(database):
+        await server.apply_migrations(database)
+        before = await counts(database)
+        # Reassigning a request must carry its breakups along
+        await database.requests.update_one({"id": "req-1"}, {"$set": {"assigned_salesperson_id": "user-0"}})
+        await server.sync_request_owners("req-1", database)
+        return before, await counts(database)
+
+    for result in overdue_db(check):
+        assert any(legacy for legacy, _ in result.values())
+        assert all(legacy == current for legacy, current in result.values())
@@ -0,0 +1,107 @@
+"""
+The shared `paginate` dependency behind the list endpoints. Parameter
+handling runs anywhere; walking real pages needs MongoDB and is skipped
+when it is unreachable.
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+paginate = server.paginate(server.NEWEST_FIRST, 100)
+
+
+def test_defaults_to_the_first_sort():
+    page = paginate(Response(), cursor=None, limit=100, sort="-created_at")
+
+    assert page.sort == [("created_at", -1), ("id", -1)]
+    assert page.after is None
+
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        paginate(Response(), cursor=None, limit=10, sort="title")
+
+    assert excinfo.value.status_code == 400
+
+
+def test_cursor_is_tied_to_its_sort():
+    cursor = server.encode_cursor(["created_at", "2025-06-01", "n-1"])
+
+    assert paginate(Response(), cursor=cursor, limit=10, sort="created_at").after == ["2025-06-01", "n-1"]
+    with pytest.raises(HTTPException) as excinfo:
+        paginate(Response(), cursor=cursor, limit=10, sort="-created_at")
+    assert excinfo.value.status_code == 400
+
+
+def test_keyset_filter_places_null_sort_values_first():
+    ascending, descending = server.NEWEST_FIRST["created_at"], server.NEWEST_FIRST["-created_at"]
+
+    assert server.keyset_filter(ascending, [None, "n-1"]) == {"$or": [
+        {"created_at": {"$ne": None}},
+        {"created_at": None, "id": {"$gt": "n-1"}},
+    ]}
+    assert server.keyset_filter(descending, [None, "n-1"]) == {"$or": [
+        {"created_at": None, "id": {"$lt": "n-1"}},
+    ]}
+    assert server.keyset_filter(descending, ["2025-06-01", "n-1"])["$or"][0] == {
+        "$or": [{"created_at": {"$lt": "2025-06-01"}}, {"created_at": None}],
+    }
+
+
+@pytest.fixture
+def notifications_db(seeded_db):
+    return seeded_db({"notifications": [
+        {"id": f"n-{i:03d}", "user_id": "u-1" if i % 4 else "u-2", "title": "t", "message": "m",
+         "is_read": bool(i % 3), "created_at": f"2025-06-{i % 5 + 1:02d}T10:00:00+00:00"}
+        for i in range(50)
+    ]})
+
+
+def test_walking_pages_returns_each_row_once(notifications_db):
+    async def check(database):
+        rows, cursor, headers = [], None, []
+        while True:
+            response = Response()
+            page = paginate(response, cursor=cursor, limit=6, sort="-created_at")
+            rows.extend(await server.get_notifications(unread_only=False, page=page, current_user={"sub": "u-1"}))
+            cursor = page.next_cursor
+            headers.append(response.headers.get(server.NEXT_CURSOR_HEADER))
+            if not cursor:
+                return rows, headers, await database.notifications.count_documents({"user_id": "u-1"})
+
+    rows, headers, total = notifications_db(check)
+
+    keys = [(row.created_at, row.id) for row in rows]
+    assert len(set(keys)) == len(keys) == total
+    assert keys == sorted(keys, reverse=True)
+    assert headers[-1] is None and all(headers[:-1])
+
+
+def test_walking_pages_reaches_rows_without_a_timestamp(seeded_db):
+    docs = [
+        {"id": f"n-{i:03d}", "user_id": "u-1", "title": "t", "message": "m", "is_read": False,
+         "created_at": f"2025-06-{i % 5 + 1:02d}T10:00:00+00:00"}
+        for i in range(20)
+    ]
+    for doc in docs[::4]:
+        doc.pop("created_at")
+
+    async def walk(database, sort):
+        ids, cursor = [], None
+        while True:
+            page = paginate(Response(), cursor=cursor, limit=3, sort=sort)
+            ids.extend(doc["id"] for doc in await page.fetch(database.notifications, {"user_id": "u-1"}))
+            cursor = page.next_cursor
+            if not cursor:
+                return ids
+
+    async def check(database):
+        return await walk(database, "created_at"), await walk(database, "-created_at")
+
+    oldest, newest = seeded_db({"notifications": docs})(check)
+
+    assert sorted(oldest) == sorted(newest) == sorted(doc["id"] for doc in docs)
+    assert oldest[:5] == [doc["id"] for doc in docs[::4]]
+    assert newest[-5:] == [doc["id"] for doc in docs[::4]][::-1]
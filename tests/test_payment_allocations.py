@@ -0,0 +1,87 @@
+"""
+The batched allocation view must match the per-breakup, per-allocation
+lookups it replaced. Needs MongoDB; skipped when unreachable.
+"""
+
+import asyncio
+import random
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+USER = {"sub": "acc-001", "role": "accountant"}
+
+
+async def legacy_allocations(db, breakup_id):
+    """The nested N+1 loop the endpoint used to run for each breakup."""
+    details = []
+    async for allocation in db.payment_allocations.find({"breakup_id": breakup_id}).sort("allocated_at", 1):
+        payment = await db.payments.find_one({"id": allocation["payment_id"]})
+        if payment:
+            details.append({
+                "payment_id": allocation["payment_id"],
+                "amount": allocation["allocated_amount"],
+                "date": allocation["allocated_at"],
+                "payment_method": payment.get("method", ""),
+                "payment_status": payment.get("status", ""),
+                "payment_total": payment.get("amount", 0.0)
+            })
+    return details
+
+
+async def _seed(db, seed=3):
+    rng = random.Random(seed)
+    await db.invoices.insert_one({"id": "inv-1", "invoice_number": "INV-1", "total_amount": 100000.0, "has_breakup": True})
+    for b in range(10):
+        await db.payment_breakups.insert_one({
+            "id": f"brk-{b}", "invoice_id": "inv-1", "amount": 10000.0, "paid_amount": 0.0,
+            "due_date": f"2025-{b + 1:02d}-01", "status": "pending"
+        })
+    for p in range(30):
+        if p % 7 != 0:  # some allocations point at a missing payment
+            await db.payments.insert_one({"id": f"pay-{p}", "amount": 5000.0, "method": "upi", "status": "VERIFIED_BY_OPS"})
+        for _ in range(rng.randrange(1, 3)):
+            await db.payment_allocations.insert_one({
+                "id": f"alloc-{p}-{rng.random()}", "payment_id": f"pay-{p}", "invoice_id": "inv-1",
+                "breakup_id": f"brk-{rng.randrange(10)}", "allocated_amount": 1000.0,
+                "allocated_at": f"2025-06-{rng.randrange(1, 29):02d}T10:00:00+00:00"
+            })
+
+
+@pytest.fixture
+def allocation_db(seeded_db):
+    return seeded_db(_seed)
+
+
+def test_batched_view_matches_nested_lookups(allocation_db):
+    async def check(database):
+        view = await server.get_payment_allocations("inv-1", include="allocations", current_user=USER)
+        return view, {b["id"]: await legacy_allocations(database, b["id"]) for b in view["breakups"]}
+
+    view, legacy = allocation_db(check)
+
+    assert view["breakup_count"] == 10
+    assert any(legacy.values())
+    # Allocations sharing a timestamp have no defined order in either version
+    key = lambda row: (row["date"], row["payment_id"])
+    assert {b["id"]: sorted(b["allocations"], key=key) for b in view["breakups"]} == \
+        {breakup_id: sorted(rows, key=key) for breakup_id, rows in legacy.items()}
+
+
+def test_allocation_detail_can_be_skipped(allocation_db):
+    async def check(database):
+        return await server.get_payment_allocations("inv-1", include="", current_user=USER)
+
+    view = allocation_db(check)
+
+    assert view["breakup_count"] == 10
+    assert all("allocations" not in breakup for breakup in view["breakups"])
+
+
+def test_unknown_include_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(server.get_payment_allocations("inv-1", include="payments", current_user=USER))
+
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,104 @@
+"""
+Keyset pagination for the payments ledger. The cursor helpers run anywhere;
+the endpoint tests need MongoDB and are skipped when it is unreachable.
+"""
+
+import random
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+USER = {"sub": "acc-001", "role": "accountant"}
+
+
+def test_cursor_round_trips():
+    values = ["2025-06-01T10:00:00+00:00", "pay-7"]
+    cursor = server.encode_cursor(values)
+
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor, 2) == values
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", server.encode_cursor(["only-one"]), server.encode_cursor({"a": 1})])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        server.decode_cursor(cursor, 2)
+
+    assert excinfo.value.status_code == 400
+
+
+def test_keyset_filter_continues_after_the_last_row():
+    assert server.keyset_filter(server.NEWEST_FIRST["-created_at"], ["2025-06-01", "pay-7"]) == {"$or": [
+        {"$or": [{"created_at": {"$lt": "2025-06-01"}}, {"created_at": None}]},
+        {"created_at": "2025-06-01", "id": {"$lt": "pay-7"}},
+    ]}
+
+
+async def _seed(db, seed=11, payments=120):
+    rng = random.Random(seed)
+    for c in range(3):
+        await db.requests.insert_one({"id": f"req-{c}", "client_id": f"client-{c}"})
+        await db.invoices.insert_one({
+            "id": f"inv-{c}", "request_id": f"req-{c}",
+            "client_name": f"Client {c}", "client_email": f"c{c}@example.com",
+            "client_phone": "9876543210", "client_country_code": "+91"
+        })
+    for p in range(payments):
+        await db.payments.insert_one({
+            "id": f"pay-{p:04d}",
+            "invoice_id": f"inv-{rng.randrange(3)}",
+            "amount": 1000.0,
+            "method": rng.choice(["upi", "card", "bank_transfer"]),
+            "status": rng.choice(["PENDING", "VERIFIED_BY_OPS"]),
+            # Few distinct timestamps, so pages have to break ties on id
+            "created_at": f"2025-06-{rng.randrange(1, 6):02d}T10:00:00+00:00",
+        })
+
+
+@pytest.fixture
+def ledger_db(seeded_db):
+    return seeded_db(_seed)
+
+
+async def _walk(limit, **filters):
+    params = dict(status=None, method=None, invoice_id=None, client_id=None, from_date=None, to_date=None)
+    params.update(filters)
+    paginate = server.paginate(server.NEWEST_FIRST, 50, server.LEDGER_MAX_LIMIT)
+    rows, cursor = [], None
+    while True:
+        page = paginate(Response(), cursor=cursor, limit=limit, sort="-created_at")
+        result = await server.get_payments_ledger(page=page, current_user=USER, **params)
+        assert len(result["payments"]) <= limit
+        rows.extend(result["payments"])
+        cursor = result["next_cursor"]
+        if not cursor:
+            return rows
+
+
+def test_pages_cover_every_payment_once_in_order(ledger_db):
+    async def check(database):
+        return await _walk(limit=7), await database.payments.count_documents({})
+
+    rows, total = ledger_db(check)
+
+    keys = [(row["created_at"], row["id"]) for row in rows]
+    assert len(keys) == len(set(keys)) == total
+    assert keys == sorted(keys, reverse=True)
+    assert all(row["client_email"] for row in rows)
+
+
+def test_filters_apply_across_pages(ledger_db):
+    async def check(database):
+        walked = await _walk(limit=5, method="upi", client_id="client-1", from_date="2025-06-02", to_date="2025-06-03")
+        expected = await database.payments.count_documents({
+            "method": "upi", "invoice_id": "inv-1",
+            "created_at": {"$gte": "2025-06-02", "$lt": "2025-06-04"},
+        })
+        return walked, expected
+
+    rows, expected = ledger_db(check)
+
+    assert len(rows) == expected > 0
+    assert {(row["method"], row["invoice_id"], row["client_name"]) for row in rows} == {("upi", "inv-1", "Client 1")}
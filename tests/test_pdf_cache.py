@@ -0,0 +1,257 @@
+"""
+Conditional and ranged downloads of cached PDFs, the cache's size cap and
+pointer invalidation. The invalidation test needs MongoDB and is skipped
+when it is unreachable.
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI, Header
+from fastapi.testclient import TestClient
+
+import server
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 4096 + b"\n%%EOF"
+
+
+def _client(tmp_path, gzip=False):
+    cache = server.PDFCache(tmp_path)
+    key = server.PDFCache.key_for({"invoice": "INV-1"}, "test")
+    cache.write(key, PDF_BYTES)
+
+    app = FastAPI()
+    if gzip:
+        app.add_middleware(server.JSONGZipMiddleware, minimum_size=100)
+
+    @app.get("/pdf")
+    async def download(if_none_match: str = Header(None), if_modified_since: str = Header(None)):
+        return cache.response(key, "invoice.pdf", if_none_match, if_modified_since)
+
+    return TestClient(app), key
+
+
+def test_full_download_has_validators(tmp_path):
+    client, key = _client(tmp_path)
+
+    response = client.get("/pdf")
+
+    assert response.status_code == 200
+    assert response.content == PDF_BYTES
+    assert response.headers["etag"] == f'"{key}"'
+    assert "last-modified" in response.headers
+    assert response.headers["accept-ranges"] == "bytes"
+    assert 'filename="invoice.pdf"' in response.headers["content-disposition"]
+
+
+def test_revalidation_returns_not_modified(tmp_path):
+    client, key = _client(tmp_path)
+    last_modified = client.get("/pdf").headers["last-modified"]
+
+    assert client.get("/pdf", headers={"If-None-Match": f'"{key}"'}).status_code == 304
+    assert client.get("/pdf", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/pdf", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_range_requests_resume_with_content_etag(tmp_path):
+    client, key = _client(tmp_path)
+
+    partial = client.get("/pdf", headers={"Range": "bytes=0-99"})
+    resumed = client.get("/pdf", headers={"Range": "bytes=100-", "If-Range": f'"{key}"'})
+    changed = client.get("/pdf", headers={"Range": "bytes=100-", "If-Range": '"stale"'})
+
+    assert partial.status_code == 206
+    assert partial.content == PDF_BYTES[:100]
+    assert resumed.status_code == 206
+    assert partial.content + resumed.content == PDF_BYTES
+    assert changed.status_code == 200
+
+
+def test_pdf_downloads_are_never_gzipped(tmp_path):
+    client, key = _client(tmp_path, gzip=True)
+    encoding = {"Accept-Encoding": "gzip"}
+
+    full = client.get("/pdf", headers=encoding)
+    partial = client.get("/pdf", headers={**encoding, "Range": "bytes=0-99"})
+    resumed = client.get("/pdf", headers={**encoding, "Range": "bytes=100-", "If-Range": f'"{key}"'})
+
+    assert "content-encoding" not in full.headers
+    assert full.content == PDF_BYTES
+    assert partial.status_code == resumed.status_code == 206
+    assert "content-encoding" not in partial.headers
+    assert "content-encoding" not in resumed.headers
+    assert partial.headers["content-length"] == "100"
+    assert partial.content + resumed.content == PDF_BYTES
+
+
+def test_invoice_key_ignores_print_date():
+    data = {"invoice": {"invoice_number": "INV-1", "status": "Pending"}, "client": {"name": "A"}}
+
+    monday = server.invoice_pdf_key({**data, "date": "01 March 2025"})
+    tuesday = server.invoice_pdf_key({**data, "date": "02 March 2025"})
+    paid = server.invoice_pdf_key({**data, "invoice": {"invoice_number": "INV-1", "status": "Fully Paid"}})
+
+    assert monday == tuesday
+    assert paid != monday
+
+
+def test_oldest_files_are_evicted_past_the_size_cap(tmp_path):
+    cache = server.PDFCache(tmp_path, max_bytes=2 * len(PDF_BYTES))
+    keys = [server.PDFCache.key_for({"invoice": f"INV-{i}"}, "test") for i in range(3)]
+    for age, key in enumerate(keys):
+        path = cache.write(key, PDF_BYTES)
+        os.utime(path, (1000 + age, 1000 + age))
+
+    cache.write(server.PDFCache.key_for({"invoice": "INV-3"}, "test"), PDF_BYTES)
+
+    assert not cache.exists(keys[0]) and not cache.exists(keys[1])
+    assert cache.exists(keys[2])
+    assert len(list(tmp_path.glob("*.pdf"))) == 2
+
+
+def test_directory_is_rescanned_only_past_the_cap(tmp_path, monkeypatch):
+    cache = server.PDFCache(tmp_path, max_bytes=3 * len(PDF_BYTES))
+    scans = []
+    evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda keep: scans.append(keep) or evict(keep))
+
+    for i in range(5):
+        cache.write(server.PDFCache.key_for({"invoice": f"INV-{i}"}, "test"), PDF_BYTES)
+
+    # The first write learns the total, the fourth and fifth cross the cap
+    assert len(scans) == 3
+    assert len(list(tmp_path.glob("*.pdf"))) == 3
+
+
+def test_evicted_downloads_render_again(tmp_path, monkeypatch):
+    cache = server.PDFCache(tmp_path)
+    monkeypatch.setattr(server, "pdf_cache", cache)
+    evicted = {"key": "gone", "filename": "q.pdf", "engine": "chromium"}
+    renders = []
+
+    async def entry(quotation_id, renderer):
+        return evicted
+
+    async def render(quotation_id, renderer=None):
+        renders.append(quotation_id)
+        cache.write("fresh", PDF_BYTES)
+        return {**evicted, "key": "fresh"}
+
+    monkeypatch.setattr(server, "quotation_pdf_entry", entry)
+    monkeypatch.setattr(server, "render_quotation_pdf", render)
+
+    with pytest.raises(FileNotFoundError):
+        cache.response("gone", "q.pdf")
+    response = asyncio.run(server.get_quotation_pdf("q-1", engine=None, if_none_match=None))
+
+    assert renders == ["q-1"]
+    assert response.headers["etag"] == '"fresh"'
+
+
+def test_edits_and_settings_changes_drop_pdf_pointers(run_with_test_db, monkeypatch, sample_quotation_data):
+    detailed = {**sample_quotation_data, "start_date": "2025-03-18", "end_date": "2025-03-21"}
+    pointer = {"key": "abc", "filename": "q.pdf", "engine": "chromium"}
+
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        await database.quotations.insert_many([
+            {"id": f"q-{i}", "request_id": "req-1", "status": "DRAFT",
+             "detailed_quotation_data": detailed, "pdf_cache": pointer}
+            for i in range(4)
+        ])
+
+        async def pointers():
+            return {q["id"]: "pdf_cache" in q async for q in database.quotations.find({}, {"_id": 0})}
+
+        await server.update_quotation("q-0", server.Quotation(id="q-0", request_id="req-1", detailed_quotation_data=detailed))
+        await server.publish_quotation("q-1", {"expiry_date": "2025-04-01"})
+        after_edits = await pointers()
+        await server.update_admin_settings({"terms_and_conditions": "New terms"}, current_user={"role": "admin"})
+        return after_edits, await pointers()
+
+    after_edits, after_settings = run_with_test_db(check)
+
+    assert after_edits == {"q-0": False, "q-1": False, "q-2": True, "q-3": True}
+    assert not any(after_settings.values())
+
+
+class StubRenderer(server.PDFRenderer):
+    name = "chromium"
+
+    def __init__(self):
+        self.rendered = []
+
+    async def render(self, html):
+        self.rendered.append(html)
+        return PDF_BYTES
+
+
+def test_renders_with_degraded_images_are_not_remembered(
+    run_with_test_db, monkeypatch, tmp_path, sample_quotation_data, pdf_asset_pack
+):
+    async def embed(data, degraded):
+        return data, degraded
+
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        monkeypatch.setattr(server, "pdf_cache", server.PDFCache(tmp_path))
+
+        async def build(quotation):
+            return dict(sample_quotation_data)
+
+        monkeypatch.setattr(server, "build_quotation_pdf_data", build)
+        await database.quotations.insert_one({"id": "q-1", "updated_at": "2025-03-01T10:00:00+00:00"})
+        monkeypatch.setattr(server.pdf_images, "embed_quotation_images", lambda data: embed(data, ["http://img/x.jpg"]))
+        degraded = await server.render_quotation_pdf("q-1", renderer=StubRenderer())
+        pointer_after_degraded = (await database.quotations.find_one({"id": "q-1"})).get("pdf_cache")
+        monkeypatch.setattr(server.pdf_images, "embed_quotation_images", lambda data: embed(data, []))
+        complete = await server.render_quotation_pdf("q-1", renderer=StubRenderer())
+        pointer = (await database.quotations.find_one({"id": "q-1"})).get("pdf_cache")
+        return degraded, pointer_after_degraded, complete, pointer
+
+    degraded, pointer_after_degraded, complete, pointer = run_with_test_db(check)
+
+    assert pointer_after_degraded is None
+    assert degraded["key"] != complete["key"]
+    assert pointer["key"] == complete["key"]
+
+
+def test_pointers_from_before_a_settings_change_are_not_reused(
+    run_with_test_db, monkeypatch, tmp_path, sample_quotation_data, pdf_asset_pack
+):
+    detailed = {**sample_quotation_data, "start_date": "2025-03-18", "end_date": "2025-03-21"}
+
+    async def embed(data):
+        return data, []
+
+    async def check(database):
+        monkeypatch.setattr(server, "db", database)
+        monkeypatch.setattr(server, "pdf_cache", server.PDFCache(tmp_path))
+        monkeypatch.setattr(server.pdf_images, "embed_quotation_images", embed)
+        reader = server.AdminSettingsProvider(version_check=3600)
+        writer = server.AdminSettingsProvider(version_check=3600)
+        monkeypatch.setattr(server, "admin_settings_provider", reader)
+        await database.users.insert_many([
+            {"id": "c-1", "name": "Client"}, {"id": "s-1", "name": "Sales", "phone": "1", "country_code": "+91"}
+        ])
+        await database.requests.insert_one({
+            "id": "req-1", "client_id": "c-1", "assigned_salesperson_id": "s-1",
+            "start_date": "2025-03-18", "end_date": "2025-03-21"
+        })
+        await database.quotations.insert_one({"id": "q-1", "request_id": "req-1", "detailed_quotation_data": detailed})
+        await database.admin_settings.insert_one({"id": "s-1", "terms_and_conditions": "Old terms"})
+        renderer = StubRenderer()
+        await server.quotation_pdf_entry("q-1", renderer)
+        # Another worker saves new terms; this one's provider hasn't re-checked and
+        # the pointer survives, as if a render in flight re-recorded it after the drop
+        await database.admin_settings.update_one({"id": "s-1"}, {"$set": {"terms_and_conditions": "New terms"}})
+        await writer.invalidate()
+        await server.quotation_pdf_entry("q-1", renderer)
+        return renderer.rendered
+
+    rendered = run_with_test_db(check)
+
+    assert len(rendered) == 2
+    assert "Old terms" in rendered[0]
+    assert "New terms" in rendered[1]
@@ -0,0 +1,95 @@
+"""
+Bulk PDF exports stream a ZIP archive while documents are still rendering.
+"""
+
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = server.PDFCache(tmp_path)
+    monkeypatch.setattr(server, "pdf_cache", cache)
+    return cache
+
+
+async def _ids(count):
+    for index in range(count):
+        yield f"doc-{index:03d}"
+
+
+def _export(fetch, count, concurrency):
+    async def collect():
+        return [chunk async for chunk in server.stream_pdf_zip(_ids(count), fetch, concurrency)]
+    return asyncio.run(collect())
+
+
+def test_archive_contains_every_pdf_in_order(cache):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fetch(doc_id):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        key = server.PDFCache.key_for({"id": doc_id}, "test")
+        cache.write(key, b"%PDF-" + doc_id.encode())
+        in_flight -= 1
+        return {"key": key, "filename": f"{doc_id}.pdf"}
+
+    chunks = _export(fetch, count=20, concurrency=2)
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    assert archive.namelist() == [f"doc-{index:03d}.pdf" for index in range(20)]
+    assert archive.read("doc-007.pdf") == b"%PDF-doc-007"
+    # One chunk per entry plus the central directory: nothing waits for the whole archive
+    assert len([chunk for chunk in chunks if chunk]) == 21
+    assert max_in_flight <= 4
+
+
+def test_failed_documents_are_listed_not_fatal(cache):
+    async def fetch(doc_id):
+        if doc_id == "doc-001":
+            raise HTTPException(status_code=404, detail="Request not found")
+        key = server.PDFCache.key_for({"id": doc_id}, "test")
+        cache.write(key, b"%PDF-")
+        # Same filename for every document
+        return {"key": key, "filename": "invoice.pdf"}
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(_export(fetch, count=3, concurrency=1))))
+
+    assert archive.namelist() == ["invoice.pdf", "invoice-doc-002.pdf", "errors.txt"]
+    assert archive.read("errors.txt") == b"doc-001: Request not found\n"
+
+
+def test_documents_evicted_before_they_are_added_are_fetched_again(cache):
+    fetches = []
+
+    async def fetch(doc_id):
+        fetches.append(doc_id)
+        key = server.PDFCache.key_for({"id": doc_id}, "test")
+        # Another worker evicts doc-001 between its render and the archive read
+        if doc_id != "doc-001" or fetches.count(doc_id) > 1:
+            cache.write(key, b"%PDF-" + doc_id.encode())
+        return {"key": key, "filename": f"{doc_id}.pdf"}
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(_export(fetch, count=3, concurrency=1))))
+
+    assert archive.namelist() == ["doc-000.pdf", "doc-001.pdf", "doc-002.pdf"]
+    assert fetches.count("doc-001") == 2
+
+
+def test_date_range_is_inclusive():
+    assert server.export_date_range("2025-03-01", "2025-03-31") == {
+        "$gte": "2025-03-01",
+        "$lt": "2025-04-01",
+    }
+    with pytest.raises(HTTPException):
+        server.export_date_range("March", None)
@@ -0,0 +1,143 @@
+"""
+Image cache for itinerary PDFs, exercised against a local HTTP stand-in for
+the remote image host.
+"""
+
+import asyncio
+import base64
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+import server
+
+
+def _jpeg(width, height, color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+IMAGES = {
+    "/hotel.jpg": _jpeg(3000, 2000, (200, 120, 40)),
+    "/activity.jpg": _jpeg(2400, 1600, (40, 120, 200)),
+}
+
+
+@pytest.fixture
+def image_host():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path == "/flaky.jpg":
+                self.send_response(503)
+                self.end_headers()
+                return
+            if self.path == "/page.html":
+                body, content_type = b"<html>not an image</html>", "text/html"
+            else:
+                body, content_type = IMAGES.get(self.path), "image/jpeg"
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", hits
+    httpd.shutdown()
+
+
+@pytest.fixture
+def image_cache(tmp_path):
+    return server.ImageCache(tmp_path, max_bytes=10 * 1024 * 1024, quality=80, scale=2)
+
+
+def _decode_data_uri(uri):
+    assert uri.startswith("data:image/jpeg;base64,")
+    return Image.open(io.BytesIO(base64.b64decode(uri.split(",", 1)[1])))
+
+
+def test_images_are_resized_to_their_printed_box(image_cache, image_host, sample_quotation_data):
+    base_url, _ = image_host
+    sample_quotation_data["days"][0]["hotel"]["image"] = f"{base_url}/hotel.jpg"
+    sample_quotation_data["days"][0]["activities"][0]["images"] = [f"{base_url}/activity.jpg"]
+
+    data, degraded = asyncio.run(image_cache.embed_quotation_images(sample_quotation_data))
+
+    hotel = _decode_data_uri(data["days"][0]["hotel"]["image"])
+    activity = _decode_data_uri(data["days"][0]["activities"][0]["images"][0])
+    assert degraded == []
+    assert hotel.size == (372 * 2, 256 * 2)
+    assert activity.size == (96 * 2, 96 * 2)
+    # The original input is left untouched for cache-key purposes
+    assert sample_quotation_data["days"][0]["hotel"]["image"] == f"{base_url}/hotel.jpg"
+    assert len(base64.b64decode(data["days"][0]["hotel"]["image"].split(",", 1)[1])) < len(IMAGES["/hotel.jpg"])
+
+
+def test_each_url_is_fetched_once(image_cache, image_host):
+    base_url, hits = image_host
+    url = f"{base_url}/hotel.jpg"
+
+    async def fetch_concurrently():
+        return await asyncio.gather(*[image_cache.get(url, (372, 256)) for _ in range(5)])
+
+    first = asyncio.run(fetch_concurrently())
+    second = asyncio.run(image_cache.get(url, (372, 256)))
+
+    assert hits == ["/hotel.jpg"]
+    assert all(result == second for result in first)
+
+
+def test_uncacheable_images_become_a_local_placeholder(tmp_path, image_host):
+    base_url, _ = image_host
+    cache = server.ImageCache(tmp_path, max_bytes=10 * 1024 * 1024, quality=80, scale=1,
+                              max_fetch_bytes=len(IMAGES["/activity.jpg"]) + 1)
+
+    missing = asyncio.run(cache.embed(f"{base_url}/missing.jpg", "hotel"))
+    not_an_image = asyncio.run(cache.embed(f"{base_url}/page.html", "hotel"))
+    too_large = asyncio.run(cache.embed(f"{base_url}/hotel.jpg", "hotel"))
+    within_limit = asyncio.run(cache.embed(f"{base_url}/activity.jpg", "activity"))
+
+    assert missing == not_an_image == too_large == cache.placeholder((372, 256))
+    assert _decode_data_uri(missing).size == (372, 256)
+    assert within_limit != cache.placeholder((96, 96))
+
+
+def test_transient_failures_are_reported_as_degraded(image_cache, image_host, sample_quotation_data):
+    base_url, _ = image_host
+    sample_quotation_data["days"][0]["hotel"]["image"] = f"{base_url}/flaky.jpg"
+    sample_quotation_data["days"][0]["activities"][0]["images"] = [
+        f"{base_url}/missing.jpg", f"{base_url}/activity.jpg"
+    ]
+
+    data, degraded = asyncio.run(image_cache.embed_quotation_images(sample_quotation_data))
+
+    # A 404 won't fix itself, so only the 503 counts against caching the render
+    assert degraded == [f"{base_url}/flaky.jpg"]
+    assert data["days"][0]["hotel"]["image"] == image_cache.placeholder((372, 256))
+
+
+def test_least_recently_used_variants_are_evicted(tmp_path, image_host):
+    base_url, _ = image_host
+    cache = server.ImageCache(tmp_path, max_bytes=1, quality=80, scale=1)
+
+    asyncio.run(cache.get(f"{base_url}/hotel.jpg", (372, 256)))
+    asyncio.run(cache.get(f"{base_url}/activity.jpg", (96, 96)))
+
+    remaining = list((tmp_path / "blobs").glob("*.jpg"))
+    assert len(remaining) <= 1
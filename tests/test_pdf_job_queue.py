@@ -0,0 +1,156 @@
+"""
+PDFJobQueue: dedupe, retry backoff, the max_attempts cutoff, stale-lock
+reclaim, per-task claims and the /pdf-jobs endpoints. Needs MongoDB; skipped
+when unreachable.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def queue_db(seeded_db):
+    async def seed(database):
+        await server.ensure_indexes(database, {"pdf_jobs": server.INDEXES["pdf_jobs"]})
+
+    run = seeded_db(seed)
+
+    def with_queue(check):
+        return run(lambda database: check(
+            database, server.PDFJobQueue(workers=0, max_attempts=3, poll_interval=0.01, lock_timeout=60)
+        ))
+    return with_queue
+
+
+def _ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+def test_pending_jobs_are_deduplicated(queue_db):
+    async def check(database, queue):
+        first = await queue.enqueue("q-1", "chromium")
+        second = await queue.enqueue("q-1", "chromium")
+        other_engine = await queue.enqueue("q-1", "weasyprint")
+        return first, second, other_engine, await database.pdf_jobs.count_documents({})
+
+    first, second, other_engine, count = queue_db(check)
+
+    assert second["id"] == first["id"]
+    assert other_engine["id"] != first["id"]
+    assert count == 2
+
+
+def test_failed_renders_back_off_then_fail_for_good(queue_db, monkeypatch):
+    async def failing_render(*args, **kwargs):
+        raise RuntimeError("chromium crashed")
+
+    monkeypatch.setattr(server, "render_quotation_pdf", failing_render)
+
+    async def check(database, queue):
+        await queue.enqueue("q-1", "chromium")
+        job = await queue._claim("worker-1")
+        await queue._run(job)
+        retrying = await database.pdf_jobs.find_one({"id": job["id"]})
+        await database.pdf_jobs.update_one({"id": job["id"]}, {"$set": {"attempts": 2, "run_after": _ago(1)}})
+        await queue._run(await queue._claim("worker-1"))
+        return job, retrying, await database.pdf_jobs.find_one({"id": job["id"]})
+
+    job, retrying, failed = queue_db(check)
+
+    assert job["attempts"] == 1
+    assert retrying["status"] == "queued" and retrying["error"] == "chromium crashed"
+    delay = datetime.fromisoformat(retrying["run_after"]) - datetime.fromisoformat(retrying["updated_at"])
+    assert timedelta(seconds=1.5) < delay < timedelta(seconds=2.5)
+    assert failed["status"] == "failed" and failed["attempts"] == 3
+    assert "dedupe_key" not in failed and failed["finished_at"]
+
+
+def test_stale_jobs_are_reclaimed_until_their_attempts_run_out(queue_db):
+    async def check(database, queue):
+        for job_id, attempts in (("crashed-once", 1), ("crashes-always", 3)):
+            await database.pdf_jobs.insert_one(server.PDFJob(
+                id=job_id, quotation_id=job_id, status=server.PDFJobStatus.RUNNING, attempts=attempts,
+                locked_at=_ago(120), worker_id="dead-worker", dedupe_key=f"{job_id}:chromium"
+            ).model_dump())
+        reclaimed = await queue._claim("worker-1")
+        nothing_left = await queue._claim("worker-1")
+        return reclaimed, nothing_left, await database.pdf_jobs.find_one({"id": "crashes-always"})
+
+    reclaimed, nothing_left, abandoned = queue_db(check)
+
+    assert reclaimed["id"] == "crashed-once" and reclaimed["attempts"] == 2
+    assert nothing_left is None
+    assert abandoned["status"] == "failed" and "dedupe_key" not in abandoned
+
+
+def test_a_reclaimed_job_ignores_its_previous_worker(queue_db, monkeypatch):
+    async def render(quotation_id, **kwargs):
+        return {"key": quotation_id, "filename": "q.pdf"}
+
+    monkeypatch.setattr(server, "render_quotation_pdf", render)
+
+    async def check(database, queue):
+        await queue.enqueue("q-1", "chromium")
+        stalled = await queue._claim("worker-1")
+        await database.pdf_jobs.update_one({"id": stalled["id"]}, {"$set": {"locked_at": _ago(120)}})
+        reclaimed = await queue._claim("worker-2")
+        # The stalled task wakes up and finishes after losing its claim
+        await queue._run(stalled)
+        return reclaimed, await database.pdf_jobs.find_one({"id": stalled["id"]})
+
+    reclaimed, job = queue_db(check)
+
+    assert reclaimed["worker_id"] == "worker-2"
+    assert job["status"] == "running" and job["worker_id"] == "worker-2"
+
+
+def test_missing_dedupe_index_is_reported_and_worked_around(seeded_db):
+    # Duplicates from before the index existed stop it from being built
+    duplicates = [
+        server.PDFJob(quotation_id="q-1", engine="chromium", dedupe_key="q-1:chromium").model_dump()
+        for _ in range(2)
+    ]
+
+    async def check(database):
+        queue = server.PDFJobQueue(workers=0, max_attempts=3, poll_interval=0.01, lock_timeout=60)
+        await queue.start()
+        existing = await queue.enqueue("q-1", "chromium")
+        return queue.deduplicated, existing, await database.pdf_jobs.count_documents({})
+
+    deduplicated, existing, count = seeded_db({"pdf_jobs": duplicates})(check)
+
+    assert deduplicated is False
+    assert existing["dedupe_key"] == "q-1:chromium"
+    assert count == 2
+
+
+def test_job_endpoints(queue_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "pdf_cache", server.PDFCache(tmp_path))
+
+    async def check(database, queue):
+        monkeypatch.setattr(server, "pdf_job_queue", queue)
+        with pytest.raises(HTTPException) as missing:
+            await server.create_quotation_pdf_job("nope", engine=None)
+        await database.quotations.insert_one({"id": "q-1"})
+        created = await server.create_quotation_pdf_job("q-1", engine=None)
+        polled = await server.get_pdf_job(created["job_id"])
+        with pytest.raises(HTTPException) as not_done:
+            await server.download_pdf_job(created["job_id"], if_none_match=None)
+        await database.pdf_jobs.update_one(
+            {"id": created["job_id"]},
+            {"$set": {"status": "done", "result": {"key": "gone", "filename": "q.pdf"}}}
+        )
+        with pytest.raises(HTTPException) as evicted:
+            await server.download_pdf_job(created["job_id"], if_none_match=None)
+        return missing.value, created, polled, not_done.value, evicted.value
+
+    missing, created, polled, not_done, evicted = queue_db(check)
+
+    assert missing.status_code == 404
+    assert created["status"] == "queued" and polled["job_id"] == created["job_id"]
+    assert not_done.status_code == 409
+    assert evicted.status_code == 410
@@ -0,0 +1,84 @@
+"""
+The quotation PDF must render with networking disabled: Tailwind, fonts and
+the QR code script come from the inlined asset pack, not from a CDN. Tests
+that need the built pack are skipped until scripts/build_pdf_assets.py runs.
+"""
+
+import asyncio
+
+import pytest
+
+import server
+
+EXTERNAL_ASSET_TYPES = {"stylesheet", "script", "font"}
+
+
+async def _render_offline(html):
+    from playwright.async_api import async_playwright
+
+    external_requests = []
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium is not available: {e}")
+        context = await browser.new_context(offline=True)
+
+        async def block_network(route):
+            if route.request.url.startswith(("http://", "https://")):
+                if route.request.resource_type in EXTERNAL_ASSET_TYPES:
+                    external_requests.append(route.request.url)
+                await route.abort("internetdisconnected")
+            else:
+                await route.continue_()
+
+        await context.route("**/*", block_network)
+        page = await context.new_page()
+        await page.set_content(html, wait_until="load")
+        qr_codes_drawn = await page.evaluate(
+            "['qrcode', 'qrcode2', 'qrcode3'].filter(id => document.querySelector(`#${id} canvas`)).length"
+        )
+        pdf_bytes = await page.pdf(format="A4", print_background=True)
+        await browser.close()
+    return pdf_bytes, external_requests, qr_codes_drawn
+
+
+def test_asset_pack_is_built(pdf_asset_pack):
+    assets = pdf_asset_pack
+
+    assert "@font-face" in assets.css and "data:font/woff2;base64," in assets.css
+    # Compiled Tailwind keeps its license banner even when minified
+    assert "tailwindcss v" in assets.css
+    assert "QRCode" in assets.qrcode_js
+
+
+def test_missing_assets_fail_loudly(tmp_path):
+    (tmp_path / "fonts.css").write_text("@font-face{src:url(fonts/inter-400.woff2)}")
+    (tmp_path / "tailwind.css").write_text(".p-4{padding:1rem}")
+    (tmp_path / "qrcode.min.js").write_text("var QRCode;")
+
+    with pytest.raises(server.PDFAssetsMissing):
+        server.PDFAssetPack(tmp_path).load()
+    (tmp_path / "fonts").mkdir()
+    (tmp_path / "fonts" / "inter-400.woff2").write_bytes(b"wOF2")
+    (tmp_path / "qrcode.min.js").unlink()
+    with pytest.raises(server.PDFAssetsMissing):
+        server.PDFAssetPack(tmp_path).load()
+
+
+def test_quotation_template_has_no_cdn_dependencies(sample_quotation_data, pdf_asset_pack):
+    html = server.pdf_templates.render(server.PDF_TEMPLATE_NAME, data=sample_quotation_data, assets=pdf_asset_pack)
+
+    assert "cdn.tailwindcss.com" not in html
+    assert "fonts.googleapis.com" not in html
+    assert "cdnjs.cloudflare.com" not in html
+
+
+def test_quotation_pdf_renders_with_network_disabled(sample_quotation_data, pdf_asset_pack):
+    html = server.pdf_templates.render(server.PDF_TEMPLATE_NAME, data=sample_quotation_data, assets=pdf_asset_pack)
+
+    pdf_bytes, external_requests, qr_codes_drawn = asyncio.run(_render_offline(html))
+
+    assert pdf_bytes.startswith(b"%PDF")
+    assert external_requests == []
+    assert qr_codes_drawn == 3
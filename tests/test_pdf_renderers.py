@@ -0,0 +1,54 @@
+"""
+Renderer selection and the script-free template used by WeasyPrint.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_static_variant_has_no_scripts(sample_quotation_data, pdf_asset_pack):
+    html = server.pdf_templates.render(server.PDF_TEMPLATE_STATIC_NAME, data=sample_quotation_data, assets=pdf_asset_pack)
+
+    assert "<script" not in html
+    assert 'id="qrcode' not in html
+    assert "traveego.com/book/TRV-TEST-001" in html
+    assert "traveego.com/pay/TRV-TEST-001" in html
+    # Everything else comes from the base template
+    assert "Sunset Cruise" in html
+
+
+def test_engines_have_distinct_cache_versions():
+    chromium = server.pdf_renderers["chromium"]
+    weasyprint = server.pdf_renderers["weasyprint"]
+
+    assert chromium.version != weasyprint.version
+    assert weasyprint.version.endswith(server.pdf_templates.version(server.PDF_TEMPLATE_NAME))
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        server.get_pdf_renderer("wkhtmltopdf")
+    assert excinfo.value.status_code == 400
+
+
+def test_weasyprint_renders_static_variant(sample_quotation_data, pdf_asset_pack):
+    if server.weasyprint is None:
+        pytest.skip("WeasyPrint is not installed")
+    renderer = server.get_pdf_renderer("weasyprint")
+    html = server.pdf_templates.render(renderer.template_name, data=sample_quotation_data, assets=pdf_asset_pack)
+
+    pdf_bytes = asyncio.run(renderer.render(html))
+
+    assert pdf_bytes.startswith(b"%PDF")
+
+
+def test_incomplete_renderers_fail_at_instantiation():
+    class NoRender(server.PDFRenderer):
+        name = "none"
+
+    with pytest.raises(TypeError):
+        NoRender()
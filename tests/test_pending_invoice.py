@@ -0,0 +1,102 @@
+"""
+The anti-join pipeline behind /quotations/pending-invoice must return the
+quotations the per-quotation lookup loop returned. Needs MongoDB; skipped
+when unreachable.
+"""
+
+import asyncio
+import random
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+USER = {"sub": "ops-001", "role": "operations"}
+
+
+async def legacy_pending_invoice_ids(db):
+    """The loop this endpoint replaced, reduced to the ids it returned."""
+    ids = []
+    async for quotation in db.quotations.find({"status": "ACCEPTED"}):
+        if await db.invoices.find_one({"quotation_id": quotation["id"]}):
+            continue
+        if await db.requests.find_one({"id": quotation["request_id"]}):
+            ids.append(quotation["id"])
+    return ids
+
+
+async def _seed(db, seed=5, quotations=60):
+    rng = random.Random(seed)
+    for q in range(quotations):
+        if q % 8 != 0:  # some quotations point at a missing request
+            await db.requests.insert_one({"id": f"req-{q}", "title": f"Trip {q}", "destination": "Goa", "people_count": 2})
+        quotation = {
+            "id": f"quote-{q:03d}",
+            "request_id": f"req-{q}",
+            "status": rng.choice(["ACCEPTED", "ACCEPTED", "SENT", "DRAFT"]),
+            "updated_at": f"2025-05-{rng.randrange(1, 29):02d}T10:00:00+00:00",
+            "detailed_quotation_data": {
+                "tripTitle": f"Trip {q}", "city": "Goa", "bookingRef": f"REF-{q}",
+                "pricing": {"total": 59000}, "days": [{"dayNumber": 1, "activities": ["x"] * 50}],
+            },
+        }
+        if rng.random() < 0.6:  # the rest predate accepted_at and get it from the migration
+            quotation["accepted_at"] = f"2025-06-{rng.randrange(1, 29):02d}T10:00:00+00:00"
+        await db.quotations.insert_one(quotation)
+        if rng.random() < 0.3:
+            await db.invoices.insert_one({"id": f"inv-{q}", "quotation_id": quotation["id"]})
+    await server.apply_migrations(db)
+
+
+@pytest.fixture
+def pending_db(seeded_db):
+    return seeded_db(_seed)
+
+
+def _list(**params):
+    response = Response()
+    params.setdefault("page", 1)
+    params.setdefault("limit", None)
+    params.setdefault("sort", "accepted_at")
+    return response, server.get_pending_invoice_quotations(response, current_user=USER, **params)
+
+
+def test_pipeline_matches_legacy_loop(pending_db):
+    async def check(database):
+        response, result = _list()
+        return await legacy_pending_invoice_ids(database), await result, response
+
+    legacy, result, response = pending_db(check)
+
+    assert sorted(q["id"] for q in result) == sorted(legacy)
+    assert response.headers["X-Total-Count"] == str(len(legacy))
+    accepted = [q["accepted_at"] for q in result]
+    assert None not in accepted and accepted == sorted(accepted)
+    for quotation in result:
+        assert "days" not in quotation["detailed_quotation_data"]
+        assert quotation["detailed_quotation_data"]["pricing"] == {"total": 59000}
+        assert set(quotation["request_details"]) == set(server.PENDING_INVOICE_REQUEST_FIELDS)
+
+
+def test_pages_cover_the_full_queue(pending_db):
+    async def check(database):
+        full = await _list(sort="-accepted_at")[1]
+        pages, page = [], 1
+        while True:
+            rows = await _list(page=page, limit=7, sort="-accepted_at")[1]
+            if not rows:
+                return full, pages
+            pages.extend(rows)
+            page += 1
+
+    full, pages = pending_db(check)
+
+    assert pages == full
+
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(_list(sort="created_at")[1])
+
+    assert excinfo.value.status_code == 400
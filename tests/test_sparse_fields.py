@@ -0,0 +1,80 @@
+"""
+`fields=` projections and the partial response models that carry them.
+Projection parsing runs anywhere; the endpoint test needs MongoDB and is
+skipped when it is unreachable.
+"""
+
+import orjson
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+QuotationFields = server.partial_model(server.Quotation)
+
+
+def test_default_projection_applies_without_fields():
+    projection = server.fields_projection(None, server.Quotation, server.QUOTATION_LIST_FIELDS)
+
+    assert projection["_id"] == 0
+    assert projection["detailed_quotation_data.pricing"] == 1
+    assert "detailed_quotation_data" not in projection
+
+
+def test_requested_paths_are_validated_and_always_include_id():
+    projection = server.fields_projection("status, detailed_quotation_data.pricing.total", server.Quotation)
+
+    assert projection == {"_id": 0, "detailed_quotation_data.pricing.total": 1, "id": 1, "status": 1}
+    with pytest.raises(HTTPException) as excinfo:
+        server.fields_projection("status,password", server.Quotation)
+    assert excinfo.value.status_code == 400
+
+
+def test_parent_paths_win_over_children():
+    projection = server.fields_projection("detailed_quotation_data.pricing,detailed_quotation_data", server.Quotation)
+
+    assert projection == {"_id": 0, "detailed_quotation_data": 1, "id": 1}
+
+
+def test_star_reads_whole_documents():
+    assert server.fields_projection("*", server.Quotation, server.QUOTATION_LIST_FIELDS) is None
+
+
+def test_partial_model_accepts_partial_documents():
+    item = QuotationFields(id="q-1", status="SENT", detailed_quotation_data={"pricing": {"total": 59000}})
+
+    assert item.model_dump(exclude_unset=True) == {
+        "id": "q-1", "status": server.QuotationStatus.SENT, "detailed_quotation_data": {"pricing": {"total": 59000}},
+    }
+    assert server.partial_model(server.Quotation) is QuotationFields
+
+
+@pytest.fixture
+def quotations_db(seeded_db, sample_quotation_data):
+    return seeded_db({"quotations": [
+        {"id": f"q-{i}", "request_id": "req-1", "status": "SENT", "cost_breakup": [],
+         "created_at": f"2025-06-0{i + 1}T10:00:00+00:00", "updated_at": "2025-06-01T10:00:00+00:00",
+         "detailed_quotation_data": sample_quotation_data}
+        for i in range(3)
+    ]})
+
+
+def test_list_view_leaves_out_the_itinerary(quotations_db):
+    paginate = server.paginate(server.NEWEST_FIRST, 1000)
+
+    async def check(database):
+        default = await server.get_quotations(request_id="req-1", fields=None, page=paginate(Response(), None, 1000, "-created_at"))
+        narrow_page = paginate(Response(), None, 2, "-created_at")
+        narrow = await server.get_quotations(request_id="req-1", fields="status", page=narrow_page)
+        return orjson.loads(default.body), orjson.loads(narrow.body), narrow_page.next_cursor
+
+    default, narrow, next_cursor = quotations_db(check)
+
+    assert [q["id"] for q in default] == ["q-2", "q-1", "q-0"]
+    assert set(default[0]["detailed_quotation_data"]) == {"tripTitle", "city", "bookingRef", "pricing"}
+    # The sort key is read alongside the requested fields so the cursor still works
+    assert narrow == [
+        {"id": "q-2", "status": "SENT", "created_at": "2025-06-03T10:00:00+00:00"},
+        {"id": "q-1", "status": "SENT", "created_at": "2025-06-02T10:00:00+00:00"},
+    ]
+    assert next_cursor
@@ -0,0 +1,58 @@
+"""
+TTLCache: per-key expiry, single-flight misses and a bounded size.
+"""
+
+import asyncio
+
+import pytest
+
+import server
+
+
+def test_concurrent_misses_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"tiles": len(calls)}
+
+    async def run():
+        cache = server.TTLCache(ttl=60)
+        results = await asyncio.gather(*[cache.get("u-1", compute) for _ in range(5)])
+        return results, await cache.get("u-1", compute)
+
+    results, cached = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == {"tiles": 1} for result in results) and cached == {"tiles": 1}
+
+
+def test_entries_expire_and_failures_are_not_cached():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return len(calls)
+
+    async def run():
+        cache = server.TTLCache(ttl=0)
+        with pytest.raises(RuntimeError):
+            await cache.get("u-1", compute)
+        return await cache.get("u-1", compute), await cache.get("u-1", compute)
+
+    assert asyncio.run(run()) == (2, 3)
+
+
+def test_size_is_bounded():
+    async def run():
+        cache = server.TTLCache(ttl=60, max_entries=3)
+        for key in range(10):
+            await cache.get(key, lambda key=key: asyncio.sleep(0, result=key))
+        return cache
+
+    cache = asyncio.run(run())
+
+    assert list(cache._entries) == [7, 8, 9]
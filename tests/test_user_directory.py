@@ -0,0 +1,90 @@
+"""
+UserDirectory: LRU + TTL caching of user documents and version-stamp
+invalidation across workers. Needs MongoDB; skipped when unreachable.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def users_db(seeded_db):
+    return seeded_db({"users": [
+        {"id": f"u-{i}", "name": f"User {i}", "email": f"u{i}@example.com", "password": "hash"}
+        for i in range(5)
+    ]})
+
+
+class CountingCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.finds = 0
+
+    def find(self, *args, **kwargs):
+        self.finds += 1
+        return self.collection.find(*args, **kwargs)
+
+
+def test_get_many_batches_misses_and_serves_hits_from_memory(users_db, monkeypatch):
+    async def check(database):
+        users = CountingCollection(database.users)
+        monkeypatch.setattr(server, "db", SimpleNamespace(users=users, cache_versions=database.cache_versions))
+        directory = server.UserDirectory(version_check=3600)
+        first = await directory.get_many(["u-1", "u-2", "missing", None])
+        second = await directory.get_many(["u-1", "u-2", "missing"])
+        single = await directory.get("u-2")
+        return first, second, single, users.finds
+
+    first, second, single, finds = users_db(check)
+
+    assert set(first) == set(second) == {"u-1", "u-2"}
+    assert "password" not in first["u-1"]
+    assert single["name"] == "User 2"
+    assert finds == 1
+
+
+def test_lru_evicts_the_least_recently_used(users_db):
+    async def check(database):
+        directory = server.UserDirectory(max_entries=2, version_check=3600)
+        await directory.get("u-0")
+        await directory.get("u-1")
+        await directory.get("u-0")
+        await directory.get("u-2")
+        return list(directory._entries)
+
+    assert users_db(check) == ["u-0", "u-2"]
+
+
+def test_other_workers_see_invalidations_through_the_version_stamp(users_db):
+    async def check(database):
+        writer = server.UserDirectory(version_check=0)
+        reader = server.UserDirectory(version_check=0)
+        before = await reader.get("u-3")
+        await database.users.update_one({"id": "u-3"}, {"$set": {"name": "Renamed"}})
+        stale = await reader.get("u-3")
+        await writer.invalidate("u-3")
+        return before, stale, await reader.get("u-3")
+
+    before, stale, fresh = users_db(check)
+
+    assert before["name"] == stale["name"] == "User 3"
+    assert fresh["name"] == "Renamed"
+
+
+def test_own_invalidate_does_not_swallow_a_foreign_bump(users_db):
+    async def check(database):
+        local = server.UserDirectory(version_check=3600)
+        remote = server.UserDirectory(version_check=3600)
+        before = await local.get("u-1")
+        await database.users.update_one({"id": "u-1"}, {"$set": {"name": "Renamed"}})
+        await remote.invalidate("u-1")
+        await local.invalidate("u-2")
+        return before, await local.get("u-1")
+
+    before, after = users_db(check)
+
+    assert before["name"] == "User 1"
+    assert after["name"] == "Renamed"